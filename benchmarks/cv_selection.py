@@ -0,0 +1,77 @@
+"""
+Time of budgeted CV content selection with the lazy-greedy heap (`src/cv_selection.py`) versus
+a plain greedy that recomputes every candidate's gain at each step, on synthetic CV databases.
+
+Both must pick the same content. Gains are only recomputed for the candidates that reach the
+top of the heap, so the lazy greedy stays fast with thousands of bullet points.
+
+Usage:
+    python benchmarks/cv_selection.py [--bullets 1000 5000 20000] [--max-chars 4000] [--plain-limit 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+from cv_processing import selection_candidates
+from cv_selection import COVERAGE_DECAY, keyword_weights, select_content
+from skill_matcher import phrase_tokens
+from synthetic import generate_cv_database, generate_job_description
+
+def select_plain(candidates, weights, budget, decay=COVERAGE_DECAY):
+    # Reference greedy: rescan every remaining candidate for the best gain per character at each step
+    covered = {}
+    chosen, chars = [], 0
+    remaining = set(range(len(candidates)))
+    while True:
+        best, best_ratio = None, 0.0
+        for index in sorted(remaining):
+            candidate = candidates[index]
+            if chars + candidate.cost > budget:
+                continue
+            gain = sum(weights[keyword] * decay ** covered.get(keyword, 0) for keyword in candidate.keywords) * (1 - decay)
+            ratio = gain / max(candidate.cost, 1)
+            if ratio > best_ratio:
+                best, best_ratio = index, ratio
+        if best is None:
+            return chosen
+        chosen.append(best)
+        remaining.discard(best)
+        chars += candidates[best].cost
+        for keyword in candidates[best].keywords:
+            covered[keyword] = covered.get(keyword, 0) + 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lazy-greedy CV content selection.")
+    parser.add_argument("--bullets", type=int, nargs="+", default=[1000, 5000, 20_000], help="Bullet points in the CV database")
+    parser.add_argument("--max-chars", type=int, default=4000, help="Character budget of the selected content (default: 4000)")
+    parser.add_argument("--plain-limit", type=int, default=5000, help="Largest database also timed with the plain greedy (default: 5000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    weights = keyword_weights(phrase_tokens(generate_job_description(rng, 600)))
+    print(f"{'bullets':>8}  {'candidates':>10}  {'selected':>9}  {'coverage':>9}  {'lazy ms':>9}  {'plain ms':>9}")
+    for bullets in args.bullets:
+        cv_data = generate_cv_database(rng, experiences=max(bullets // 50, 1), bullets=bullets)
+        candidates = selection_candidates(cv_data, weights)
+
+        start = time.perf_counter()
+        selection = select_content(candidates, weights, args.max_chars)
+        lazy_seconds = time.perf_counter() - start
+
+        plain = "-"
+        if bullets <= args.plain_limit:
+            start = time.perf_counter()
+            expected = select_plain(candidates, weights, args.max_chars)
+            plain = f"{(time.perf_counter() - start) * 1000:.1f}"
+            if selection.chosen != expected:
+                sys.exit(f"Selections differ with {bullets} bullets.")
+        print(f"{bullets:>8}  {len(candidates):>10}  {len(selection.chosen):>9}  {selection.coverage:>9.1%}  {lazy_seconds * 1000:>9.1f}  {plain:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Local fake of the OpenAI Responses API for offline tests and benchmarks.
+
+Every POST to /v1/responses sleeps for the configured latency and then either answers with a
+canned response or injects an error (429 or 500) at the configured rates.
+
+Usage:
+    python benchmarks/fake_llm_server.py [--port 8765] [--latency 0.5] [--rate-limit-rate 0.1] [--server-error-rate 0.05]
+
+Then point a client at it, e.g. `OpenAI(base_url="http://127.0.0.1:8765/v1", api_key="fake")`.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_OUTPUT_TEXT = """# Candidate Name
+## Experience
+- Built scalable data pipelines in Python and Spark.
+## Education
+## Skills
+## Projects
+
+Cover Letter
+Dear hiring team,
+I would love to join you.
+"""
+
+class FakeResponsesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        config = self.server.config
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+            roll = self.server.random.random()
+
+        time.sleep(max(0.0, config["latency"] + self.server.random.uniform(-config["jitter"], config["jitter"])))
+
+        if roll < config["rate_limit_rate"]:
+            self._send_json(429, {"error": {"message": "Rate limit exceeded (injected)", "type": "rate_limit_error"}}, {"Retry-After": str(config["retry_after"])})
+            return
+        if roll < config["rate_limit_rate"] + config["server_error_rate"]:
+            self._send_json(500, {"error": {"message": "Internal error (injected)", "type": "server_error"}})
+            return
+
+        self._send_json(200, {
+            "id": f"resp_{self.server.requests}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": request.get("model", "fake"),
+            "status": "completed",
+            "output": [{
+                "type": "message",
+                "id": f"msg_{self.server.requests}",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": config["output_text"], "annotations": []}],
+            }],
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fake_server(port=0, latency=0.5, jitter=0.0, rate_limit_rate=0.0, server_error_rate=0.0, retry_after=0.1, output_text=DEFAULT_OUTPUT_TEXT, seed=0):
+    """
+    Starts the fake server in a background thread.
+
+    :return: A tuple of (server, base_url). Call `server.shutdown()` to stop it.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeResponsesHandler)
+    server.daemon_threads = True
+    server.config = {
+        "latency": latency,
+        "jitter": jitter,
+        "rate_limit_rate": rate_limit_rate,
+        "server_error_rate": server_error_rate,
+        "retry_after": retry_after,
+        "output_text": output_text,
+    }
+    server.lock = threading.Lock()
+    server.random = random.Random(seed)
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake of the OpenAI Responses API.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before each answer (default: 0.5)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform latency jitter in seconds (default: 0)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429 (default: 0)")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Fraction of requests answered with 500 (default: 0)")
+    args = parser.parse_args()
+
+    server, base_url = start_fake_server(args.port, args.latency, args.jitter, args.rate_limit_rate, args.server_error_rate)
+    print(f"Fake Responses API listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Requests/sec of the asyncio model driver versus the sequential `run_gpt_model` path.
+
+Both paths talk to the local fake Responses API (see fake_llm_server.py), which injects latency,
+429s and 500s, so the benchmark runs offline.
+
+Usage:
+    python benchmarks/llm_throughput.py [--requests 40] [--latency 0.3] [--concurrency 8] [--rate-limit-rate 0.1]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from fake_llm_server import start_fake_server
+from llm_async import run_prompts_async
+from llm_client import generate_response
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the asyncio model driver with sequential model calls.")
+    parser.add_argument("--requests", type=int, default=40, help="Number of prompts (default: 40)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake server latency in seconds (default: 0.3)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight for the async driver (default: 8)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.1, help="Fraction of requests answered with 429 (default: 0.1)")
+    parser.add_argument("--server-error-rate", type=float, default=0.05, help="Fraction of requests answered with 500 (default: 0.05)")
+    parser.add_argument("--rpm", type=float, default=None, help="Requests per minute limit for the async driver (optional)")
+    args = parser.parse_args()
+
+    from openai import AsyncOpenAI, OpenAI
+
+    server, base_url = start_fake_server(
+        latency=args.latency,
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.server_error_rate
+    )
+    prompts = [(f"prompt-{i}", f"Job description {i}\n" + "keyword " * 200) for i in range(args.requests)]
+
+    # Sequential path: one blocking call per prompt, as run_gpt_model does (the client retries 429s and 5xx itself)
+    client = OpenAI(base_url=base_url, api_key="fake", max_retries=5)
+    start = time.perf_counter()
+    for _, input_text in prompts:
+        generate_response(client, "fake-model", input_text)
+    sequential_seconds = time.perf_counter() - start
+
+    # Async driver: bounded concurrency, rate limiting and its own backoff
+    async_client = AsyncOpenAI(base_url=base_url, api_key="fake", max_retries=0)
+    start = time.perf_counter()
+    results = asyncio.run(run_prompts_async(
+        prompts,
+        async_client,
+        "fake-model",
+        max_concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        base_delay=0.05,
+        max_delay=1.0
+    ))
+    async_seconds = time.perf_counter() - start
+    server.shutdown()
+
+    failed = sum(1 for result in results if result["error"] is not None)
+    retries = sum(result["attempts"] - 1 for result in results)
+    print(f"Prompts: {args.requests}, fake latency {args.latency:.2f}s, injected 429 rate {args.rate_limit_rate:.0%}, 5xx rate {args.server_error_rate:.0%}")
+    print(f"Sequential: {sequential_seconds:7.2f}s  {args.requests / sequential_seconds:7.2f} requests/s")
+    print(f"Async (x{args.concurrency}): {async_seconds:7.2f}s  {args.requests / async_seconds:7.2f} requests/s  ({retries} retries, {failed} failed)")
+    print(f"Speed-up: {sequential_seconds / async_seconds:.1f}x")
+
+if __name__ == "__main__":
+    main()
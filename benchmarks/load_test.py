@@ -0,0 +1,116 @@
+"""
+Warm-request latency and requests/sec of the analysis server versus cold CLI runs.
+
+Starts `main.py serve` on a free port (or uses a running server with --url), times a few
+`main.py <job> --fast` runs for reference, then sends requests to one endpoint from several
+client threads, each keeping its connection open.
+
+Usage:
+    python benchmarks/load_test.py [--endpoint analyze] [--clients 4] [--requests 400] [--job-file example_JD.txt] [--url http://127.0.0.1:8766]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(BASE_DIR, 'src', 'main.py')
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+from server import AnalysisClient
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(port):
+    process = subprocess.Popen([sys.executable, MAIN, "serve", "--port", str(port)], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    # The server prints its address once everything is loaded
+    for line in process.stdout:
+        if "listening" in line:
+            return process
+    raise RuntimeError("The analysis server exited before listening.")
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+def payload(endpoint, job_file):
+    if endpoint == "ats":
+        return {"file": os.path.join(BASE_DIR, 'data', job_file)}
+    return {"job_file": job_file}
+
+def run_clients(url, endpoint, job_file, clients, requests):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    per_client = [requests // clients + (1 if i < requests % clients else 0) for i in range(clients)]
+
+    def worker(count):
+        client = AnalysisClient(url)
+        client.request(f"/{endpoint}", payload(endpoint, job_file))  # Warm the connection
+        local = []
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                client.request(f"/{endpoint}", payload(endpoint, job_file))
+                local.append(time.perf_counter() - start)
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+        client.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(count,)) for count in per_client]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), errors, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the analysis server.")
+    parser.add_argument("--endpoint", choices=["analyze", "compare", "ats"], default="analyze", help="Endpoint to load (default: analyze)")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent client threads (default: 4)")
+    parser.add_argument("--requests", type=int, default=400, help="Total number of timed requests (default: 400)")
+    parser.add_argument("--job-file", default="example_JD.txt", help="Job description in data/ (default: example_JD.txt)")
+    parser.add_argument("--cold-runs", type=int, default=3, help="Number of timed `main.py --fast` runs (default: 3, 0 to skip)")
+    parser.add_argument("--url", default=None, help="URL of a running server (default: start one)")
+    args = parser.parse_args()
+
+    if args.cold_runs:
+        timings = []
+        for _ in range(args.cold_runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, MAIN, args.job_file, "--fast"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            timings.append(time.perf_counter() - start)
+        print(f"Cold CLI run (main.py --fast): {min(timings) * 1000:.0f} ms best of {len(timings)}")
+
+    process = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        start = time.perf_counter()
+        process = start_server(port)
+        url = f"http://127.0.0.1:{port}"
+        print(f"Server started in {time.perf_counter() - start:.2f}s")
+    try:
+        latencies, errors, elapsed = run_clients(url, args.endpoint, args.job_file, args.clients, args.requests)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(f"/{args.endpoint}: {len(latencies)} requests from {args.clients} clients in {elapsed:.2f}s ({len(errors)} errors)")
+    if latencies:
+        print(f"Throughput: {len(latencies) / elapsed:.1f} requests/s")
+        print(f"Latency: p50 {percentile(latencies, 0.5) * 1000:.2f} ms, p95 {percentile(latencies, 0.95) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+    for error in errors[:5]:
+        print(f"Error: {error}")
+
+if __name__ == "__main__":
+    main()
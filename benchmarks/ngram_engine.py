@@ -0,0 +1,62 @@
+"""
+Time and peak memory of n-gram counting with the NumPy engine versus tuple Counters.
+
+Each run counts the unigrams, bigrams and trigrams of a synthetic token stream drawn from a
+Zipf-like vocabulary, then asks for the top 10 of each, as `main.py` does.
+
+Usage:
+    python benchmarks/ngram_engine.py [--sizes 10000 100000 1000000] [--vocabulary 20000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+from ngram_engine import NgramCounts, Vocabulary
+
+def synthetic_tokens(size, vocabulary_size, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.minimum(rng.zipf(1.2, size), vocabulary_size) - 1
+    return [f"token{token_id}" for token_id in ids.tolist()]
+
+def count_with_counter(tokens):
+    counts = [Counter(tokens)] + [Counter(zip(*(tokens[i:] for i in range(n)))) for n in (2, 3)]
+    return [c.most_common(10) for c in counts]
+
+def count_with_engine(tokens):
+    vocabulary = Vocabulary()
+    ids = vocabulary.encode(tokens)
+    counts = [NgramCounts.from_ids(vocabulary, ids, n, scalar_keys=True) for n in (1, 2, 3)]
+    return [c.most_common(10) for c in counts]
+
+def measure(function, tokens):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(tokens)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the NumPy n-gram engine with tuple Counters.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Token counts to benchmark")
+    parser.add_argument("--vocabulary", type=int, default=20_000, help="Maximum number of distinct tokens (default: 20000)")
+    args = parser.parse_args()
+
+    print(f"{'tokens':>10}  {'Counter s':>10}  {'engine s':>10}  {'Counter MB':>11}  {'engine MB':>10}")
+    for size in args.sizes:
+        tokens = synthetic_tokens(size, args.vocabulary)
+        expected, counter_seconds, counter_peak = measure(count_with_counter, tokens)
+        result, engine_seconds, engine_peak = measure(count_with_engine, tokens)
+        if result != expected:
+            sys.exit(f"Results differ for {size} tokens.")
+        print(f"{size:>10}  {counter_seconds:>10.3f}  {engine_seconds:>10.3f}  {counter_peak / 2**20:>11.1f}  {engine_peak / 2**20:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Prompt tokens and compaction time of the token-budgeted model input (`src/prompt_builder.py`)
+on a synthetic job description and CV database, at budgets from the full prompt down to a
+quarter of it.
+
+The prompt is the one `run_gpt_model` sends: the job description, the detailed report and the
+CV database in the template of config/cv_prompt.txt.
+
+Usage:
+    python benchmarks/prompt_builder.py [--bullets 40 400] [--fractions 1.0 0.75 0.5 0.25] [--repeat 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+from analyze import build_gpt_input
+from cv_processing import generate_detailed_report
+from cv_snapshot import load_cv_snapshot
+from file_utils import load_stopwords
+from prompt_builder import TokenCounter
+from synthetic import write_corpus
+from text_analysis import DocumentAnalysis
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark token-budgeted prompt compaction.")
+    parser.add_argument("--bullets", type=int, nargs="+", default=[40, 400], help="Bullet points in the CV database")
+    parser.add_argument("--fractions", type=float, nargs="+", default=[1.0, 0.75, 0.5, 0.25], help="Token budgets as fractions of the full prompt")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per budget (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    stopwords = load_stopwords(os.path.join(BASE_DIR, 'data', 'stopwords.txt'))
+    print(f"Tokenizer: {TokenCounter().name}\n")
+    print(f"{'bullets':>8}  {'budget':>7}  {'tokens before':>13}  {'tokens after':>12}  {'saved':>6}  {'ms':>8}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for bullets in args.bullets:
+            corpus = write_corpus(os.path.join(work_dir, str(bullets)), postings=1, words=600, experiences=max(bullets // 20, 1), bullets=bullets, seed=args.seed)
+            job_file = corpus["job_files"][0]
+            report_path = os.path.join(work_dir, f"detailed_report_{bullets}.txt")
+            snapshot = load_cv_snapshot(corpus["cv_database"])
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_detailed_report(DocumentAnalysis.from_file(job_file, stopwords), snapshot.data, output_path=report_path, keyword_index=snapshot.keyword_index)
+
+            full_tokens = TokenCounter().count(build_gpt_input(job_file, corpus["cv_database"], report_path)[0])
+            for fraction in args.fractions:
+                budget = int(full_tokens * fraction)
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        _, _, compaction = build_gpt_input(job_file, corpus["cv_database"], report_path, token_budget=budget, stopwords=stopwords)
+                    timings.append(time.perf_counter() - start)
+                saved = 1 - compaction.tokens_after / compaction.tokens_before
+                print(f"{bullets:>8}  {budget:>7}  {compaction.tokens_before:>13}  {compaction.tokens_after:>12}  {saved:>6.0%}  {statistics.median(timings) * 1000:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Benchmark suite of the pipeline's hot paths on a seeded synthetic corpus, with regression gates.
+
+`run` times micro benchmarks (text loading, n-gram counting, CV tailoring, the detailed report,
+the comparisons and the ATS check) on one synthetic posting and CV database, then end-to-end runs
+of the batch pipeline over many postings with a stub model client, so everything runs offline.
+Results are written as JSON. `compare` flags every benchmark whose median time grew by more than
+the threshold against a baseline, and exits with status 1 if any did.
+
+Usage:
+    python benchmarks/run_benchmarks.py run [--size small|medium|large] [--output output/benchmarks/latest.json] [--compare BASELINE]
+    python benchmarks/run_benchmarks.py compare BASELINE [CURRENT] [--threshold 0.2]
+
+Save a baseline with `run --output output/benchmarks/baseline.json`.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+from synthetic import write_corpus
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'output', 'benchmarks')
+
+# Corpus sizes: postings, words per posting, CV experience entries and bullets, postings run end to end
+SIZES = {
+    "small": {"postings": 20, "words": 400, "experiences": 5, "bullets": 40, "e2e_postings": 10},
+    "medium": {"postings": 1000, "words": 600, "experiences": 20, "bullets": 500, "e2e_postings": 100},
+    "large": {"postings": 100_000, "words": 600, "experiences": 100, "bullets": 5000, "e2e_postings": 500},
+}
+
+def timed(function, repeat):
+    """
+    Runs `function` `repeat` times with its prints discarded.
+
+    :return: The list of durations in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+def load_corpus(corpus_dir, params, seed):
+    """
+    Returns the synthetic corpus in `corpus_dir`, generating it unless a corpus with the same parameters is already there.
+    """
+    meta_path = os.path.join(corpus_dir, 'corpus.json')
+    meta = dict(params, seed=seed)
+    meta.pop("e2e_postings")
+    try:
+        with open(meta_path, 'r') as f:
+            existing = json.load(f)
+        if existing["meta"] == meta:
+            return existing["corpus"]
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    start = time.perf_counter()
+    corpus = write_corpus(corpus_dir, params["postings"], params["words"], params["experiences"], params["bullets"], seed)
+    print(f"Generated {params['postings']} postings in {time.perf_counter() - start:.1f}s")
+    with open(meta_path, 'w') as f:
+        json.dump({"meta": meta, "corpus": corpus}, f)
+    return corpus
+
+def micro_benchmarks(corpus, stopwords_file_path, work_dir, repeat):
+    from analyze import validate_ats_friendly_format
+    from cv_processing import compare_cv_and_job, compare_cv_to_jd, generate_custom_cv, generate_detailed_report
+    from cv_snapshot import load_cv_snapshot
+    from file_utils import load_cv_yaml, load_stopwords, load_text
+    from text_analysis import DocumentAnalysis, generate_ngrams
+
+    stopwords = load_stopwords(stopwords_file_path)
+    job_file = corpus["job_files"][0]
+    job = DocumentAnalysis.from_file(job_file, stopwords)
+    snapshot = load_cv_snapshot(corpus["cv_database"])
+    custom_cv_path = os.path.join(work_dir, 'custom_cv.txt')
+    report_path = os.path.join(work_dir, 'detailed_report.txt')
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_custom_cv(job, snapshot.data, output_path=custom_cv_path, keyword_index=snapshot.keyword_index)
+    cv = DocumentAnalysis.from_file(custom_cv_path, stopwords)
+    markdown_path = os.path.join(work_dir, 'cv.md')
+    with open(corpus["model_response"], 'r') as source, open(markdown_path, 'w') as target:
+        target.write(source.read())
+
+    def compare_to_report():
+        # Start from an empty report each time so the appended file does not grow across runs
+        open(report_path, 'w').close()
+        compare_cv_to_jd(job_analysis=job, cv_analysis=cv, output_path=report_path)
+
+    return {
+        "load_text": lambda: load_text(job_file),
+        "generate_ngrams": lambda: (generate_ngrams(job.words, 2), generate_ngrams(job.words, 3)),
+        "document_analysis": lambda: DocumentAnalysis.from_file(job_file, stopwords),
+        "cv_database_yaml": lambda: load_cv_yaml(corpus["cv_database"]),
+        "cv_snapshot": lambda: load_cv_snapshot(corpus["cv_database"]),
+        "generate_custom_cv": lambda: generate_custom_cv(job, snapshot.data, output_path=custom_cv_path, keyword_index=snapshot.keyword_index),
+        "generate_detailed_report": lambda: generate_detailed_report(job, snapshot.data, output_path=report_path, keyword_index=snapshot.keyword_index),
+        "compare_cv_and_job": lambda: compare_cv_and_job(job.ngrams, cv.ngrams),
+        "compare_cv_to_jd": compare_to_report,
+        "validate_ats_friendly_format": lambda: validate_ats_friendly_format(markdown_path),
+    }
+
+def corpus_ngrams(corpus, stopwords_file_path):
+    from file_utils import load_stopwords
+    from text_analysis import DocumentAnalysis
+    stopwords = load_stopwords(stopwords_file_path)
+    for job_file in corpus["job_files"]:
+        DocumentAnalysis.from_file(job_file, stopwords)
+
+def end_to_end(corpus, stopwords_file_path, work_dir, postings):
+    """
+    Runs the batch pipeline (analysis, tailored CV, detailed report, comparison) on `postings`
+    postings in this process's pool, then generates their CVs with the stub model client.
+
+    :return: A dictionary of stage durations in seconds.
+    """
+    from batch import generate_batch_cvs, run_batch
+    from llm_client import create_async_client
+
+    output_dir = os.path.join(work_dir, 'batch')
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results, failures, _ = run_batch(corpus["job_files"][:postings], output_dir, stopwords_file_path, corpus["cv_database"], workers=1, use_cache=False)
+        analysis_seconds = time.perf_counter() - start
+        if failures:
+            raise RuntimeError(f"{len(failures)} postings failed, e.g. {failures[0]}")
+
+        start = time.perf_counter()
+        _, failures, _ = generate_batch_cvs(results, corpus["cv_database"], "stub", create_async_client(f"stub:{corpus['model_response']}"), max_concurrency=8)
+        model_seconds = time.perf_counter() - start
+        if failures:
+            raise RuntimeError(f"{len(failures)} model requests failed, e.g. {failures[0]}")
+    return {"e2e_batch_analysis": analysis_seconds, "e2e_batch_model": model_seconds}
+
+def summarize(timings, **params):
+    return {"median_s": statistics.median(timings), "min_s": min(timings), "runs": len(timings), **params}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    params = dict(SIZES[args.size])
+    for name in params:
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    stopwords_file_path = os.path.join(BASE_DIR, 'data', 'stopwords.txt')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus = load_corpus(args.corpus_dir or os.path.join(temp_dir, 'corpus'), params, args.seed)
+        work_dir = os.path.join(temp_dir, 'work')
+        os.makedirs(work_dir)
+
+        results = {}
+        for name, function in micro_benchmarks(corpus, stopwords_file_path, work_dir, args.repeat).items():
+            results[name] = summarize(timed(function, args.repeat), kind="micro")
+            print(f"{name:<30} {results[name]['median_s'] * 1000:10.3f} ms")
+
+        results["corpus_ngrams"] = summarize(timed(lambda: corpus_ngrams(corpus, stopwords_file_path), 1), kind="corpus", postings=params["postings"])
+        print(f"{'corpus_ngrams':<30} {results['corpus_ngrams']['median_s'] * 1000:10.3f} ms ({params['postings']} postings)")
+
+        e2e_postings = min(params["e2e_postings"], params["postings"])
+        stages = [end_to_end(corpus, stopwords_file_path, os.path.join(work_dir, f"e2e_{run}"), e2e_postings) for run in range(args.e2e_repeat)]
+        for name in stages[0]:
+            results[name] = summarize([stage[name] for stage in stages], kind="e2e", postings=e2e_postings)
+            print(f"{name:<30} {results[name]['median_s'] * 1000:10.3f} ms ({e2e_postings} postings)")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "size": args.size,
+            "seed": args.seed,
+            "params": params,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        return compare_reports(args.compare, args.output, args.threshold)
+    return 0
+
+def compare_reports(baseline_path, current_path, threshold):
+    """
+    Prints the change of every benchmark's median time against the baseline.
+
+    :return: 1 if any benchmark is slower than the baseline by more than `threshold` (a fraction), else 0.
+    """
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    with open(current_path, 'r') as f:
+        current = json.load(f)
+    if baseline["meta"].get("params") != current["meta"].get("params"):
+        print("Warning: The baseline was run on a different corpus size; timings may not be comparable.")
+
+    regressions = []
+    print(f"\n{'Benchmark':<30} {'Baseline ms':>12} {'Current ms':>12} {'Change':>9}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            print(f"{name:<30} {'-':>12} {result['median_s'] * 1000:12.3f} {'new':>9}")
+            continue
+        before, after = baseline["results"][name]["median_s"], result["median_s"]
+        change = after / before - 1 if before > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} {before * 1000:12.3f} {after * 1000:12.3f} {change:+9.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmarks regressed by more than {threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions above {threshold:.0%}.")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline's hot paths and gate regressions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and save the results as JSON")
+    run_parser.add_argument("--size", choices=SIZES, default="small", help="Corpus size preset (default: small)")
+    run_parser.add_argument("--postings", type=int, default=None, help="Override the number of synthetic postings")
+    run_parser.add_argument("--words", type=int, default=None, help="Override the words per posting")
+    run_parser.add_argument("--experiences", type=int, default=None, help="Override the experience entries of the CV database")
+    run_parser.add_argument("--bullets", type=int, default=None, help="Override the bullet points of the CV database")
+    run_parser.add_argument("--e2e-postings", dest="e2e_postings", type=int, default=None, help="Override the postings run end to end")
+    run_parser.add_argument("--seed", type=int, default=0, help="Random seed of the corpus (default: 0)")
+    run_parser.add_argument("--repeat", type=int, default=20, help="Runs per micro benchmark (default: 20)")
+    run_parser.add_argument("--e2e-repeat", dest="e2e_repeat", type=int, default=3, help="End-to-end runs (default: 3)")
+    run_parser.add_argument("--corpus-dir", dest="corpus_dir", default=None, help="Keep the corpus in this folder and reuse it across runs (default: a temporary folder)")
+    run_parser.add_argument("--output", default=os.path.join(RESULTS_DIR, 'latest.json'), help="Results file (default: output/benchmarks/latest.json)")
+    run_parser.add_argument("--compare", metavar="BASELINE", default=None, help="Compare the results with this baseline afterwards")
+    run_parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown flagged as a regression, as a fraction (default: 0.2)")
+
+    compare_parser = commands.add_parser("compare", help="Compare results with a baseline")
+    compare_parser.add_argument("baseline", help="Baseline results file")
+    compare_parser.add_argument("current", nargs="?", default=os.path.join(RESULTS_DIR, 'latest.json'), help="Results file to check (default: output/benchmarks/latest.json)")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown flagged as a regression, as a fraction (default: 0.2)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        sys.exit(run(args))
+    sys.exit(compare_reports(args.baseline, args.current, args.threshold))
+
+if __name__ == "__main__":
+    main()
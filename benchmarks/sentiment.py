@@ -0,0 +1,58 @@
+"""
+Sentences/sec of the sentence-level sentiment engine versus one TextBlob call per whole text.
+
+The corpus is made of synthetic postings assembled from shuffled lines of data/example_JD.txt,
+half of which get a posting-specific word so that they are new sentences.
+The TextBlob baseline scores the lowercased, punctuation-stripped text as the pipeline used to;
+the engine segments the raw text and scores every sentence.
+
+Usage:
+    python benchmarks/sentiment.py [--documents 500]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+from file_utils import normalize_text
+from sentiment import analyze_text_sentiment, load_lexicon, split_sentences
+
+def synthetic_postings(count, seed=0):
+    with open(os.path.join(BASE_DIR, 'data', 'example_JD.txt'), 'r') as f:
+        lines = f.read().splitlines()
+    rng = random.Random(seed)
+    return [
+        "\n".join(f"{line} (ref{index})" if line and rng.random() < 0.5 else line for line in rng.sample(lines, len(lines)))
+        for index in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sentence-level sentiment scoring.")
+    parser.add_argument("--documents", type=int, default=500, help="Number of postings (default: 500)")
+    args = parser.parse_args()
+
+    postings = synthetic_postings(args.documents)
+    sentences = sum(len(split_sentences(posting)) for posting in postings)
+    print(f"{args.documents} postings, {sentences} sentences")
+
+    from textblob import TextBlob
+    TextBlob("warm up").sentiment
+    start = time.perf_counter()
+    for posting in postings:
+        TextBlob(normalize_text(posting)).sentiment
+    elapsed = time.perf_counter() - start
+    print(f"{'TextBlob, whole text':>24}: {sentences / elapsed:9.0f} sentences/s (one score per posting)")
+
+    load_lexicon()
+    start = time.perf_counter()
+    for posting in postings:
+        analyze_text_sentiment(posting)
+    elapsed = time.perf_counter() - start
+    print(f"{'Sentence engine':>24}: {sentences / elapsed:9.0f} sentences/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Pool dispatch of a tokenized corpus: pickled token lists versus a shared memory corpus.
+
+Both paths compute the top 10 bigrams of every document in worker processes. The pickled path
+sends each chunk of documents as lists of strings; the shared path sends a CorpusHandle and the
+workers attach to the token id arrays zero-copy.
+
+Usage:
+    python benchmarks/shared_corpus.py [--documents 2000] [--tokens 5000] [--workers 4]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+from ngram_engine import NgramCounts
+from shared_corpus import SharedCorpus, document_chunks, top_ngrams_task
+
+def synthetic_corpus(documents, tokens, vocabulary_size=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    words = [f"word{i}" for i in range(vocabulary_size)]
+    return [[words[i] for i in (np.minimum(rng.zipf(1.3, tokens), vocabulary_size) - 1).tolist()] for _ in range(documents)]
+
+def _pickled_task(documents, n, k):
+    return [NgramCounts.from_tokens(tokens, n).most_common(k) for tokens in documents]
+
+def run_pickled(corpus, workers, n=2, k=10):
+    chunks = [[corpus[i] for i in indices] for indices in document_chunks(len(corpus), workers)]
+    sent = sum(len(pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL)) for chunk in chunks)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = [top for result in executor.map(_pickled_task, chunks, [n] * len(chunks), [k] * len(chunks)) for top in result]
+    return results, sent
+
+def run_shared(corpus, workers, n=2, k=10):
+    with SharedCorpus.create(corpus) as shared:
+        chunks = [list(indices) for indices in document_chunks(len(shared), workers)]
+        sent = sum(len(pickle.dumps((shared.handle, chunk, n, k), protocol=pickle.HIGHEST_PROTOCOL)) for chunk in chunks)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(top_ngrams_task, shared.handle, chunk, n, k) for chunk in chunks]
+            results = [top for future in futures for _, top in future.result()]
+    return results, sent
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pickled-list dispatch with a shared memory corpus.")
+    parser.add_argument("--documents", type=int, default=2000, help="Number of documents (default: 2000)")
+    parser.add_argument("--tokens", type=int, default=5000, help="Tokens per document (default: 5000)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.documents, args.tokens)
+    timings = {}
+    for label, run in (("pickled lists", run_pickled), ("shared memory", run_shared)):
+        start = time.perf_counter()
+        results, sent = run(corpus, args.workers)
+        timings[label] = (results, time.perf_counter() - start, sent)
+
+    if timings["pickled lists"][0] != timings["shared memory"][0]:
+        sys.exit("Results differ between the two dispatch methods.")
+    print(f"{args.documents} documents x {args.tokens} tokens, {args.workers} workers")
+    for label, (_, seconds, sent) in timings.items():
+        print(f"{label:>14}: {seconds:6.2f}s, {sent / 2**20:8.2f} MB pickled to workers")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Top-k cosine similarity search over a week's worth of postings.
+
+Indexes synthetic postings as unigram, bigram and trigram TF-IDF vectors, then measures the
+query latency of the sparse index against scoring every posting with Python dictionaries.
+
+Usage:
+    python benchmarks/similarity.py [--documents 5000] [--tokens 400] [--top 50]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+from similarity import SimilarityIndex, ngram_features
+from text_analysis import DocumentAnalysis
+
+def synthetic_documents(count, tokens, rng, vocabulary_size=20_000):
+    ids = np.minimum(rng.zipf(1.3, (count, tokens)), vocabulary_size) - 1
+    return [DocumentAnalysis.from_text(" ".join(f"term{i}" for i in row), set()) for row in ids.tolist()]
+
+def dictionary_top_k(index, feature_names, query, k):
+    # Reference implementation: one dictionary dot product per posting, then a full sort
+    def vector(features):
+        unseen_idf = math.log(1 + len(index)) + 1
+        weights = {f: c * (index.idf[index.feature_ids[f]] if f in index.feature_ids else unseen_idf) for f, c in features.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {f: w / norm for f, w in weights.items()}
+    query_vector = vector(query)
+    scores = []
+    for row, name in enumerate(index.names):
+        start, end = index.indptr[row], index.indptr[row + 1]
+        document = dict(zip((feature_names[i] for i in index.indices[start:end].tolist()), index.data[start:end].tolist()))
+        scores.append((sum(w * document.get(f, 0.0) for f, w in query_vector.items()), name))
+    scores.sort(key=lambda pair: pair[0], reverse=True)
+    return scores[:k]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark top-k similarity search.")
+    parser.add_argument("--documents", type=int, default=5000, help="Number of postings (default: 5000)")
+    parser.add_argument("--tokens", type=int, default=400, help="Tokens per posting (default: 400)")
+    parser.add_argument("--top", type=int, default=50, help="Number of matches per query (default: 50)")
+    parser.add_argument("--queries", type=int, default=20, help="Number of queries timed (default: 20)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    features = [ngram_features(document) for document in synthetic_documents(args.documents, args.tokens, rng)]
+    start = time.perf_counter()
+    index = SimilarityIndex(range(args.documents), features)
+    print(f"Indexed {len(index)} postings ({len(index.feature_ids)} n-grams) in {time.perf_counter() - start:.2f}s")
+
+    queries = [ngram_features(document) for document in synthetic_documents(args.queries, args.tokens, rng)]
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.top_k(query, args.top)
+        timings.append(time.perf_counter() - start)
+    print(f"Sparse index: {np.median(timings) * 1000:.2f} ms per top-{args.top} query (median of {len(queries)})")
+
+    feature_names = list(index.feature_ids)
+    start = time.perf_counter()
+    expected = dictionary_top_k(index, feature_names, queries[0], args.top)
+    print(f"Dictionary scan: {(time.perf_counter() - start) * 1000:.2f} ms for one query")
+    found = index.top_k(queries[0], args.top)
+    if [name for name, _ in found] != [name for _, name in expected]:
+        print("Warning: rankings differ (ties may be ordered differently).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Build time and throughput of the Aho-Corasick skill matcher (`src/skill_matcher.py`) as the
+skills taxonomy grows, versus scanning the job description once per phrase.
+
+The taxonomy mixes real skill names from `benchmarks/synthetic.py` with generated one- to
+four-word phrases; the job descriptions are synthetic postings.
+
+Usage:
+    python benchmarks/skill_matcher.py [--phrases 1000 10000 50000 200000] [--postings 200] [--naive-limit 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+from skill_matcher import SkillMatcher, phrase_tokens
+from synthetic import FILLER, NOUNS, SKILLS, VERBS, generate_job_description
+
+def synthetic_taxonomy(rng, size):
+    words = SKILLS + NOUNS + FILLER + VERBS + [f"tool{i}" for i in range(5000)]
+    phrases = set(SKILLS)
+    while len(phrases) < size:
+        phrases.add(" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))))
+    return sorted(phrases)
+
+def count_naive(phrases, tokens):
+    # One scan of the padded text per phrase, the cost the automaton avoids
+    text = f" {' '.join(tokens)} "
+    counts = {}
+    for phrase in phrases:
+        needle = f" {' '.join(phrase_tokens(phrase))} "
+        count, start = 0, text.find(needle)
+        while start >= 0:
+            count += 1
+            start = text.find(needle, start + 1)
+        if count:
+            counts[phrase] = count
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the skill matcher against per-phrase scans.")
+    parser.add_argument("--phrases", type=int, nargs="+", default=[1000, 10_000, 50_000, 200_000], help="Taxonomy sizes to benchmark")
+    parser.add_argument("--postings", type=int, default=200, help="Job descriptions matched per taxonomy size (default: 200)")
+    parser.add_argument("--naive-limit", type=int, default=10_000, help="Largest taxonomy also timed with per-phrase scans (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Normalized like load_text, which phrase_tokens mirrors
+    documents = [list(phrase_tokens(generate_job_description(rng, 600))) for _ in range(args.postings)]
+    tokens_total = sum(len(tokens) for tokens in documents)
+    print(f"{args.postings} postings, {tokens_total} tokens\n")
+    print(f"{'phrases':>8}  {'build s':>8}  {'tokens/s':>11}  {'ms/posting':>11}  {'naive ms/posting':>17}")
+    for size in args.phrases:
+        taxonomy = synthetic_taxonomy(rng, size)
+        start = time.perf_counter()
+        matcher = SkillMatcher(SKILLS[:20], taxonomy)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = [matcher.count(tokens) for tokens in documents]
+        match_seconds = time.perf_counter() - start
+
+        naive = "-"
+        if size <= args.naive_limit:
+            sample = documents[:10]
+            start = time.perf_counter()
+            expected = [count_naive(matcher.names, tokens) for tokens in sample]
+            naive = f"{(time.perf_counter() - start) / len(sample) * 1000:.2f}"
+            if [dict(counts) for counts in results[:len(sample)]] != expected:
+                sys.exit(f"Matches differ from per-phrase scans with {size} phrases.")
+        print(f"{size:>8}  {build_seconds:>8.2f}  {tokens_total / match_seconds:>11,.0f}  {match_seconds / len(documents) * 1000:>11.2f}  {naive:>17}")
+
+if __name__ == "__main__":
+    main()
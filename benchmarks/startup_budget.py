@@ -0,0 +1,73 @@
+"""
+Cold-start budget for the CLI.
+
+Imports `main` in fresh interpreters with `python -X importtime`, reports the heaviest modules and
+fails (exit code 1) when the median cumulative import time exceeds the budget, or when a heavy
+dependency that should be deferred to the stage using it is imported eagerly.
+
+Usage:
+    python benchmarks/startup_budget.py [--budget-ms 200] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# Importing main costs about 90 ms on a laptop-class machine; the budget leaves room for noise
+DEFAULT_BUDGET_MS = 200
+
+# Dependencies that must only be imported by the stage that needs them
+DEFERRED_MODULES = ["matplotlib", "wordcloud", "openai", "markdown", "docx", "textblob", "nltk"]
+
+def measure_import(module):
+    """
+    Imports `module` in a fresh interpreter and returns {imported module: (self us, cumulative us)}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the cold-start import time of the CLI against a budget.")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help=f"Cold-start budget in milliseconds (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to measure (default: 5)")
+    parser.add_argument("--top", type=int, default=10, help="Number of heaviest modules to report (default: 10)")
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    totals_ms = [timings[args.module][1] / 1000 for timings in runs]
+    median_ms = statistics.median(totals_ms)
+
+    print(f"Cold-start import of '{args.module}': median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("\nHeaviest modules (cumulative, last run):")
+    heaviest = sorted(runs[-1].items(), key=lambda item: item[1][1], reverse=True)
+    for name, (_, cumulative_us) in [item for item in heaviest if item[0] != args.module][:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    eager = sorted({name.split(".")[0] for name in runs[-1]} & set(DEFERRED_MODULES))
+    if eager:
+        failures.append(f"heavy dependencies imported eagerly: {', '.join(eager)}")
+    if median_ms > args.budget_ms:
+        failures.append(f"median import time {median_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+
+    if failures:
+        for failure in failures:
+            print(f"\nFAIL: {failure}")
+        sys.exit(1)
+    print("\nOK: cold start within budget.")
+
+if __name__ == "__main__":
+    main()
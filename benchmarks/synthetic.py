@@ -0,0 +1,173 @@
+"""
+Seeded generator of synthetic job descriptions and CV databases for the benchmarks.
+
+Postings follow the layout of data/example_JD.txt (header lines, an intro, then bulleted
+responsibilities, qualifications and perks) and draw their words from a Zipf-like distribution
+over a shared vocabulary of skills and filler, so n-gram counts, keyword overlaps and sentence
+counts behave like real postings. The same seed always produces the same corpus.
+
+Usage:
+    python benchmarks/synthetic.py OUTPUT_DIR [--postings 1000] [--words 500] [--experiences 20] [--bullets 40] [--seed 0]
+"""
+import argparse
+import itertools
+import os
+import random
+
+import yaml
+
+SKILLS = [
+    "python", "sql", "spark", "airflow", "kafka", "aws", "azure", "gcp", "docker", "kubernetes",
+    "terraform", "pandas", "pyspark", "snowflake", "postgresql", "bigquery", "dbt", "git", "linux",
+    "tableau", "power bi", "machine learning", "deep learning", "pytorch", "tensorflow", "scikit-learn",
+    "data modeling", "etl", "ci/cd", "github actions", "rest apis", "microservices", "java", "scala",
+    "go", "rust", "typescript", "react", "node.js", "graphql", "redis", "mongodb", "elasticsearch",
+    "data governance", "feature engineering", "mlops", "statistics", "a/b testing", "nlp", "computer vision",
+]
+VERBS = [
+    "design", "build", "maintain", "optimize", "develop", "implement", "collaborate", "lead", "automate",
+    "deploy", "monitor", "migrate", "analyze", "improve", "scale", "own", "support", "review", "mentor",
+]
+NOUNS = [
+    "pipelines", "platforms", "services", "models", "dashboards", "systems", "workflows", "datasets",
+    "infrastructure", "processes", "teams", "stakeholders", "products", "architectures", "reports",
+    "integrations", "experiments", "features", "tools", "applications",
+]
+FILLER = [
+    "data", "team", "experience", "work", "business", "customers", "quality", "performance", "security",
+    "scalable", "efficient", "reliable", "cloud", "real-time", "distributed", "cross-functional",
+    "agile", "environment", "solutions", "insights", "decisions", "strong", "excellent", "ability",
+    "years", "knowledge", "understanding", "familiarity", "proficiency", "large", "complex", "modern",
+]
+PERKS = [
+    "Competitive salary & stock options.", "Fully remote work with flexible hours.",
+    "Annual learning stipend for certifications and courses.", "Team retreats & hackathons.",
+    "Generous parental leave.", "Health, dental and vision insurance.", "Home office budget.",
+]
+TITLES = ["Data Engineer", "Machine Learning Engineer", "Data Scientist", "Backend Engineer", "Analytics Engineer", "Platform Engineer"]
+COMPANIES = ["Acme Analytics", "Globex Data", "Initech Cloud", "Umbrella AI", "Hooli Systems", "Vandelay Insights"]
+
+# Cumulative rank weights of each word list, computed once
+_cumulative_weights = {}
+
+def _zipf_choice(rng, words, exponent=1.1):
+    # Rank-weighted choice: the first words of each list are the most frequent, like real postings
+    key = (id(words), exponent)
+    if key not in _cumulative_weights:
+        _cumulative_weights[key] = list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(len(words))))
+    return rng.choices(words, cum_weights=_cumulative_weights[key])[0]
+
+def _sentence(rng, length):
+    words = [_zipf_choice(rng, VERBS).capitalize()]
+    while len(words) < length:
+        pool = rng.choice((SKILLS, NOUNS, FILLER, FILLER))
+        words.append(_zipf_choice(rng, pool))
+    return " ".join(words) + "."
+
+def generate_job_description(rng, words=500):
+    """
+    Returns the text of one synthetic posting of about `words` words.
+    """
+    company = rng.choice(COMPANIES)
+    lines = [f"Company: {company}", f"Title: {rng.choice(TITLES)}", "Location: Remote / Hybrid", "", "About Us", ""]
+    lines.append(" ".join(_sentence(rng, rng.randint(8, 16)) for _ in range(3)).replace(".", f" at {company}.", 1))
+    count = sum(len(line.split()) for line in lines)
+    sections = ["Responsibilities", "Qualifications", "Bonus Points"]
+    section = 0
+    while count < words:
+        if section < len(sections) and (section == 0 or rng.random() < 0.15):
+            lines += ["", sections[section]]
+            section += 1
+        sentence = _sentence(rng, rng.randint(6, 14))
+        lines.append(f"\t•\t{sentence}")
+        count += len(sentence.split())
+    lines += ["", "Perks & Benefits"] + [f"\t•\t{perk}" for perk in rng.sample(PERKS, 3)]
+    return "\n".join(lines)
+
+def generate_cv_database(rng, experiences=20, bullets=40):
+    """
+    Returns a CV database (the structure of config/cv_database_template.yaml) with `experiences`
+    entries holding `bullets` bullet points in total.
+    """
+    per_experience = [bullets // experiences + (1 if i < bullets % experiences else 0) for i in range(experiences)]
+    return {
+        "name": "Jane Doe",
+        "summary": [_sentence(rng, 20)],
+        "experience": [{
+            "title": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "location": "Remote",
+            "start_date": f"{2024 - i}-01",
+            "end_date": "Present" if i == 0 else f"{2025 - i}-01",
+            "domain": rng.sample(FILLER, 2),
+            "description": [
+                f"{_sentence(rng, rng.randint(8, 18))[:-1]}, reducing processing time by {rng.randint(10, 90)}%."
+                for _ in range(count)
+            ],
+            "skills": rng.sample(SKILLS, 6),
+        } for i, count in enumerate(per_experience)],
+        "education": [{
+            "degree": "MSc Computer Science",
+            "institution": "Example University",
+            "location": "Remote",
+            "graduation_year": 2015,
+            "thesis": _sentence(rng, 12),
+            "relevant_coursework": rng.sample(SKILLS, 4),
+        }],
+        "skills": {f"category{i}": rng.sample(SKILLS, 8) for i in range(5)},
+        "narrative_blurbs": {f"category{i}": _sentence(rng, 30) for i in range(5)},
+        "projects": {
+            "work": [{"name": f"Project {i}", "year": 2020 + i % 5, "description": _sentence(rng, 25)} for i in range(max(experiences // 2, 1))],
+            "personal": [{"name": f"Side Project {i}", "year": 2018 + i % 5, "description": _sentence(rng, 25)} for i in range(3)],
+        },
+        "languages": ["English (native)", "Spanish (professional)"],
+    }
+
+def generate_model_response(rng):
+    """
+    Returns a canned model response in the format `analyze.parse_model_response` expects.
+    """
+    sections = "\n".join(f"## {heading}\n- {_sentence(rng, 12)}" for heading in ("Experience", "Education", "Skills", "Projects"))
+    return f"# Jane Doe\n{sections}\n\nCover Letter\nDear hiring team,\n{_sentence(rng, 40)}\n"
+
+def write_corpus(directory, postings=1000, words=500, experiences=20, bullets=40, seed=0):
+    """
+    Writes `postings` job descriptions (jobs/jd_<n>.txt), a CV database (cv_database.yaml) and a
+    canned model response (model_response.txt) to `directory`.
+
+    :return: A dictionary with the "jobs_dir", "job_files", "cv_database" and "model_response" paths.
+    """
+    rng = random.Random(seed)
+    jobs_dir = os.path.join(directory, 'jobs')
+    os.makedirs(jobs_dir, exist_ok=True)
+    job_files = []
+    for i in range(postings):
+        path = os.path.join(jobs_dir, f"jd_{i:06d}.txt")
+        with open(path, 'w') as f:
+            f.write(generate_job_description(rng, words))
+        job_files.append(path)
+
+    cv_database = os.path.join(directory, 'cv_database.yaml')
+    with open(cv_database, 'w') as f:
+        yaml.safe_dump(generate_cv_database(rng, experiences, bullets), f, sort_keys=False, allow_unicode=True)
+
+    model_response = os.path.join(directory, 'model_response.txt')
+    with open(model_response, 'w') as f:
+        f.write(generate_model_response(rng))
+    return {"jobs_dir": jobs_dir, "job_files": job_files, "cv_database": cv_database, "model_response": model_response}
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic corpus of job descriptions and a CV database.")
+    parser.add_argument("output_dir", help="Folder to write the corpus to")
+    parser.add_argument("--postings", type=int, default=1000, help="Number of job descriptions (default: 1000)")
+    parser.add_argument("--words", type=int, default=500, help="Approximate words per job description (default: 500)")
+    parser.add_argument("--experiences", type=int, default=20, help="Experience entries in the CV database (default: 20)")
+    parser.add_argument("--bullets", type=int, default=40, help="Bullet points across all experience entries (default: 40)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args()
+
+    corpus = write_corpus(args.output_dir, args.postings, args.words, args.experiences, args.bullets, args.seed)
+    print(f"Wrote {len(corpus['job_files'])} job descriptions to {corpus['jobs_dir']} and a CV database with {args.bullets} bullets to {corpus['cv_database']}")
+
+if __name__ == "__main__":
+    main()
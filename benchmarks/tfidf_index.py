@@ -0,0 +1,65 @@
+"""
+Ingest, open and lookup times of the TF-IDF index at corpus scale.
+
+Builds an index of synthetic postings in a temporary folder, appending in batches, then measures
+reopening it, appending a single posting, and computing the IDF weights of one job description.
+
+Usage:
+    python benchmarks/tfidf_index.py [--documents 100000] [--tokens 200] [--batch 10000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+from tfidf_index import TfidfIndex
+
+def synthetic_postings(count, tokens, rng, vocabulary_size=50_000):
+    ids = np.minimum(rng.zipf(1.3, (count, tokens)), vocabulary_size) - 1
+    return [[f"term{token_id}" for token_id in row] for row in ids.tolist()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the TF-IDF index.")
+    parser.add_argument("--documents", type=int, default=100_000, help="Number of postings to ingest (default: 100000)")
+    parser.add_argument("--tokens", type=int, default=200, help="Tokens per posting (default: 200)")
+    parser.add_argument("--batch", type=int, default=10_000, help="Postings per append (default: 10000)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp(prefix="tfidf_bench_")
+    try:
+        index = TfidfIndex(directory)
+        ingest_seconds = 0.0
+        for start in range(0, args.documents, args.batch):
+            postings = synthetic_postings(min(args.batch, args.documents - start), args.tokens, rng)
+            begin = time.perf_counter()
+            index.add_documents((tokens, f"posting-{start + i}") for i, tokens in enumerate(postings))
+            ingest_seconds += time.perf_counter() - begin
+        print(f"Ingested {len(index)} postings ({len(index.terms)} terms, {index.nonzeros} non-zeros) in {ingest_seconds:.2f}s")
+
+        begin = time.perf_counter()
+        index = TfidfIndex(directory)
+        print(f"Open: {(time.perf_counter() - begin) * 1000:.1f} ms")
+
+        posting = synthetic_postings(1, args.tokens, rng)[0] + [f"unique{i}" for i in range(5)]
+        begin = time.perf_counter()
+        index.add_document(posting, "single")
+        print(f"Append one posting: {(time.perf_counter() - begin) * 1000:.1f} ms")
+
+        job_words = synthetic_postings(1, 400, rng)[0]
+        timings = []
+        for _ in range(20):
+            begin = time.perf_counter()
+            index.term_weights(job_words)
+            timings.append(time.perf_counter() - begin)
+        print(f"IDF weights of a 400-word job description: {np.median(timings) * 1000:.2f} ms (median of 20)")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
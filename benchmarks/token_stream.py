@@ -0,0 +1,74 @@
+"""
+Time and peak memory of counting the n-grams of a large text dump by streaming it in chunks
+(`src/token_stream.py`) versus loading and tokenizing it whole (`DocumentAnalysis.from_file`).
+
+The dump concatenates synthetic postings from `benchmarks/synthetic.py`, drawn from a pool, so
+the vocabulary stays the same size while the file grows. Both paths must give identical counts.
+
+Usage:
+    python benchmarks/token_stream.py [--megabytes 5 20 50] [--pool 500] [--chunk-size 1048576]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
+
+from file_utils import load_stopwords
+from synthetic import generate_job_description
+from text_analysis import DocumentAnalysis
+from token_stream import count_file_ngrams
+
+def write_dump(path, megabytes, pool_size, seed=0):
+    rng = random.Random(seed)
+    pool = [generate_job_description(rng, rng.randint(300, 900)) for _ in range(pool_size)]
+    size = 0
+    with open(path, 'w') as f:
+        while size < megabytes * 2**20:
+            posting = rng.choice(pool) + "\n\n"
+            f.write(posting)
+            size += len(posting)
+
+def count_in_memory(path, stopwords, chunk_size):
+    analysis = DocumentAnalysis.from_file(path, stopwords)
+    return [analysis.unigrams, analysis.bigrams, analysis.trigrams]
+
+def count_streaming(path, stopwords, chunk_size):
+    counter = count_file_ngrams(path, stopwords, chunk_size=chunk_size)
+    return [counter.counts(n, scalar_keys=(n == 1)) for n in (1, 2, 3)]
+
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return [counts.items() for counts in result], seconds, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streaming n-gram counting with loading the whole file.")
+    parser.add_argument("--megabytes", type=int, nargs="+", default=[5, 20, 50], help="Dump sizes to benchmark")
+    parser.add_argument("--pool", type=int, default=500, help="Distinct postings the dump is drawn from (default: 500)")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="Characters read at a time by the streaming path (default: 1048576)")
+    args = parser.parse_args()
+
+    stopwords = load_stopwords(os.path.join(BASE_DIR, 'data', 'stopwords.txt'))
+    print(f"{'MB':>6}  {'in-memory s':>12}  {'streaming s':>12}  {'in-memory MB':>13}  {'streaming MB':>13}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for megabytes in args.megabytes:
+            path = os.path.join(temp_dir, f"dump_{megabytes}.txt")
+            write_dump(path, megabytes, args.pool)
+            expected, memory_seconds, memory_peak = measure(count_in_memory, path, stopwords, args.chunk_size)
+            result, stream_seconds, stream_peak = measure(count_streaming, path, stopwords, args.chunk_size)
+            if result != expected:
+                sys.exit(f"Counts differ for the {megabytes} MB dump.")
+            print(f"{megabytes:>6}  {memory_seconds:>12.2f}  {stream_seconds:>12.2f}  {memory_peak / 2**20:>13.1f}  {stream_peak / 2**20:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,17 @@
 import argparse
-import string
-from collections import Counter
-from nltk import ngrams
-from textblob import TextBlob
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-from tabulate import tabulate
-import yaml
-import pprint
 import os
-from openai import OpenAI
-import markdown
-from docx import Document
-import subprocess
-from datetime import datetime
+# The shared helpers live in their own light modules and are re-exported here for existing callers.
+# Heavy dependencies (openai, matplotlib, wordcloud, textblob) are imported by the stage that uses them.
+from file_utils import load_stopwords, load_text, load_cv_yaml
+from text_analysis import analyze_sentiment, generate_ngrams, find_context, DocumentAnalysis
+from cv_processing import load_cv_text, extract_cv_ngrams, compare_cv_and_job, compare_cv_to_jd, generate_custom_cv
+from cv_snapshot import load_cv_snapshot
+from prompt_builder import REFERENCE_SEPARATOR, TokenCounter, compact_prompt, log_prompt_tokens, print_compaction
+from llm_client import create_client, generate_response
+from llm_stream import COVER_LETTER_LINE, StreamingCVWriter
+from artifact_store import ArtifactStore, detach
+from profiling import count, span, traced
+from visualization import plot_wordcloud_and_frequencies
 
 # Define base directories for the project
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -21,199 +19,18 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 CONFIG_DIR = os.path.join(BASE_DIR, 'config')
 OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
 CV_DIR = os.path.join(BASE_DIR, 'cv')
-ARCHIVE_DIR = os.path.join(BASE_DIR, 'archive')
 
-# Update file paths to use the new directory structure
-def load_stopwords(file_path=os.path.join(DATA_DIR, 'stopwords.txt')):
-    try:
-        with open(file_path, 'r') as file:
-            stopwords = set(line.strip().lower() for line in file)
-        return stopwords
-    except FileNotFoundError:
-        print(f"Warning: Stopwords file '{file_path}' not found. Continuing without stopwords.")
-        return set()
-
-# Function to load the job description text
-def load_text(file_path):
-    try:
-        with open(file_path, 'r') as file:
-            text = file.read().lower().translate(str.maketrans('', '', string.punctuation))
-        return text
-    except FileNotFoundError:
-        print(f"Error: Job description file '{file_path}' not found.")
-        exit(1)
-
-# Sentiment analysis function
-def analyze_sentiment(text):
-    blob = TextBlob(text)
-    return blob.sentiment
-
-# Bigram and trigram generator
-def generate_ngrams(words, n):
-    return Counter(ngrams(words, n))
-
-def plot_wordcloud_and_frequencies(unigrams, bigrams, text):
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))  # Three side-by-side plots
-
-    # Word Cloud
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
-    axes[0].imshow(wordcloud, interpolation='bilinear')
-    axes[0].axis('off')  # Hide axes
-    axes[0].set_title("Word Cloud")
-
-    # Unigrams Bar Chart
-    top_unigrams = unigrams.most_common(10)
-    words_u, counts_u = zip(*top_unigrams)
-    axes[1].bar(words_u, counts_u, color='tab:blue')
-    axes[1].set_title("Top Unigrams")
-    axes[1].set_xlabel("Words")
-    axes[1].set_ylabel("Frequency")
-    axes[1].tick_params(axis='x', rotation=45)
-
-    # Bigrams Bar Chart
-    top_bigrams = bigrams.most_common(10)
-    words_b, counts_b = zip(*[(" ".join(phrase), count) for phrase, count in top_bigrams])
-    axes[2].bar(words_b, counts_b, color='tab:green')
-    axes[2].set_title("Top Bigrams")
-    axes[2].set_xlabel("Phrases")
-    axes[2].set_ylabel("Frequency")
-    axes[2].tick_params(axis='x', rotation=90)
-
-    plt.tight_layout()
-
-    # Save the figure
-    plt.savefig("example_output.png", dpi=300, bbox_inches="tight")
-    plt.show()  # Commented out
-
-# Find contextual uses of a word
-def find_context(word, text, window=5):
-    words = text.split()
-    indices = [i for i, w in enumerate(words) if w == word]
-    for i in indices:
-        start = max(i - window, 0)
-        end = min(i + window + 1, len(words))
-        print(f"Context for '{word}':", ' '.join(words[start:end]))
-
-# Function to load and process the CV text
-def load_cv_text(cv_file_path, stopwords_file):
-    text = load_text(cv_file_path)  # reuse the existing load_text function
-    stopwords = load_stopwords(stopwords_file)
-    words = text.split()
-    # Filter out stopwords
-    words = [word for word in words if word not in stopwords]
-    return text, Counter(words)
-
-# Function to extract n-grams from a list of words
-def extract_cv_ngrams(cv_words):
-    unigrams = Counter(cv_words)
-    bigrams = generate_ngrams(cv_words, 2)
-    trigrams = generate_ngrams(cv_words, 3)
-    return unigrams, bigrams, trigrams
-
-# Function to compare job description n-grams with CV n-grams
-# This simple comparison prints common unigrams, bigrams, and trigrams
-# and indicates which top job description terms are missing in the CV.
-def compare_cv_and_job(job_ngrams, cv_ngrams):
-    job_unigrams, job_bigrams, job_trigrams = job_ngrams
-    cv_unigrams, cv_bigrams, cv_trigrams = cv_ngrams
-
-    print("\n--- Comparison between Job Description and CV ---\n")
-
-    # Compare Unigrams (sorted by difference in counts)
-    print("Common Unigrams (sorted by difference):")
-    common_uni = set(job_unigrams.keys()) & set(cv_unigrams.keys())
-    uni_diffs = [(word, job_unigrams[word], cv_unigrams[word], abs(job_unigrams[word] - cv_unigrams[word])) for word in common_uni]
-    uni_diffs.sort(key=lambda x: x[3], reverse=True)
-    print(tabulate(uni_diffs, headers=["Unigram", "JD", "CV", "Diff"], tablefmt="github"))
-    print("\n")
-
-    # Compare Bigrams (sorted by difference in counts)
-    print("Common Bigrams (sorted by difference):")
-    common_bi = set(job_bigrams.keys()) & set(cv_bigrams.keys())
-    bi_diffs = [( ' '.join(phrase), job_bigrams[phrase], cv_bigrams[phrase], abs(job_bigrams[phrase] - cv_bigrams[phrase]) ) for phrase in common_bi]
-    bi_diffs.sort(key=lambda x: x[3], reverse=True)
-    print(tabulate(bi_diffs, headers=["Bigram", "JD", "CV", "Diff"], tablefmt="github"))
-    print("\n")
-
-    # Compare Trigrams (sorted by difference in counts)
-    print("Common Trigrams (sorted by difference):")
-    common_tri = set(job_trigrams.keys()) & set(cv_trigrams.keys())
-    tri_diffs = [( ' '.join(phrase), job_trigrams[phrase], cv_trigrams[phrase], abs(job_trigrams[phrase] - cv_trigrams[phrase]) ) for phrase in common_tri]
-    tri_diffs.sort(key=lambda x: x[3], reverse=True)
-    print(tabulate(tri_diffs, headers=["Trigram", "JD", "CV", "Diff"], tablefmt="github"))
-    print("\n")
-
-    # Identify top job unigrams missing in CV
-    print("Top Job Description Unigrams Missing in CV:")
-    missing = [(word, count) for word, count in job_unigrams.most_common(10) if word not in cv_unigrams]
-    print(tabulate(missing, headers=["Unigram", "JD"], tablefmt="github"))
-
-# Load structured YAML CV data
-def load_cv_yaml(yaml_path=os.path.join(CONFIG_DIR, 'cv_database.yaml')):
-    with open(yaml_path, 'r') as f:
-        return yaml.safe_load(f)
-
-# Basic keyword-based CV generator
-def generate_custom_cv(job_keywords, cv_data, output_path=os.path.join(OUTPUT_DIR, 'custom_cv.txt')):
-    def match_score(item):
-        desc = item.get("description", [])
-        if isinstance(desc, str):
-            desc = [desc]
-        skills = item.get("skills", [])
-        text = " ".join(desc + skills)
-        return sum(1 for word in job_keywords if word in text.lower())
-
-    # Sort and select top entries
-    top_experience = sorted(cv_data.get("experience", []), key=match_score, reverse=True)[:4]
-    top_projects = sorted(cv_data.get("projects", {}).get("work", []), key=match_score, reverse=True)[:2]
-    top_personal_projects = sorted(cv_data.get("projects", {}).get("personal", []), key=match_score, reverse=True)[:1]
-
-    pprint.pprint(top_experience)
-
-    # Start writing the custom CV
-    with open(output_path, 'w') as out:
-        out.write("CUSTOM CV DRAFT\n\n")
-
-        out.write("EXPERIENCE:\n")
-        for job in top_experience:
-            out.write(f"{job['title']} - {job['company']}\n")
-            out.write(f"{job.get('location', '')} | {job['start_date']} to {job['end_date']}\n")
-            for line in job.get("description", []):
-                out.write(f" - {line}\n")
-            out.write("\n")
-
-        out.write("PROJECTS:\n")
-        for proj in top_projects + top_personal_projects:
-            out.write(f"{proj['name']} ({proj['year']})\n")
-            out.write(f" - {proj['description']}\n")
-            out.write("\n")
-
-        out.write("EDUCATION:\n")
-        for edu in cv_data.get("education", []):
-            out.write(f"{edu['degree']} - {edu['institution']}, {edu['location']}\n")
-            out.write(f"Graduated: {edu['graduation_year']}\n")
-            if "thesis" in edu:
-                out.write(f"Thesis: {edu['thesis']}\n")
-            out.write("\n")
-
-    print(f"\nCustom CV draft saved to '{output_path}'")
-
-# Function to interact with GPT-4o-mini model
-def run_gpt_model(job_file_path, cv_database_path, detailed_report_path, output_path, descriptive_copy_path, cover_letter_output_path, reference_folder=None, model="gpt-4o-mini"):
+def build_gpt_input(job_file_path, cv_database_path, detailed_report_path, reference_folder=None, token_budget=None, model=None, stopwords=None):
     """
-    Interacts with the specified GPT model to generate both a tailored CV and an optional cover letter.
-
-    :param job_file_path: Path to the job description file.
-    :param cv_database_path: Path to the CV database file.
-    :param detailed_report_path: Path to the detailed report file.
-    :param output_path: Path to save the generated CV in the output folder.
-    :param descriptive_copy_path: Path to save a descriptive copy of the CV in the cv folder.
-    :param cover_letter_output_path: Path to save the generated cover letter.
-    :param reference_folder: Path to the folder containing reference cover letters (optional).
-    :param model: The GPT model to use (default: gpt-4o-mini).
+    Formats the model input from the job description, detailed report, CV database and reference cover letters.
+
+    :param token_budget: Maximum number of prompt tokens (optional). Over the budget, the content least
+                         relevant to the job description is left out (see `prompt_builder.compact_prompt`).
+    :param model: Model name, to count tokens with its tokenizer (optional).
+    :param stopwords: Set of stopwords excluded from the job description's keywords (default: data/stopwords.txt).
+    :return: A tuple of (input_text, prompt_template, compaction), where compaction is the
+             PromptCompaction with the token counts, or None without a token budget.
     """
-    client = OpenAI()
-
     # Read the input files
     with open(job_file_path, 'r') as job_file:
         job_description = job_file.read()
@@ -221,8 +38,8 @@ def run_gpt_model(job_file_path, cv_database_path, detailed_report_path, output_
     with open(detailed_report_path, 'r') as report_file:
         detailed_report = report_file.read()
 
-    with open(cv_database_path, 'r') as cv_database_file:
-        cv_database = yaml.safe_load(cv_database_file)
+    # The compiled snapshot holds the database already rendered as YAML
+    cv_snapshot = load_cv_snapshot(cv_database_path)
 
     # Read reference cover letters if provided
     reference_texts = []
@@ -231,7 +48,7 @@ def run_gpt_model(job_file_path, cv_database_path, detailed_report_path, output_
             if filename.endswith('.txt'):
                 with open(os.path.join(reference_folder, filename), 'r') as ref_file:
                     reference_texts.append(ref_file.read())
-    combined_references = "\n\n===== COVER LETTER SEPARATOR =====\n\n".join(reference_texts)
+    combined_references = REFERENCE_SEPARATOR.join(reference_texts)
 
     # Extract the job title and company name from the job description file name
     job_title = os.path.splitext(os.path.basename(job_file_path))[0].replace('_', ' ').title()
@@ -241,14 +58,94 @@ def run_gpt_model(job_file_path, cv_database_path, detailed_report_path, output_
     with open(os.path.join(CONFIG_DIR, 'cv_prompt.txt'), 'r') as prompt_file:
         prompt_template = prompt_file.read()
 
+    if token_budget is not None:
+        if stopwords is None:
+            stopwords = load_stopwords(os.path.join(DATA_DIR, 'stopwords.txt'))
+        job_keywords = [word for word in load_text(job_file_path).split() if word not in stopwords]
+        compaction = compact_prompt(prompt_template, company_name, job_description, detailed_report, cv_snapshot, reference_texts, job_keywords, token_budget, TokenCounter(model))
+        return compaction.input_text, prompt_template, compaction
+
     # Format the input for the GPT model
     input_text = prompt_template.format(
         company_name=company_name,
         job_description=job_description.strip(),
         detailed_report=detailed_report.strip(),
-        cv_database=yaml.dump(cv_database, default_flow_style=False).strip(),
+        cv_database=cv_snapshot.rendered_yaml,
         reference_cover_letters=combined_references.strip()
     )
+    return input_text, prompt_template, None
+
+def parse_model_response(output_text):
+    """
+    Splits the model output into the rewritten CV and the cover letter.
+
+    :param output_text: Raw text returned by the model.
+    :return: A tuple of (rewritten_cv, cover_letter), split at the first line mentioning a cover
+             letter (case-insensitive) like the streaming writer does, or None if there is none.
+    """
+    output_text = output_text.strip()
+    cover_letter_match = COVER_LETTER_LINE.search(output_text)
+    if cover_letter_match is None:
+        return None
+    return output_text[:cover_letter_match.start()], output_text[cover_letter_match.end():]
+
+def job_title_from_path(job_file_path):
+    return os.path.splitext(os.path.basename(job_file_path))[0].replace('_', ' ').title()
+
+def cv_header(job_file_path):
+    return f"This CV is tailored for the job: {job_title_from_path(job_file_path)}\n\n"
+
+def render_cv_file(header, cv_body, cover_letter):
+    """
+    Returns the complete CV file content (CV content + cover letter).
+    """
+    return f"{header}{cv_body.strip()}\n\n--- COVER LETTER ---\n\n{cover_letter.strip()}"
+
+def write_cv_file(file_path, header, cv_body, cover_letter):
+    """
+    Writes the complete CV (CV content + cover letter) in one operation.
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as f:
+        f.write(render_cv_file(header, cv_body, cover_letter))
+
+# Function to interact with GPT-4o-mini model
+@traced("run_gpt_model")
+def run_gpt_model(job_file_path, cv_database_path, detailed_report_path, output_path, descriptive_copy_path, cover_letter_output_path, reference_folder=None, model="gpt-4o-mini", client=None, cache=None, refresh=False, stream=False, on_cv_complete=None, store=None, prompt_token_budget=None):
+    """
+    Interacts with the specified GPT model to generate both a tailored CV and an optional cover letter.
+
+    :param job_file_path: Path to the job description file.
+    :param cv_database_path: Path to the CV database file.
+    :param detailed_report_path: Path to the detailed report file.
+    :param output_path: Path to save the generated CV in the output folder.
+    :param descriptive_copy_path: Path to save a descriptive copy of the CV in the cv folder.
+    :param cover_letter_output_path: Path to save the generated cover letter.
+    :param reference_folder: Path to the folder containing reference cover letters (optional).
+    :param model: The GPT model to use (default: gpt-4o-mini).
+    :param client: Model client with the OpenAI `responses.create` interface (default: the OpenAI client).
+    :param cache: DiskCache of previous model responses (optional, see `llm_client.create_response_cache`).
+    :param refresh: Call the model even if a cached response exists.
+    :param stream: Write the output to the descriptive copy as it is generated instead of waiting for the whole response.
+    :param on_cv_complete: When streaming, called with the CV section's text as soon as the cover letter starts (optional).
+    :param store: ArtifactStore the CV is saved to (default: the one in archive/).
+    :param prompt_token_budget: Maximum number of prompt tokens (optional, see `build_gpt_input`). The token
+                                counts of every call are appended to output/prompt_tokens.jsonl.
+    :return: The archived artifact's index entry, or None if the response could not be parsed.
+    """
+    if client is None:
+        client = create_client()
+    if store is None:
+        store = ArtifactStore()
+
+    with span("build_gpt_input"):
+        input_text, prompt_template, compaction = build_gpt_input(job_file_path, cv_database_path, detailed_report_path, reference_folder, prompt_token_budget, model)
+    count("llm.prompt_chars", len(input_text))
+    if compaction is not None:
+        print_compaction(compaction)
+        count("llm.prompt_tokens_before", compaction.tokens_before)
+        count("llm.prompt_tokens_after", compaction.tokens_after)
+    count("llm.prompt_template_chars", len(prompt_template))
 
     # Log the formatted input text for debugging
     with open(os.path.join(OUTPUT_DIR, 'gpt_input_debug_log.txt'), 'w') as debug_log:
@@ -260,160 +157,73 @@ def run_gpt_model(job_file_path, cv_database_path, detailed_report_path, output_
         log_file.write("Input to GPT Model:\n")
         log_file.write(input_text)
 
-    # Call the GPT model
-    response = client.responses.create(
-        model=model,
-        input=input_text
-    )
-
-    # Parse the response into CV and cover letter using a flexible delimiter
-    import re
+    # Dynamically determine file paths based on job title
+    job_title = job_title_from_path(job_file_path)
 
-    # Search for a line containing 'Cover Letter' (case-insensitive)
-    cover_letter_match = re.search(r"(?i)^.*cover letter.*$", response.output_text, re.MULTILINE)
-    if cover_letter_match:
-        delimiter = cover_letter_match.group(0)
-        response_parts = response.output_text.strip().split(delimiter)
-    else:
-        response_parts = [response.output_text.strip()]
-
-    if len(response_parts) != 2:
-        print("Warning: Unexpected response format from GPT model. Appending raw response.")
-        with open(output_path, 'a') as output_file:
-            output_file.write("\n\n--- RAW RESPONSE ---\n\n")
-            output_file.write(response.output_text.strip())
-        return
-
-    rewritten_cv, cover_letter = response_parts
-
-    # Dynamically determine file paths based on job title, company name, and timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    job_title = os.path.splitext(os.path.basename(job_file_path))[0].replace('_', ' ').title()
-    company_name = job_title.split()[0]  # Assuming the company name is the first word
- 
-    # Define a helper function to write the complete CV (CV content + cover letter) in one operation
-    def write_cv_file(file_path, header, cv_body, cover_letter):
-        with open(file_path, 'w') as f:
-            f.write(header)
-            f.write(cv_body.strip())
-            f.write("\n\n--- COVER LETTER ---\n\n")
-            f.write(cover_letter.strip())
- 
     # Prepare a header to be included in each file
-    header = f"This CV is tailored for the job: {job_title}\n\n"
- 
+    header = cv_header(job_file_path)
+
     # Define file paths for the different CV outputs
     descriptive_copy_path = os.path.join(CV_DIR, f"{job_title.replace(' ', '_')}_CV.txt")
-    archive_file_path = os.path.join(ARCHIVE_DIR, f"custom_cv_{timestamp}.txt")
     custom_cv_path = os.path.join(OUTPUT_DIR, 'custom_cv.txt')
     markdown_copy_path = descriptive_copy_path.replace('.txt', '.md')
 
-    # Write all CV outputs using the helper function
-    write_cv_file(output_path, header, rewritten_cv, cover_letter)
-    print(f"Generated CV saved to {output_path}")
-
-    write_cv_file(descriptive_copy_path, header, rewritten_cv, cover_letter)
-    print(f"Descriptive CV copy saved to {descriptive_copy_path}")
+    # Call the GPT model, unless the same input was already answered. When streaming, the descriptive
+    # copy fills up as the output arrives and the CV section is handed over before the cover letter is done.
+    if stream:
+        # The previous run's copy may be linked to an archived artifact; don't stream over it
+        detach(descriptive_copy_path)
+    writer = StreamingCVWriter(descriptive_copy_path, header, on_cv_complete) if stream else None
+    try:
+        with span("llm_request", model=model, stream=stream):
+            response = generate_response(client, model, input_text, prompt_template, cache=cache, refresh=refresh, on_delta=writer.feed if writer else None)
+    finally:
+        if writer is not None:
+            writer.close()
+    output_text = response["output_text"]
+    count("llm.requests")
+    count("llm.cached_responses", int(response["cached"]))
+    count("llm.response_chars", len(output_text))
+    if compaction is not None:
+        log_prompt_tokens(compaction, job_file_path, model, response["latency_seconds"], response["cached"])
 
-    write_cv_file(custom_cv_path, header, rewritten_cv, cover_letter)
-    print(f"Custom CV with cover letter written to: {custom_cv_path}")
+    # Parse the response into CV and cover letter using a flexible delimiter
+    response_parts = parse_model_response(output_text)
+    if response_parts is None:
+        print("Warning: Unexpected response format from GPT model. Appending raw response.")
+        detach(output_path)
+        with open(output_path, 'a') as output_file:
+            output_file.write("\n\n--- RAW RESPONSE ---\n\n")
+            output_file.write(output_text.strip())
+        return None
 
-    write_cv_file(archive_file_path, header, rewritten_cv, cover_letter)
-    print(f"Archive CV saved to {archive_file_path}")
+    rewritten_cv, cover_letter = response_parts
 
-    # Write to the .md file
-    write_cv_file(markdown_copy_path, header, rewritten_cv, cover_letter)
-    print(f"Markdown CV saved to {markdown_copy_path}")
+    # Render the CV once, archive it under its content hash and link every output path to it
+    with span("archive_cv"):
+        digest = store.put(render_cv_file(header, rewritten_cv, cover_letter))
+        paths = list(dict.fromkeys([output_path, descriptive_copy_path, custom_cv_path, markdown_copy_path]))
+        for path in paths:
+            store.checkout(digest, path)
+            print(f"CV saved to {path}")
+        entry = store.record(digest, job=job_file_path, model=model, paths=paths, cached_response=response["cached"])
+    print(f"Archived CV as {digest[:12]} ({entry['compressed_bytes']} bytes compressed)")
 
     print(header)
     print(rewritten_cv)
     print(cover_letter)
+    return entry
 
-# Function to compare CV to job description
-def compare_cv_to_jd(job_file_path, cv_file_path, output_path):
-    """
-    Compares the tailored CV with the job description and outputs common unigrams, bigrams, and trigrams,
-    as well as missing terms from the job description.
-
-    :param job_file_path: Path to the job description file.
-    :param cv_file_path: Path to the tailored CV file.
-    :param output_path: Path to append the comparison results.
-    """
-    # Load the job description and CV text
-    with open(job_file_path, 'r') as job_file:
-        job_text = job_file.read()
-
-    with open(cv_file_path, 'r') as cv_file:
-        cv_text = cv_file.read()
-
-    # Load stopwords
-    stopwords = load_stopwords(os.path.join(DATA_DIR, 'stopwords.txt'))
-
-    # Filter out stopwords from job and CV texts
-    job_words = [word for word in job_text.split() if word not in stopwords]
-    cv_words = [word for word in cv_text.split() if word not in stopwords]
-
-    # Generate n-grams
-    job_unigrams = Counter(job_words)
-    job_bigrams = Counter(ngrams(job_words, 2))
-    job_trigrams = Counter(ngrams(job_words, 3))
-
-    cv_unigrams = Counter(cv_words)
-    cv_bigrams = Counter(ngrams(cv_words, 2))
-    cv_trigrams = Counter(ngrams(cv_words, 3))
-
-    # Compare n-grams
-    common_unigrams = set(job_unigrams.keys()) & set(cv_unigrams.keys())
-    common_bigrams = set(job_bigrams.keys()) & set(cv_bigrams.keys())
-    common_trigrams = set(job_trigrams.keys()) & set(cv_trigrams.keys())
-
-    # Sort by difference in counts
-    unigram_diffs = [(word, job_unigrams[word], cv_unigrams[word], abs(job_unigrams[word] - cv_unigrams[word])) for word in common_unigrams]
-    unigram_diffs.sort(key=lambda x: x[3], reverse=True)
-
-    bigram_diffs = [(" ".join(phrase), job_bigrams[phrase], cv_bigrams[phrase], abs(job_bigrams[phrase] - cv_bigrams[phrase])) for phrase in common_bigrams]
-    bigram_diffs.sort(key=lambda x: x[3], reverse=True)
-
-    trigram_diffs = [(" ".join(phrase), job_trigrams[phrase], cv_trigrams[phrase], abs(job_trigrams[phrase] - cv_trigrams[phrase])) for phrase in common_trigrams]
-    trigram_diffs.sort(key=lambda x: x[3], reverse=True)
-
-    # Identify top job unigrams missing in CV
-    missing_unigrams = [(word, count) for word, count in job_unigrams.most_common(10) if word not in cv_unigrams]
-
-    # Append results to the detailed report
-    with open(output_path, 'a') as report:
-        report.write("\n--- Comparison between Job Description and CV ---\n\n")
-
-        report.write("Common Unigrams (sorted by difference):\n")
-        report.write(tabulate(unigram_diffs, headers=["Unigram", "JD", "CV", "Diff"], tablefmt="github"))
-        report.write("\n\n")
-
-        report.write("Common Bigrams (sorted by difference):\n")
-        report.write(tabulate(bigram_diffs, headers=["Bigram", "JD", "CV", "Diff"], tablefmt="github"))
-        report.write("\n\n")
-
-        report.write("Common Trigrams (sorted by difference):\n")
-        report.write(tabulate(trigram_diffs, headers=["Trigram", "JD", "CV", "Diff"], tablefmt="github"))
-        report.write("\n\n")
-
-        report.write("Top Job Description Unigrams Missing in CV:\n")
-        report.write(tabulate(missing_unigrams, headers=["Unigram", "JD"], tablefmt="github"))
-        report.write("\n\n")
-
-    print("Comparison results appended to the detailed report.")
-
+@traced("convert_md_to_pdf_and_word")
 def convert_md_to_pdf_and_word(md_file_path):
     """
-    Converts a Markdown file to both PDF and Word formats.
+    Converts a Markdown file to PDF (Word generation is disabled), skipping the conversion when
+    the PDF was already built from the same Markdown and template.
 
     :param md_file_path: Path to the Markdown file.
+    :return: The ConversionResult (see `pdf_queue.PdfQueue.convert`).
     """
-    # Read the Markdown content
-    with open(md_file_path, 'r') as md_file:
-        md_content = md_file.read()
-
-    # Convert Markdown to HTML
-    html_content = markdown.markdown(md_content)
+    from pdf_queue import PdfQueue
     print(f"md_file_path: {md_file_path}")
 
     # Correct the file paths for PDF and Word documents
@@ -437,32 +247,23 @@ def convert_md_to_pdf_and_word(md_file_path):
     # doc.save(word_file_path)
     # print(f"Generated Word Document: {word_file_path}")
 
-    # Remove the redundant summary-shortening logic
-    # Combine the Markdown content without manual truncation
-    updated_md_content = md_content
-
-    # Save the Markdown content as is
-    with open(md_file_path, 'w') as md_file:
-        md_file.write(updated_md_content)
-
     # Generate PDF using pandoc with xelatex for better Unicode support
-    try:
-        subprocess.run([
-            "pandoc", md_file_path, "-o", pdf_file_path, "--pdf-engine=xelatex"
-        ], check=True)
-        print(f"Generated PDF: {pdf_file_path}")
-    except subprocess.CalledProcessError as e:
-        print(f"Error generating PDF: {e}")
+    result = PdfQueue(workers=1).convert(md_file_path, pdf_file_path)
+    if result.status == "converted":
+        print(f"Generated PDF: {pdf_file_path} ({result.seconds:.2f}s)")
+    elif result.status == "skipped":
+        print(f"PDF is up to date: {pdf_file_path}")
+    else:
+        print(f"Error generating PDF: {result.error}")
+    return result
 
-def validate_ats_friendly_format(md_file_path):
+def validate_ats_content(content):
     """
-    Validates the Markdown file for ATS-friendly formatting.
+    Validates Markdown CV content for ATS-friendly formatting.
 
-    :param md_file_path: Path to the Markdown file.
+    :param content: The Markdown content.
+    :return: The list of issues found (empty if the CV is ATS-friendly).
     """
-    with open(md_file_path, 'r') as md_file:
-        content = md_file.read()
-
     issues = []
 
     # Check for tables or images
@@ -481,9 +282,25 @@ def validate_ats_friendly_format(md_file_path):
         if heading not in content:
             issues.append(f"Missing section heading: {heading}")
 
-    # Removed the undefined `unigrams` reference
-    # Ensure the function only validates for ATS-friendly formatting issues
-    print("\nThe CV is ATS-friendly.")
+    if issues:
+        print("\nATS formatting issues:")
+        for issue in issues:
+            print(f" - {issue}")
+    else:
+        print("\nThe CV is ATS-friendly.")
+    return issues
+
+def validate_ats_friendly_format(md_file_path):
+    """
+    Validates the Markdown file for ATS-friendly formatting.
+
+    :param md_file_path: Path to the Markdown file.
+    :return: The list of issues found (empty if the CV is ATS-friendly).
+    """
+    with open(md_file_path, 'r') as md_file:
+        content = md_file.read()
+
+    return validate_ats_content(content)
 
 # Command-line argument parsing
 if __name__ == "__main__":
@@ -496,47 +313,40 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     # Analyze job description
-    job_text = load_text(os.path.join(DATA_DIR, args.file_path))
     stopwords = load_stopwords(args.stopwords)
-    job_words = [word for word in job_text.split() if word not in stopwords]
-
-    job_unigrams = Counter(job_words)
-    job_bigrams = generate_ngrams(job_words, 2)
-    job_trigrams = generate_ngrams(job_words, 3)
+    job = DocumentAnalysis.from_file(os.path.join(DATA_DIR, args.file_path), stopwords)
 
     # Load CV database
-    cv_data = load_cv_yaml()
+    cv_data = load_cv_snapshot(os.path.join(CONFIG_DIR, 'cv_database.yaml')).data
 
     # Generate the tailored CV
-    generate_custom_cv(job_words, cv_data)
+    generate_custom_cv(job, cv_data, output_path=os.path.join(OUTPUT_DIR, 'custom_cv.txt'))
 
     # Existing analysis prints
-    print(f"Sentiment Analysis: {analyze_sentiment(job_text)}")
+    print(f"Sentiment Analysis: {analyze_sentiment(job.text)}")
 
     print("\nUnigrams:")
-    for word, count in job_unigrams.most_common(10):
+    for word, count in job.unigrams.most_common(10):
         print(f"{word}: {count}")
 
     print("\nBigrams:")
-    for phrase, count in job_bigrams.most_common(10):
+    for phrase, count in job.bigrams.most_common(10):
         print(f"{' '.join(phrase)}: {count}")
 
     print("\nTrigrams:")
-    for phrase, count in job_trigrams.most_common(10):
+    for phrase, count in job.trigrams.most_common(10):
         print(f"{' '.join(phrase)}: {count}")
 
     # Generate word cloud and frequency plots
     if not args.fast:
-        plot_wordcloud_and_frequencies(job_unigrams, job_bigrams, job_text)
-        find_context("python", job_text)
+        from visualization import PLOTS_DIR, plot_document_analysis
+        plot_path, _ = plot_document_analysis(job, os.path.join(PLOTS_DIR, f"{os.path.splitext(os.path.basename(args.file_path))[0]}.png"))
+        print(f"Plots saved to {plot_path}")
+        find_context("python", job.tokens)
 
     # If a CV file is provided, perform CV analysis and compare with job description
     if args.cv_file:
-        cv_text, cv_counter = load_cv_text(os.path.join(CV_DIR, args.cv_file), args.stopwords)
-        cv_unigrams, cv_bigrams, cv_trigrams = extract_cv_ngrams(cv_text.split())
+        cv = DocumentAnalysis.from_file(os.path.join(CV_DIR, args.cv_file), stopwords)
 
         # Compare the job description n-grams with CV n-grams
-        compare_cv_and_job(
-            (job_unigrams, job_bigrams, job_trigrams),
-            (cv_unigrams, cv_bigrams, cv_trigrams)
-        )
\ No newline at end of file
+        compare_cv_and_job(job, cv)
@@ -0,0 +1,214 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVE_DIR = os.path.join(BASE_DIR, 'archive')
+
+# Checkouts and the files linked to them are read-only, so editing one cannot change the archived artifact
+CHECKOUT_MODE = 0o444
+
+class ArtifactStore:
+    """
+    Content-addressed store of generated CVs.
+
+    Every distinct output is saved once, gzip-compressed, under its SHA-256 digest
+    (objects/ab/<digest>.gz). The files users open (output/custom_cv.txt, the copy in cv/, the .md
+    copy, ...) are hardlinks to a single uncompressed checkout of the content (checkouts/<digest>.txt),
+    swapped in atomically, so identical outputs take no extra space. A checkout only lives as long
+    as some file links to it. index.jsonl records the job description, model, timestamp and paths
+    of every generated artifact, so history queries read one small file instead of scanning the archive.
+
+    Files linked from the store share their content and are read-only: call `detach` before
+    modifying one in place. A checkout whose content no longer matches its digest (e.g. made
+    writable and edited) is restored from the compressed object before being linked again.
+
+    :param directory: Root folder of the store (default: archive/).
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.jsonl')
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], f"{digest}.gz")
+
+    def checkout_path(self, digest):
+        return os.path.join(self.directory, 'checkouts', f"{digest}.txt")
+
+    def _write_atomic(self, path, content, mode=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(content)
+            if mode is not None:
+                os.chmod(temp_path, mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def put(self, content):
+        """
+        Stores a text once under its content hash.
+
+        :return: The SHA-256 hex digest of the content.
+        """
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self.object_path(digest)):
+            # mtime=0 keeps the compressed bytes identical for identical content
+            self._write_atomic(self.object_path(digest), gzip.compress(data, mtime=0))
+        return digest
+
+    def read(self, digest):
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def _is_intact(self, path, digest):
+        try:
+            with open(path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest() == digest
+        except FileNotFoundError:
+            return False
+
+    def materialize(self, digest):
+        """
+        Returns the path of the read-only uncompressed checkout of `digest`, restoring it from the
+        compressed object if it was pruned or its content was changed.
+        """
+        source = self.checkout_path(digest)
+        if not self._is_intact(source, digest):
+            # A new inode, so files still linked to the changed content keep it and leave the store
+            self._write_atomic(source, self.read(digest).encode('utf-8'), mode=CHECKOUT_MODE)
+        return source
+
+    def _release(self, path):
+        # Removes the checkout `path` was linked to if `path` was its last link
+        try:
+            with open(path, 'rb') as f:
+                checkout = self.checkout_path(hashlib.sha256(f.read()).hexdigest())
+            if os.path.samefile(checkout, path) and os.stat(checkout).st_nlink == 2:
+                return checkout
+        except (FileNotFoundError, PermissionError):
+            pass
+        return None
+
+    def checkout(self, digest, path):
+        """
+        Atomically replaces `path` with a read-only hardlink to the content of `digest` (a read-only
+        copy where hardlinks are not supported).
+        """
+        source = self.materialize(digest)
+        # rename() is a no-op between two links to the same file, so an up-to-date link is left alone
+        if os.path.exists(path) and os.path.samefile(source, path):
+            return
+        released = self._release(path) if os.path.exists(path) else None
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+        try:
+            os.link(source, temp_path)
+        except OSError:
+            shutil.copyfile(source, temp_path)
+            os.chmod(temp_path, CHECKOUT_MODE)
+        os.replace(temp_path, path)
+        if released is not None and os.stat(released).st_nlink == 1:
+            os.remove(released)
+
+    def record(self, digest, **metadata):
+        """
+        Appends an entry for a generated artifact to the index.
+
+        :return: The recorded entry.
+        """
+        entry = {
+            "sha256": digest,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "bytes": len(self.read(digest).encode('utf-8')),
+            "compressed_bytes": os.path.getsize(self.object_path(digest)),
+            **metadata,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        # One short write per entry, appended atomically
+        with open(self.index_path, 'a') as index:
+            index.write(json.dumps(entry) + "\n")
+        return entry
+
+    def history(self, job=None, limit=None):
+        """
+        Returns the recorded artifacts, newest first, optionally only those of one job description (file name).
+        """
+        try:
+            with open(self.index_path, 'r') as index:
+                entries = [json.loads(line) for line in index if line.strip()]
+        except FileNotFoundError:
+            return []
+        if job is not None:
+            entries = [entry for entry in entries if os.path.basename(entry.get("job", "")) == os.path.basename(job)]
+        entries.reverse()
+        return entries[:limit] if limit is not None else entries
+
+    def prune_checkouts(self):
+        """
+        Removes the uncompressed checkouts no user-facing file links to any more (the compressed objects are kept).
+
+        :return: The number of checkouts removed.
+        """
+        checkouts_dir = os.path.join(self.directory, 'checkouts')
+        removed = 0
+        for name in os.listdir(checkouts_dir) if os.path.isdir(checkouts_dir) else []:
+            path = os.path.join(checkouts_dir, name)
+            if os.stat(path).st_nlink == 1:
+                os.remove(path)
+                removed += 1
+        return removed
+
+def detach(path):
+    """
+    Gives `path` its own writable copy of its content if it is a hardlink shared with the artifact
+    store, so it can be modified (e.g. appended to) without changing the stored artifact.
+    """
+    try:
+        # A read-only file of its own is a copied checkout (where hardlinks are not supported)
+        if os.stat(path).st_nlink <= 1 and os.access(path, os.W_OK):
+            return
+    except FileNotFoundError:
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    shutil.copyfile(path, temp_path)
+    os.replace(temp_path, path)
+
+def history_main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py history", description="List the generated CVs recorded in the artifact store.")
+    parser.add_argument("--job", help="Only show CVs generated for this job description file")
+    parser.add_argument("--limit", type=int, default=20, help="Number of entries to show (default: 20)")
+    parser.add_argument("--show", metavar="DIGEST", help="Print the content of the artifact with this digest (or digest prefix)")
+    parser.add_argument("--prune", action="store_true", help="Remove uncompressed checkouts that no output file links to")
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore()
+    if args.show:
+        matches = {entry["sha256"] for entry in store.history() if entry["sha256"].startswith(args.show)}
+        if len(matches) != 1:
+            print(f"Error: '{args.show}' matches {len(matches)} artifacts.")
+            exit(1)
+        print(store.read(matches.pop()))
+        return
+    if args.prune:
+        print(f"Removed {store.prune_checkouts()} unused checkouts.")
+        return
+
+    entries = store.history(job=args.job, limit=args.limit)
+    if not entries:
+        print("No generated CVs recorded yet.")
+        return
+    for entry in entries:
+        print(f"{entry['created_at']}  {entry['sha256'][:12]}  {entry.get('model', '-'):<14} {os.path.basename(entry.get('job', '-'))}  ({entry['bytes']} bytes, {entry['compressed_bytes']} compressed)")
@@ -0,0 +1,399 @@
+import argparse
+import asyncio
+import contextlib
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from file_utils import load_stopwords, ensure_cv_database_exists
+from text_analysis import load_job_analysis, DocumentAnalysis
+from cache import DiskCache
+from cv_snapshot import load_cv_snapshot
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+CONFIG_DIR = os.path.join(BASE_DIR, 'config')
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+
+# Shared inputs loaded once per worker process by init_worker
+_worker_state = {}
+
+def init_worker(stopwords_file_path, cv_database_path, verbose=False, use_cache=True, use_tfidf=False, plot_dpi=None, skills_taxonomy_path=None, max_chars=None):
+    """
+    Loads the inputs shared by every job description into the worker process.
+
+    :param stopwords_file_path: Path to the stopwords file.
+    :param cv_database_path: Path to the CV database file.
+    :param verbose: Keep the per-stage prints of the pipeline functions.
+    :param use_cache: Reuse job description analyses cached in output/.cache.
+    :param use_tfidf: Weight keywords by their IDF in the TF-IDF index (output/tfidf_index).
+    :param plot_dpi: Resolution of the per-posting plots (optional, no plots if None).
+    :param skills_taxonomy_path: Path to a skills taxonomy file matched along with the CV's skills (optional).
+    :param max_chars: Length budget of each custom CV in characters (optional, no budget if None).
+    """
+    from skill_matcher import load_skill_matcher
+    _worker_state["stopwords_file_path"] = stopwords_file_path
+    _worker_state["stopwords"] = load_stopwords(stopwords_file_path)
+    _worker_state["cache"] = DiskCache(os.path.join(OUTPUT_DIR, '.cache', 'analysis')) if use_cache else None
+    cv_snapshot = load_cv_snapshot(cv_database_path)
+    _worker_state["cv_data"] = cv_snapshot.data
+    _worker_state["keyword_index"] = cv_snapshot.keyword_index
+    skill_cache = DiskCache(os.path.join(OUTPUT_DIR, '.cache', 'skills')) if use_cache else None
+    _worker_state["skill_matcher"] = load_skill_matcher(cv_snapshot.data, skills_taxonomy_path, cache=skill_cache)
+    _worker_state["verbose"] = verbose
+    if use_tfidf:
+        from tfidf_index import TfidfIndex
+        _worker_state["tfidf_index"] = TfidfIndex()
+    else:
+        _worker_state["tfidf_index"] = None
+    _worker_state["plot_dpi"] = plot_dpi
+    _worker_state["max_chars"] = max_chars
+    if plot_dpi is not None:
+        from visualization import create_plot_cache
+        _worker_state["plot_cache"] = create_plot_cache() if use_cache else None
+
+def analyze_job_file(job_file_path, output_dir):
+    """
+    Runs the per-job-description pipeline and writes its outputs to a folder of its own.
+
+    :param job_file_path: Path to the job description file.
+    :param output_dir: Folder under which a sub-folder named after the job description is created.
+    :return: A small summary dictionary for the throughput report.
+    """
+    from cv_processing import generate_custom_cv, generate_detailed_report, compare_cv_to_jd
+
+    start = time.perf_counter()
+    stopwords = _worker_state["stopwords"]
+    cv_data = _worker_state["cv_data"]
+    keyword_index = _worker_state["keyword_index"]
+
+    job_name = os.path.splitext(os.path.basename(job_file_path))[0]
+    job_output_dir = os.path.join(output_dir, job_name)
+    os.makedirs(job_output_dir, exist_ok=True)
+    custom_cv_path = os.path.join(job_output_dir, 'custom_cv.txt')
+    detailed_report_path = os.path.join(job_output_dir, 'detailed_report.txt')
+
+    # The pipeline functions report every file they write; keep worker output readable
+    stdout = contextlib.nullcontext() if _worker_state["verbose"] else contextlib.redirect_stdout(io.StringIO())
+    with stdout:
+        job = load_job_analysis(job_file_path, stopwords, _worker_state["stopwords_file_path"], cache=_worker_state["cache"])
+        tfidf_index = _worker_state["tfidf_index"]
+        term_weights = tfidf_index.term_weights(job.words) if tfidf_index is not None else None
+
+        selection = generate_custom_cv(job, cv_data, output_path=custom_cv_path, keyword_index=keyword_index, term_weights=term_weights, max_chars=_worker_state["max_chars"])
+        generate_detailed_report(job, cv_data, output_path=detailed_report_path, job_file_name=os.path.basename(job_file_path), keyword_index=keyword_index, term_weights=term_weights, skill_matcher=_worker_state["skill_matcher"])
+        compare_cv_to_jd(
+            job_analysis=job,
+            cv_analysis=DocumentAnalysis.from_file(custom_cv_path, stopwords),
+            output_path=detailed_report_path,
+            weights=term_weights
+        )
+        if _worker_state["plot_dpi"] is not None:
+            from visualization import plot_document_analysis
+            plot_document_analysis(job, os.path.join(job_output_dir, 'analysis.png'), dpi=_worker_state["plot_dpi"], cache=_worker_state["plot_cache"])
+
+    return {
+        "job_file": job_file_path,
+        "output_dir": job_output_dir,
+        "words": len(job.words),
+        "top_unigrams": job.unigrams.most_common(3),
+        "top_bigrams": [" ".join(phrase) for phrase, _ in job.bigrams.most_common(3)],
+        "trigrams": len(job.trigrams),
+        "keywords": job.unigrams.most_common(50),
+        "coverage": selection.coverage if selection is not None else None,
+        "seconds": time.perf_counter() - start,
+    }
+
+def run_batch(job_files, output_dir, stopwords_file_path, cv_database_path, workers=None, verbose=False, use_cache=True, use_tfidf=False, plot_dpi=None, skills_taxonomy_path=None, max_chars=None):
+    """
+    Fans the per-job-description pipeline out over a process pool.
+
+    :param job_files: Paths of the job description files to analyze.
+    :param output_dir: Folder receiving one sub-folder of outputs per job description.
+    :param stopwords_file_path: Path to the stopwords file.
+    :param cv_database_path: Path to the CV database file.
+    :param workers: Number of worker processes (default: number of CPUs).
+    :param verbose: Keep the per-stage prints of the pipeline functions.
+    :param use_cache: Reuse job description analyses cached in output/.cache.
+    :param use_tfidf: Weight keywords by their IDF in the TF-IDF index (see `ingest_job_files`).
+    :param plot_dpi: Resolution of the per-posting plots (optional, no plots if None).
+    :param skills_taxonomy_path: Path to a skills taxonomy file matched along with the CV's skills (optional).
+    :param max_chars: Length budget of each custom CV in characters (optional, no budget if None).
+    :return: A tuple of (results, failures, elapsed seconds).
+    """
+    results = []
+    failures = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(stopwords_file_path, cv_database_path, verbose, use_cache, use_tfidf, plot_dpi, skills_taxonomy_path, max_chars)
+    ) as executor:
+        futures = {executor.submit(analyze_job_file, job_file, output_dir): job_file for job_file in job_files}
+        for done, future in enumerate(as_completed(futures), start=1):
+            job_file = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures.append((job_file, repr(e)))
+                print(f"[{done}/{len(futures)}] Failed: {job_file}: {e!r}")
+                continue
+            results.append(result)
+            print(f"[{done}/{len(futures)}] {os.path.basename(job_file)}: {result['words']} words in {result['seconds']:.2f}s")
+    return results, failures, time.perf_counter() - start
+
+def ingest_job_files(job_files, stopwords):
+    """
+    Adds the job descriptions not ingested yet to the TF-IDF index, in one append.
+
+    :return: The number of job descriptions added.
+    """
+    from file_utils import load_text
+    from tfidf_index import TfidfIndex
+
+    index = TfidfIndex()
+    documents = (
+        ([word for word in load_text(job_file).split() if word not in stopwords], os.path.basename(job_file))
+        for job_file in job_files
+    )
+    added = index.add_documents(documents)
+    print(f"TF-IDF index: {added} new job descriptions ingested, {len(index)} in total.")
+    return added
+
+def print_throughput_summary(results, failures, elapsed, workers):
+    total_words = sum(result["words"] for result in results)
+    processed = len(results)
+    print("\n--- Batch Throughput Summary ---\n")
+    print(f"Workers: {workers}")
+    print(f"Job descriptions analyzed: {processed} ({len(failures)} failed)")
+    print(f"Wall time: {elapsed:.2f}s")
+    if elapsed > 0:
+        print(f"Throughput: {processed / elapsed:.2f} postings/s, {total_words / elapsed:.0f} words/s")
+    if processed:
+        print(f"Mean per-posting pipeline time: {sum(result['seconds'] for result in results) / processed:.3f}s")
+    coverages = [result["coverage"] for result in results if result.get("coverage") is not None]
+    if coverages:
+        print(f"Mean keyword coverage of the budgeted CVs: {sum(coverages) / len(coverages):.1%}")
+    for job_file, error in failures:
+        print(f"Failed: {job_file}: {error}")
+
+def write_batch_cv(job_file_path, job_output_dir, output_text):
+    """
+    Writes the tailored CV and cover letter generated for one job description to its output folder.
+
+    :return: Path of the written file.
+    """
+    from analyze import parse_model_response, cv_header, write_cv_file
+
+    cv_path = os.path.join(job_output_dir, 'tailored_cv.txt')
+    response_parts = parse_model_response(output_text)
+    if response_parts is None:
+        # Keep the raw response so it can be inspected or re-parsed later
+        with open(cv_path, 'w') as f:
+            f.write("--- RAW RESPONSE ---\n\n")
+            f.write(output_text.strip())
+    else:
+        write_cv_file(cv_path, cv_header(job_file_path), *response_parts)
+    return cv_path
+
+def generate_batch_cvs(results, cv_database_path, model, client, cache=None, refresh=False, max_concurrency=4, requests_per_minute=None, tokens_per_minute=None, pdf_queue=None, prompt_token_budget=None, stopwords=None):
+    """
+    Generates the tailored CVs of a batch with concurrent model requests, writing each one as soon as it completes.
+
+    :param results: Summaries returned by `analyze_job_file`.
+    :param cv_database_path: Path to the CV database file.
+    :param model: Model name.
+    :param client: Async model client (see `llm_client.create_async_client`).
+    :param cache: DiskCache of previous model responses (optional).
+    :param refresh: Call the model even for inputs with a cached response.
+    :param max_concurrency: Maximum number of requests in flight.
+    :param requests_per_minute: Request rate limit (optional).
+    :param tokens_per_minute: Prompt token rate limit (optional).
+    :param prompt_token_budget: Maximum number of prompt tokens per request (optional, see `analyze.build_gpt_input`).
+    :param stopwords: Set of stopwords excluded from the job descriptions' keywords when compacting prompts.
+    :param pdf_queue: PdfQueue each parsed CV is queued on for PDF conversion as soon as it is written (optional).
+    :return: A tuple of (completed, failures, elapsed seconds).
+    """
+    from analyze import build_gpt_input, parse_model_response
+    from llm_async import run_prompts_async
+    from llm_client import response_cache_key, response_entry
+    from prompt_builder import log_prompt_tokens
+
+    def write_cv(job_file, job_output_dir, output_text):
+        cv_path = write_batch_cv(job_file, job_output_dir, output_text)
+        if pdf_queue is not None and parse_model_response(output_text) is not None:
+            pdf_queue.submit(cv_path)
+        return cv_path
+
+    prompts = []
+    pending = {}
+    compactions = {}
+    completed = 0
+    for result in results:
+        job_file = result["job_file"]
+        input_text, prompt_template, compaction = build_gpt_input(
+            job_file, cv_database_path, os.path.join(result["output_dir"], 'detailed_report.txt'),
+            token_budget=prompt_token_budget, model=model, stopwords=stopwords
+        )
+        if compaction is not None:
+            compactions[job_file] = compaction
+        key = response_cache_key(model, prompt_template, input_text)
+        entry = cache.get(key) if cache is not None and not refresh else None
+        if entry is not None:
+            if compaction is not None:
+                log_prompt_tokens(compaction, job_file, model, entry["latency_seconds"], cached=True)
+            write_cv(job_file, result["output_dir"], entry["output_text"])
+            completed += 1
+            continue
+        prompts.append((job_file, input_text))
+        pending[job_file] = (key, input_text, result["output_dir"])
+
+    if completed:
+        print(f"Reused {completed} cached model responses (use --refresh to regenerate).")
+
+    failures = []
+
+    def on_result(response):
+        nonlocal completed
+        job_file = response["prompt_id"]
+        key, input_text, job_output_dir = pending[job_file]
+        if response["error"] is not None:
+            failures.append((job_file, response["error"]))
+            print(f"Model request failed after {response['attempts']} attempts: {job_file}: {response['error']}")
+            return
+        if cache is not None:
+            cache.set(key, response_entry(model, input_text, response["output_text"], response["latency_seconds"]))
+        if job_file in compactions:
+            log_prompt_tokens(compactions[job_file], job_file, model, response["latency_seconds"])
+        cv_path = write_cv(job_file, job_output_dir, response["output_text"])
+        completed += 1
+        print(f"[{completed}/{len(results)}] Tailored CV saved to {cv_path} ({response['latency_seconds']:.2f}s, {response['attempts']} attempts)")
+
+    start = time.perf_counter()
+    if prompts:
+        asyncio.run(run_prompts_async(
+            prompts,
+            client,
+            model,
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            on_result=on_result
+        ))
+    elapsed = time.perf_counter() - start
+
+    print("\n--- Model Generation Summary ---\n")
+    print(f"Requests sent: {len(prompts)} ({len(failures)} failed), max {max_concurrency} in flight")
+    if prompts and elapsed > 0:
+        print(f"Wall time: {elapsed:.2f}s, {len(prompts) / elapsed:.2f} requests/s")
+    if compactions:
+        before = sum(compaction.tokens_before for compaction in compactions.values())
+        after = sum(compaction.tokens_after for compaction in compactions.values())
+        print(f"Prompt tokens: {before} -> {after} ({1 - after / before:.0%} fewer, budget {prompt_token_budget} per request)")
+    return completed, failures, elapsed
+
+def batch_main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Analyze a whole directory of job descriptions on a process pool.")
+    parser.add_argument("job_dir", help="Directory containing the job description files (e.g., data/)")
+    parser.add_argument("--pattern", default="*.txt", help="Glob pattern selecting job description files in job_dir (default: *.txt)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--stopwords", default=os.path.join(DATA_DIR, 'stopwords.txt'), help="Path to the stopwords file (default: stopwords.txt)")
+    parser.add_argument("--cv_database", default=os.path.join(CONFIG_DIR, 'cv_database.yaml'), help="Path to the CV database file (default: config/cv_database.yaml)")
+    parser.add_argument("--output_dir", default=os.path.join(OUTPUT_DIR, 'batch'), help="Folder receiving one sub-folder of outputs per job description (default: output/batch)")
+    parser.add_argument("--verbose", action="store_true", help="Show the per-stage output of every job description")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", help="Do not reuse or store job description analyses and model responses in output/.cache")
+    parser.add_argument("--use_model", nargs="?", const="gpt-4o-mini", default=None, help="Also generate a tailored CV per job description with the given model (default: gpt-4o-mini)")
+    parser.add_argument("--llm_client", default="openai", help="Model client: 'openai' (default) or 'stub:<path>' to answer offline with the content of <path>")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of model requests in flight (default: 4)")
+    parser.add_argument("--rpm", type=float, default=None, help="Model requests per minute limit (optional)")
+    parser.add_argument("--tpm", type=float, default=None, help="Model prompt tokens per minute limit (optional)")
+    parser.add_argument("--refresh", action="store_true", help="Call the model even for inputs with a cached response")
+    parser.add_argument("--prompt_token_budget", type=int, default=None, help="Maximum number of prompt tokens per model request: leave out the CV entries and report lines least relevant to each job description (default: no budget)")
+    parser.add_argument("--plots", action="store_true", help="Render the word cloud and n-gram plots of every job description, plus a dashboard of the whole batch")
+    parser.add_argument("--preview", action="store_true", help="Render the plots at low resolution for a quick look")
+    parser.add_argument("--tfidf", action="store_true", help="Add the job descriptions to the TF-IDF index (output/tfidf_index) and weight keywords by rarity")
+    parser.add_argument("--max_chars", type=int, default=None, help="Length budget of each custom CV in characters (default: no budget)")
+    parser.add_argument("--skills_taxonomy", default=None, help="Skills taxonomy file in config/ (one skill per line) to report the skills each job description asks for that the CV lacks")
+    parser.add_argument("--pdf", action="store_true", help="With --use_model, convert every tailored CV to PDF with pandoc, skipping CVs whose PDF is up to date")
+    parser.add_argument("--pdf_workers", type=int, default=2, help="Maximum number of PDF conversions running at once (default: 2)")
+
+    args = parser.parse_args(argv)
+
+    ensure_cv_database_exists(
+        os.path.join(CONFIG_DIR, 'cv_database_template.yaml'),
+        os.path.join(CONFIG_DIR, 'cv_database.yaml')
+    )
+
+    stopwords_file_path = os.path.join(DATA_DIR, os.path.basename(args.stopwords))
+    cv_database_path = os.path.join(CONFIG_DIR, os.path.basename(args.cv_database))
+    skills_taxonomy_path = os.path.join(CONFIG_DIR, os.path.basename(args.skills_taxonomy)) if args.skills_taxonomy else None
+
+    stopwords_name = os.path.basename(stopwords_file_path)
+    job_files = sorted(
+        path for path in glob.glob(os.path.join(args.job_dir, args.pattern))
+        if os.path.isfile(path) and os.path.basename(path) != stopwords_name
+    )
+    if not job_files:
+        print(f"Error: No job description files matching '{args.pattern}' found in '{args.job_dir}'.")
+        exit(1)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    plot_dpi = None
+    if args.plots:
+        from visualization import FULL_DPI, PREVIEW_DPI
+        plot_dpi = PREVIEW_DPI if args.preview else FULL_DPI
+
+    # Compile the CV database snapshot (and the skills taxonomy) up front so the workers only load them
+    cv_snapshot = load_cv_snapshot(cv_database_path)
+    if skills_taxonomy_path is not None and not args.no_cache:
+        from skill_matcher import load_skill_matcher
+        load_skill_matcher(cv_snapshot.data, skills_taxonomy_path, cache=DiskCache(os.path.join(OUTPUT_DIR, '.cache', 'skills')))
+    if args.tfidf:
+        # Ingest the whole batch first so every posting is weighted against the same corpus
+        ingest_job_files(job_files, load_stopwords(stopwords_file_path))
+    print(f"Analyzing {len(job_files)} job descriptions with {args.workers} workers...")
+    results, failures, elapsed = run_batch(
+        job_files,
+        args.output_dir,
+        stopwords_file_path,
+        cv_database_path,
+        workers=args.workers,
+        verbose=args.verbose,
+        use_cache=not args.no_cache,
+        use_tfidf=args.tfidf,
+        plot_dpi=plot_dpi,
+        skills_taxonomy_path=skills_taxonomy_path,
+        max_chars=args.max_chars
+    )
+    print_throughput_summary(results, failures, elapsed, args.workers)
+
+    if plot_dpi is not None and results:
+        from visualization import create_plot_cache, plot_batch_dashboard
+        dashboard_path, _ = plot_batch_dashboard(results, os.path.join(args.output_dir, 'dashboard.png'), dpi=plot_dpi, cache=None if args.no_cache else create_plot_cache())
+        print(f"Batch dashboard saved to {dashboard_path}")
+
+    if args.use_model and results:
+        from llm_client import create_async_client, create_response_cache
+        pdf_queue = None
+        if args.pdf:
+            from pdf_queue import PdfQueue
+            pdf_queue = PdfQueue(workers=args.pdf_workers)
+        generate_batch_cvs(
+            results,
+            cv_database_path,
+            args.use_model,
+            create_async_client(args.llm_client),
+            cache=None if args.no_cache else create_response_cache(),
+            refresh=args.refresh,
+            max_concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            pdf_queue=pdf_queue,
+            prompt_token_budget=args.prompt_token_budget,
+            stopwords=load_stopwords(stopwords_file_path) if args.prompt_token_budget is not None else None
+        )
+        if pdf_queue is not None:
+            from pdf_queue import print_conversion_summary
+            print_conversion_summary(pdf_queue.wait())
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+
+# Writes between full rescans of a cache directory, which pick up entries written by other processes
+EVICT_SCAN_INTERVAL = 256
+
+def content_hash(*parts):
+    """
+    Returns the SHA-256 hex digest of the given parts (bytes or str), each length-prefixed so that
+    different splits of the same bytes never collide.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+def file_hash(file_path):
+    """
+    Returns the SHA-256 hex digest of a file's content, or of an empty content if the file does not exist.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            return content_hash(f.read())
+    except FileNotFoundError:
+        return content_hash(b"")
+
+class DiskCache:
+    """
+    Pickle-backed on-disk cache with size-bounded LRU eviction and an optional time-to-live.
+
+    Entries are stored as one file per key. Reading an entry refreshes its modification time,
+    and writing evicts the least recently used entries once the directory exceeds `max_bytes`.
+    The directory size is tracked as a running total of this process's writes, so the directory
+    is only rescanned when the total exceeds `max_bytes` or every EVICT_SCAN_INTERVAL writes.
+    Writes go through a temporary file and `os.replace`, so concurrent processes never see partial entries.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, ttl=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._bytes = None       # Estimated size of the entries, None until the first scan
+        self._unscanned_writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        Returns the value stored under `key`, or None if it is missing, expired or unreadable.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                created, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            # Entries written by an incompatible version are treated as missing
+            self._remove(path)
+            return None
+
+        if self.ttl is not None and time.time() - created > self.ttl:
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((time.time(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(temp_path, path)
+        except BaseException:
+            self._remove(temp_path)
+            raise
+
+        if self._bytes is None or self._unscanned_writes >= EVICT_SCAN_INTERVAL:
+            self.evict()
+            return
+        self._bytes += size - replaced
+        self._unscanned_writes += 1
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in `max_bytes`.
+        """
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".pkl"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        self._bytes = total
+        self._unscanned_writes = 0
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith((".pkl", ".tmp")):
+                self._remove(entry.path)
+        self._bytes = 0
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,60 +1,169 @@
+import os
 from collections import Counter
 from tabulate import tabulate
+from file_utils import load_text, load_stopwords
+from keyword_index import KeywordIndex
+from profiling import span, traced
+from skill_matcher import SkillMatcher
+from text_analysis import generate_ngrams, DocumentAnalysis
 
-def load_cv_text(cv_file_path, stopwords_file, load_text, load_stopwords):
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+def load_cv_text(cv_file_path, stopwords_file, load_text=load_text, load_stopwords=load_stopwords):
     text = load_text(cv_file_path)
     stopwords = load_stopwords(stopwords_file)
     words = text.split()
     words = [word for word in words if word not in stopwords]
     return text, Counter(words)
 
-def extract_cv_ngrams(cv_words, generate_ngrams):
+def extract_cv_ngrams(cv_words, generate_ngrams=generate_ngrams):
     unigrams = Counter(cv_words)
     bigrams = generate_ngrams(cv_words, 2)
     trigrams = generate_ngrams(cv_words, 3)
     return unigrams, bigrams, trigrams
 
-def compare_cv_and_job(job_ngrams, cv_ngrams):
+def compare_ngrams(job_ngrams, cv_ngrams, weights=None):
+    """
+    Builds the comparison tables between job description and CV n-grams.
+
+    :param job_ngrams: DocumentAnalysis of the job description, or its (unigrams, bigrams, trigrams) Counters.
+    :param cv_ngrams: DocumentAnalysis of the CV, or its (unigrams, bigrams, trigrams) Counters.
+    :param weights: Dictionary mapping words to IDF weights (optional). When given, every row gets a
+                    weighted difference (the difference times the mean weight of the n-gram's words)
+                    that the rows are sorted by, and missing unigrams are ranked by TF-IDF.
+    :return: A dictionary with the "unigrams", "bigrams" and "trigrams" rows (sorted by difference), the "missing" top job unigrams,
+             and whether the rows are "weighted".
+    """
+    if isinstance(job_ngrams, DocumentAnalysis):
+        job_ngrams = job_ngrams.ngrams
+    if isinstance(cv_ngrams, DocumentAnalysis):
+        cv_ngrams = cv_ngrams.ngrams
     job_unigrams, job_bigrams, job_trigrams = job_ngrams
     cv_unigrams, cv_bigrams, cv_trigrams = cv_ngrams
+    if weights is not None:
+        from tfidf_index import ngram_weight
+
+    def diffs(job_counts, cv_counts, label):
+        # Walk the job description's n-grams in order so ties keep a stable order from run to run
+        if hasattr(job_counts, "intersection") and hasattr(cv_counts, "intersection"):
+            common = job_counts.intersection(cv_counts)
+        else:
+            common = [(key, job_counts[key], cv_counts[key]) for key in job_counts if key in cv_counts]
+        rows = [(label(key), job_count, cv_count, abs(job_count - cv_count)) for key, job_count, cv_count in common]
+        if weights is not None:
+            rows = [row + (round(row[3] * ngram_weight(weights, key), 2),) for row, (key, _, _) in zip(rows, common)]
+        rows.sort(key=lambda x: x[-1], reverse=True)
+        return rows
+
+    if weights is None:
+        missing = [(word, count) for word, count in job_unigrams.most_common(10) if word not in cv_unigrams]
+    else:
+        ranked = sorted(job_unigrams.items(), key=lambda item: item[1] * weights.get(item[0], 1.0), reverse=True)
+        missing = [(word, count, round(count * weights.get(word, 1.0), 2)) for word, count in ranked[:10] if word not in cv_unigrams]
+
+    return {
+        "unigrams": diffs(job_unigrams, cv_unigrams, lambda word: word),
+        "bigrams": diffs(job_bigrams, cv_bigrams, ' '.join),
+        "trigrams": diffs(job_trigrams, cv_trigrams, ' '.join),
+        "missing": missing,
+        "weighted": weights is not None,
+    }
+
+# Table headers of the compare_ngrams rows; weighted tables get one more column
+COMPARISON_HEADERS = {
+    "unigrams": ["Unigram", "JD", "CV", "Diff"],
+    "bigrams": ["Bigram", "JD", "CV", "Diff"],
+    "trigrams": ["Trigram", "JD", "CV", "Diff"],
+    "missing": ["Unigram", "JD"],
+}
+
+def comparison_headers(tables, name):
+    headers = COMPARISON_HEADERS[name]
+    if tables["weighted"]:
+        headers = headers + (["TF-IDF"] if name == "missing" else ["TF-IDF Diff"])
+    return headers
+
+def compare_cv_and_job(job_ngrams, cv_ngrams, weights=None):
+    tables = compare_ngrams(job_ngrams, cv_ngrams, weights=weights)
 
     print("\n--- Comparison between Job Description and CV ---\n")
 
     # Compare Unigrams (sorted by difference in counts)
     print("Common Unigrams (sorted by difference):")
-    common_uni = set(job_unigrams.keys()) & set(cv_unigrams.keys())
-    uni_diffs = [(word, job_unigrams[word], cv_unigrams[word], abs(job_unigrams[word] - cv_unigrams[word])) for word in common_uni]
-    uni_diffs.sort(key=lambda x: x[3], reverse=True)
-    print(tabulate(uni_diffs, headers=["Unigram", "JD", "CV", "Diff"], tablefmt="github"))
+    print(tabulate(tables["unigrams"], headers=comparison_headers(tables, "unigrams"), tablefmt="github"))
     print("\n")
 
     # Compare Bigrams (sorted by difference in counts)
     print("Common Bigrams (sorted by difference):")
-    common_bi = set(job_bigrams.keys()) & set(cv_bigrams.keys())
-    bi_diffs = [( ' '.join(phrase), job_bigrams[phrase], cv_bigrams[phrase], abs(job_bigrams[phrase] - cv_bigrams[phrase]) ) for phrase in common_bi]
-    bi_diffs.sort(key=lambda x: x[3], reverse=True)
-    print(tabulate(bi_diffs, headers=["Bigram", "JD", "CV", "Diff"], tablefmt="github"))
+    print(tabulate(tables["bigrams"], headers=comparison_headers(tables, "bigrams"), tablefmt="github"))
     print("\n")
 
     # Compare Trigrams (sorted by difference in counts)
     print("Common Trigrams (sorted by difference):")
-    common_tri = set(job_trigrams.keys()) & set(cv_trigrams.keys())
-    tri_diffs = [( ' '.join(phrase), job_trigrams[phrase], cv_trigrams[phrase], abs(job_trigrams[phrase] - cv_trigrams[phrase]) ) for phrase in common_tri]
-    tri_diffs.sort(key=lambda x: x[3], reverse=True)
-    print(tabulate(tri_diffs, headers=["Trigram", "JD", "CV", "Diff"], tablefmt="github"))
+    print(tabulate(tables["trigrams"], headers=comparison_headers(tables, "trigrams"), tablefmt="github"))
     print("\n")
 
     # Identify top job unigrams missing in CV
     print("Top Job Description Unigrams Missing in CV:")
-    missing = [(word, count) for word, count in job_unigrams.most_common(10) if word not in cv_unigrams]
-    print(tabulate(missing, headers=["Unigram", "JD"], tablefmt="github"))
+    print(tabulate(tables["missing"], headers=comparison_headers(tables, "missing"), tablefmt="github"))
+
+@traced("compare_cv_to_jd")
+def compare_cv_to_jd(job_file_path=None, cv_file_path=None, output_path=None, stopwords=None, job_analysis=None, cv_analysis=None, weights=None):
+    """
+    Compares the tailored CV with the job description and outputs common unigrams, bigrams, and trigrams,
+    as well as missing terms from the job description.
+
+    :param job_file_path: Path to the job description file (only read when job_analysis is not given).
+    :param cv_file_path: Path to the tailored CV file (only read when cv_analysis is not given).
+    :param output_path: Path to append the comparison results.
+    :param stopwords: Preloaded stopwords (optional, loaded from the data folder otherwise).
+    :param job_analysis: DocumentAnalysis of the job description (optional).
+    :param cv_analysis: DocumentAnalysis of the tailored CV (optional).
+    :param weights: IDF weights of the job description's words, to rank the tables by TF-IDF (optional).
+    :return: The comparison tables (see `compare_ngrams`).
+    """
+    # Reuse the already tokenized documents, loading only what was not passed in
+    if job_analysis is None or cv_analysis is None:
+        if stopwords is None:
+            stopwords = load_stopwords(os.path.join(DATA_DIR, 'stopwords.txt'))
+        if job_analysis is None:
+            job_analysis = DocumentAnalysis.from_file(job_file_path, stopwords)
+        if cv_analysis is None:
+            cv_analysis = DocumentAnalysis.from_file(cv_file_path, stopwords)
 
-def rank_bullet_points(description, job_keywords):
-    # Score each bullet point based on keyword matches
-    scored_bullets = []
-    for bullet in description:
-        score = sum(1 for word in job_keywords if word.lower() in bullet.lower())
-        scored_bullets.append((bullet, score))
+    # Compare n-grams, sorted by difference in counts
+    with span("compare_ngrams"):
+        tables = compare_ngrams(job_analysis, cv_analysis, weights=weights)
+
+    # Append results to the detailed report
+    with open(output_path, 'a') as report:
+        report.write("\n--- Comparison between Job Description and CV ---\n\n")
+
+        report.write("Common Unigrams (sorted by difference):\n")
+        report.write(tabulate(tables["unigrams"], headers=comparison_headers(tables, "unigrams"), tablefmt="github"))
+        report.write("\n\n")
+
+        report.write("Common Bigrams (sorted by difference):\n")
+        report.write(tabulate(tables["bigrams"], headers=comparison_headers(tables, "bigrams"), tablefmt="github"))
+        report.write("\n\n")
+
+        report.write("Common Trigrams (sorted by difference):\n")
+        report.write(tabulate(tables["trigrams"], headers=comparison_headers(tables, "trigrams"), tablefmt="github"))
+        report.write("\n\n")
+
+        report.write("Top Job Description Unigrams Missing in CV:\n")
+        report.write(tabulate(tables["missing"], headers=comparison_headers(tables, "missing"), tablefmt="github"))
+        report.write("\n\n")
+
+    print("Comparison results appended to the detailed report.")
+    return tables
+
+def rank_bullet_points(description, job_keywords, scores=None):
+    # Score each bullet point based on keyword matches, unless precomputed scores are given
+    if scores is None:
+        scores = [sum(1 for word in job_keywords if word.lower() in bullet.lower()) for bullet in description]
+    scored_bullets = list(zip(description, scores))
 
     # Sort bullet points by score in descending order
     scored_bullets.sort(key=lambda x: x[1], reverse=True)
@@ -62,70 +171,183 @@ def rank_bullet_points(description, job_keywords):
     # Return only the sorted bullet points
     return [bullet for bullet, _ in scored_bullets]
 
-def generate_custom_cv(job_keywords, cv_data, output_path="custom_cv.txt"):
-    def match_score(item):
-        desc = item.get("description", [])
-        if isinstance(desc, str):
-            desc = [desc]
-        skills = item.get("skills", [])
-        text = " ".join(desc + skills)
-        return sum(1 for word in job_keywords if word in text.lower())
+def rank_entries(entries, scores):
+    """
+    Returns (position, entry) pairs sorted by descending score, keeping database order for ties.
+    """
+    return sorted(enumerate(entries), key=lambda pair: scores[pair[0]], reverse=True)
+
+def job_keywords_of(job):
+    """
+    Returns the keyword list of a job description given as a DocumentAnalysis or as a list of words.
+    """
+    return job.words if isinstance(job, DocumentAnalysis) else job
+
+def _project_block(proj):
+    return f"{proj['name']} ({proj['year']})\n - {proj['description']}\n\n"
+
+def _custom_cv_text(experience, projects, education, skills=None):
+    """
+    Renders the custom CV draft.
+
+    :param experience: List of (experience entry, bullet points to show) pairs.
+    :param projects: Project entries to show.
+    :param education: Education entries.
+    :param skills: Skills to list in a skills section (optional, no section if None).
+    """
+    parts = ["CUSTOM CV DRAFT\n\n", "EXPERIENCE:\n"]
+    for job, bullets in experience:
+        parts.append(f"{job['title']} - {job['company']}\n")
+        parts.append(f"{job.get('location', '')} | {job['start_date']} to {job['end_date']}\n")
+        parts.extend(f" - {line}\n" for line in bullets)
+        parts.append("\n")
+
+    parts.append("PROJECTS:\n")
+    parts.extend(_project_block(proj) for proj in projects)
+
+    if skills is not None:
+        parts.append("SKILLS:\n")
+        if skills:
+            parts.append(", ".join(skills) + "\n")
+        parts.append("\n")
+
+    parts.append("EDUCATION:\n")
+    for edu in education:
+        parts.append(f"{edu['degree']} - {edu['institution']}, {edu['location']}\n")
+        parts.append(f"Graduated: {edu['graduation_year']}\n")
+        if "thesis" in edu:
+            parts.append(f"Thesis: {edu['thesis']}\n")
+        parts.append("\n")
+    return "".join(parts)
+
+def selection_candidates(cv_data, weights):
+    """
+    Returns the Candidates of a budgeted custom CV: every experience bullet, every project and every listed skill,
+    each with the job description keywords it contains and its length as rendered in the draft.
+    """
+    from cv_selection import Candidate, content_keywords
+
+    def keywords(text):
+        return frozenset(keyword for keyword in content_keywords(text) if keyword in weights)
+
+    candidates = []
+    for position, job in enumerate(cv_data.get("experience", [])):
+        for bullet_position, bullet in enumerate(job.get("description", [])):
+            candidates.append(Candidate("bullet", (position, bullet_position), len(f" - {bullet}\n"), keywords(bullet)))
+    for section in ("work", "personal"):
+        for position, proj in enumerate(cv_data.get("projects", {}).get(section, [])):
+            candidates.append(Candidate("project", (section, position), len(_project_block(proj)), keywords(f"{proj['name']} {proj['description']}")))
+    seen = set()
+    for category_skills in (cv_data.get("skills") or {}).values():
+        for skill in category_skills or []:
+            if str(skill).lower() not in seen:
+                seen.add(str(skill).lower())
+                # A listed skill costs its name plus the ", " separating it from the next one
+                candidates.append(Candidate("skill", str(skill), len(str(skill)) + 2, keywords(skill)))
+    return candidates
+
+def generate_custom_cv(job_keywords, cv_data, output_path="custom_cv.txt", keyword_index=None, term_weights=None, max_chars=None):
+    """
+    Writes a custom CV draft with the experience entries, bullet points and projects ranked by job description keyword matches.
+
+    Without a budget, every bullet point of every experience entry is kept, with the top 2 work projects and the top personal project.
+    With `max_chars`, the bullet points, projects and skills maximizing the coverage of the job description's keywords are
+    selected so that the whole draft fits in `max_chars` characters (see `cv_selection.select_content`).
+
+    :param job_keywords: DocumentAnalysis of the job description, or its list of words.
+    :param cv_data: The parsed CV database.
+    :param output_path: Path to write the draft to.
+    :param keyword_index: KeywordIndex of the CV database (optional, built if None).
+    :param term_weights: IDF weights of the job description's words (optional).
+    :param max_chars: Length budget of the draft in characters (optional, no budget if None).
+    :return: The Selection made under the budget, or None without a budget.
+    """
+    job_keywords = job_keywords_of(job_keywords)
+
+    # Score every entry and bullet in one pass over the distinct job keywords, weighted by rarity if IDF weights are given
+    if keyword_index is None:
+        keyword_index = KeywordIndex(cv_data)
+    scores = keyword_index.score(job_keywords, weights=term_weights)
 
     # Include all work experiences in the "EXPERIENCE" section
     all_experience = cv_data.get("experience", [])
-    top_experience = sorted(all_experience, key=match_score, reverse=True)
+    top_experience = rank_entries(all_experience, scores.entries("experience"))
+    ranked_work = rank_entries(cv_data.get("projects", {}).get("work", []), scores.entries("projects.work"))
+    ranked_personal = rank_entries(cv_data.get("projects", {}).get("personal", []), scores.entries("projects.personal"))
+    education = cv_data.get("education", [])
+
+    def ranked_bullets(position, job, keep=None):
+        # Rank bullet points, keeping only the selected ones under a budget
+        description = job.get("description", [])
+        bullet_scores = scores.bullets("experience", position)
+        if keep is not None:
+            kept = [(bullet, score) for i, (bullet, score) in enumerate(zip(description, bullet_scores)) if (position, i) in keep]
+            description, bullet_scores = [bullet for bullet, _ in kept], [score for _, score in kept]
+        return rank_bullet_points(description, job_keywords, scores=bullet_scores)
+
+    selection = None
+    if max_chars is None:
+        # Reintroduce logic for selecting top projects
+        top_projects = [proj for _, proj in ranked_work[:2]]
+        top_personal_projects = [proj for _, proj in ranked_personal[:1]]
+        text = _custom_cv_text(
+            [(job, ranked_bullets(position, job)) for position, job in top_experience],
+            top_projects + top_personal_projects,
+            education
+        )
+    else:
+        from cv_selection import keyword_weights, print_selection_summary, select_content
+        # Headers and education are always written; the selected content shares what is left of the budget
+        fixed_chars = len(_custom_cv_text([(job, []) for _, job in top_experience], [], education, skills=[]))
+        weights = keyword_weights(job_keywords, term_weights)
+        selection = select_content(selection_candidates(cv_data, weights), weights, max_chars - fixed_chars)
+        if fixed_chars > max_chars:
+            print(f"Warning: The CV headers and education alone take {fixed_chars} characters, over the budget of {max_chars}.")
 
-    # Reintroduce logic for selecting top projects
-    top_projects = sorted(cv_data.get("projects", {}).get("work", []), key=match_score, reverse=True)[:2]
-    top_personal_projects = sorted(cv_data.get("projects", {}).get("personal", []), key=match_score, reverse=True)[:1]
+        bullets = selection.keys("bullet")
+        projects = selection.keys("project")
+        skills = selection.keys("skill")
+        text = _custom_cv_text(
+            [(job, ranked_bullets(position, job, keep=bullets)) for position, job in top_experience],
+            [proj for position, proj in ranked_work if ("work", position) in projects]
+            + [proj for position, proj in ranked_personal if ("personal", position) in projects],
+            education,
+            skills=[candidate.key for candidate in selection.candidates if candidate.kind == "skill" and candidate.key in skills]
+        )
+        print_selection_summary(selection)
 
-    # Start writing the custom CV
     with open(output_path, 'w') as out:
-        out.write("CUSTOM CV DRAFT\n\n")
-
-        out.write("EXPERIENCE:\n")
-        for job in top_experience:
-            out.write(f"{job['title']} - {job['company']}\n")
-            out.write(f"{job.get('location', '')} | {job['start_date']} to {job['end_date']}\n")
-            # Rank and write bullet points
-            ranked_bullets = rank_bullet_points(job.get("description", []), job_keywords)
-            for line in ranked_bullets:
-                out.write(f" - {line}\n")
-            out.write("\n")
-
-        out.write("PROJECTS:\n")
-        for proj in top_projects + top_personal_projects:
-            out.write(f"{proj['name']} ({proj['year']})\n")
-            out.write(f" - {proj['description']}\n")
-            out.write("\n")
-
-        out.write("EDUCATION:\n")
-        for edu in cv_data.get("education", []):
-            out.write(f"{edu['degree']} - {edu['institution']}, {edu['location']}\n")
-            out.write(f"Graduated: {edu['graduation_year']}\n")
-            if "thesis" in edu:
-                out.write(f"Thesis: {edu['thesis']}\n")
-            out.write("\n")
+        out.write(text)
 
     print(f"\nCustom CV draft saved to '{output_path}'")
+    return selection
+
+def generate_detailed_report(job_keywords, cv_data, output_path="output/detailed_report.txt", job_file_name="Unknown Job Description", keyword_index=None, term_weights=None, skill_matcher=None):
+    # Skill phrases are matched on every token, since stopwords can sit inside them (e.g. "quality of service")
+    job_tokens = job_keywords.tokens if isinstance(job_keywords, DocumentAnalysis) else job_keywords
+    job_keywords = job_keywords_of(job_keywords)
+    if keyword_index is None:
+        keyword_index = KeywordIndex(cv_data)
+    scores = keyword_index.score(job_keywords, weights=term_weights)
+    if skill_matcher is None:
+        skill_matcher = SkillMatcher.from_cv_data(cv_data)
+    skills = skill_matcher.compare(job_tokens)
 
-def generate_detailed_report(job_keywords, cv_data, output_path="output/detailed_report.txt", job_file_name="Unknown Job Description"):
     with open(output_path, 'w') as report:
         report.write("DETAILED CV ANALYSIS REPORT\n\n")
         report.write(f"Based on Job Description: {job_file_name}\n\n")
 
         report.write("EXPERIENCE:\n")
-        for job in cv_data.get("experience", []):
+        for position, job in enumerate(cv_data.get("experience", [])):
             report.write(f"{job['title']} - {job['company']}\n")
             report.write(f"{job.get('location', '')} | {job['start_date']} to {job['end_date']}\n")
             # Score and write bullet points
-            scored_bullets = []
-            for bullet in job.get("description", []):
-                score = sum(1 for word in job_keywords if word.lower() in bullet.lower())
-                scored_bullets.append((bullet, score))
+            scored_bullets = list(zip(job.get("description", []), scores.bullets("experience", position)))
 
             scored_bullets.sort(key=lambda x: x[1], reverse=True)
             for bullet, score in scored_bullets:
+                # TF-IDF scores are fractional; plain keyword counts keep their integer form
+                score = f"{score:.2f}" if term_weights is not None else score
                 report.write(f" ({score}) {bullet}\n")
             report.write("\n")
 
@@ -143,4 +365,17 @@ def generate_detailed_report(job_keywords, cv_data, output_path="output/detailed
                 report.write(f"Thesis: {edu['thesis']}\n")
             report.write("\n")
 
+        report.write("SKILLS:\n")
+        report.write("Matched in the job description:\n")
+        for skill, count in skills.matched:
+            report.write(f" ({count}) {skill}\n")
+        if skills.missing:
+            report.write("Asked for but missing from the CV:\n")
+            for skill, count in skills.missing:
+                report.write(f" ({count}) {skill}\n")
+        report.write("Not mentioned in the job description:\n")
+        for skill in skills.extra:
+            report.write(f" - {skill}\n")
+        report.write("\n")
+
     print(f"\nDetailed report saved to '{output_path}'")
\ No newline at end of file
@@ -0,0 +1,143 @@
+import heapq
+from collections import Counter, namedtuple
+from dataclasses import dataclass, field
+from file_utils import normalize_text
+
+# Every further selected item covering a keyword adds this fraction of what the previous one added
+COVERAGE_DECAY = 0.5
+
+# kind: "bullet", "project" or "skill"; key: where the content sits in the CV database; cost: rendered characters
+Candidate = namedtuple("Candidate", ["kind", "key", "cost", "keywords"])
+
+def content_keywords(text):
+    """
+    Returns the distinct tokens of a text, normalized like job description words (see `normalize_text`).
+    """
+    return set(normalize_text(str(text)).split())
+
+def keyword_weights(job_keywords, term_weights=None):
+    """
+    Returns the weight of every job description keyword: its number of occurrences, times its
+    IDF weight if `term_weights` are given.
+    """
+    weights = Counter(job_keywords)
+    if term_weights is not None:
+        for keyword in weights:
+            weights[keyword] *= term_weights.get(keyword.lower(), 1.0)
+    return weights
+
+@dataclass
+class Selection:
+    """
+    Content picked for a length budget, with how well it covers the job description's keywords.
+
+    :param candidates: Every candidate considered.
+    :param chosen: Indexes of the selected candidates, in the order they were picked.
+    :param gains: Marginal gain of each selected candidate, as a fraction of the total keyword weight.
+    :param chars: Characters used by the selected candidates.
+    :param budget: Characters available to them.
+    :param coverage: Fraction of the total keyword weight covered by at least one selected candidate.
+    :param score: Diminishing-returns coverage of the selection, as a fraction of the total keyword weight.
+    :param attainable: Fraction of the total keyword weight covered by at least one candidate, the best coverage possible.
+    """
+    candidates: list
+    chosen: list = field(default_factory=list)
+    gains: list = field(default_factory=list)
+    chars: int = 0
+    budget: int = 0
+    coverage: float = 0.0
+    score: float = 0.0
+    attainable: float = 0.0
+
+    def keys(self, kind):
+        """
+        Returns the keys of the selected candidates of one kind.
+        """
+        return {self.candidates[index].key for index in self.chosen if self.candidates[index].kind == kind}
+
+    def counts(self, kind):
+        """
+        Returns (selected, available) candidate counts of one kind.
+        """
+        available = sum(1 for candidate in self.candidates if candidate.kind == kind)
+        return len(self.keys(kind)), available
+
+def select_content(candidates, weights, budget, decay=COVERAGE_DECAY):
+    """
+    Picks the candidates maximizing weighted keyword coverage within a character budget.
+
+    The objective gives each keyword its weight times 1 - decay^c, where c is the number of
+    selected candidates containing it, so covering a new keyword beats repeating a covered one.
+    It is submodular: a candidate's gain can only shrink as others are selected. The greedy
+    choice by gain per character therefore keeps every candidate in a max-heap under its last
+    known ratio, an upper bound, and only recomputes the gain of the one on top (lazy greedy).
+    The result is also compared with the best single candidate, which bounds the greedy's
+    worst case under a budget.
+
+    :param candidates: List of Candidates.
+    :param weights: Dictionary mapping keywords to their weight (see `keyword_weights`).
+    :param budget: Maximum total cost of the selected candidates.
+    :param decay: Fraction of a keyword's weight each further covering candidate adds.
+    :return: A Selection.
+    """
+    total = sum(weights.values())
+    selection = Selection(candidates=candidates, budget=max(budget, 0))
+    if total <= 0:
+        return selection
+    keywords = [[keyword for keyword in candidate.keywords if keyword in weights] for candidate in candidates]
+    selection.attainable = sum(weights[keyword] for keyword in set().union(*keywords)) / total
+
+    # What one more covering candidate adds for each keyword, scaled down by decay at every selection
+    marginal = {keyword: weight * (1 - decay) for keyword, weight in weights.items()}
+
+    def gain(index):
+        return sum(map(marginal.__getitem__, keywords[index]))
+
+    heap = []
+    for index, candidate in enumerate(candidates):
+        initial = gain(index)
+        if initial > 0 and candidate.cost <= budget:
+            heap.append((-initial / max(candidate.cost, 1), index))
+    heapq.heapify(heap)
+    best_single = max(((-ratio * max(candidates[index].cost, 1), index) for ratio, index in heap), default=None)
+
+    value = 0.0
+    while heap:
+        _, index = heapq.heappop(heap)
+        candidate = candidates[index]
+        # The budget only shrinks, so a candidate that does not fit now never will
+        if selection.chars + candidate.cost > budget:
+            continue
+        current = gain(index)
+        if current <= 0:
+            continue
+        ratio = current / max(candidate.cost, 1)
+        if heap and ratio < -heap[0][0]:
+            heapq.heappush(heap, (-ratio, index))
+            continue
+        selection.chosen.append(index)
+        selection.gains.append(current / total)
+        selection.chars += candidate.cost
+        value += current
+        for keyword in keywords[index]:
+            marginal[keyword] *= decay
+
+    if best_single is not None and best_single[0] > value:
+        selection.chosen, selection.gains, selection.chars = [best_single[1]], [best_single[0] / total], candidates[best_single[1]].cost
+        value = best_single[0]
+
+    covered = set().union(*(keywords[index] for index in selection.chosen))
+    selection.coverage = sum(weights[keyword] for keyword in covered) / total
+    selection.score = value / total
+    return selection
+
+def print_selection_summary(selection):
+    bullets, projects, skills = (selection.counts(kind) for kind in ("bullet", "project", "skill"))
+    print(
+        f"Selected {bullets[0]} of {bullets[1]} bullets, {projects[0]} of {projects[1]} projects and "
+        f"{skills[0]} of {skills[1]} skills in {selection.chars} of {selection.budget} characters"
+    )
+    print(
+        f"Keyword coverage: {selection.coverage:.1%} of the job description's keyword weight, out of "
+        f"{selection.attainable:.1%} the whole CV database covers (diminishing-returns score {selection.score:.3f})"
+    )
@@ -0,0 +1,86 @@
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+import yaml
+from cache import content_hash
+from file_utils import load_cv_yaml
+from keyword_index import KeywordIndex
+
+# Bump whenever the snapshot layout or anything it precomputes (e.g. KeywordIndex) changes
+SNAPSHOT_VERSION = "2"
+
+@dataclass
+class CVSnapshot:
+    """
+    Compiled form of the YAML CV database, with the derived data every run needs precomputed.
+
+    :param data: The parsed CV database.
+    :param keyword_index: KeywordIndex over the database (lowercased entry texts and tokenized bullets).
+    :param rendered_yaml: The database re-serialized as YAML for the model prompt.
+    """
+    data: dict
+    keyword_index: KeywordIndex
+    rendered_yaml: str
+
+def snapshot_path_for(yaml_path):
+    return yaml_path + ".snapshot"
+
+def build_cv_snapshot(yaml_path):
+    data = load_cv_yaml(yaml_path)
+    return CVSnapshot(
+        data=data,
+        keyword_index=KeywordIndex(data),
+        rendered_yaml=yaml.dump(data, default_flow_style=False).strip()
+    )
+
+def _write_snapshot(snapshot_path, header, snapshot):
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((header, snapshot), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, snapshot_path)
+    except OSError as e:
+        # A read-only config folder only costs the speed-up
+        print(f"Warning: Could not write CV database snapshot '{snapshot_path}': {e}")
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+
+def load_cv_snapshot(yaml_path):
+    """
+    Loads the compiled snapshot of a CV database, rebuilding it next to the YAML file
+    only when the YAML file's modification time or content changed.
+
+    :param yaml_path: Path to the CV database YAML file.
+    :return: A CVSnapshot.
+    """
+    snapshot_path = snapshot_path_for(yaml_path)
+    stat = os.stat(yaml_path)
+
+    header, snapshot = None, None
+    try:
+        with open(snapshot_path, 'rb') as f:
+            header, snapshot = pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError):
+        header, snapshot = None, None
+
+    if header is not None and header["version"] == SNAPSHOT_VERSION:
+        # Fast path: the YAML file was not touched since the snapshot was built
+        if header["mtime_ns"] == stat.st_mtime_ns and header["size"] == stat.st_size:
+            return snapshot
+
+    with open(yaml_path, 'rb') as f:
+        yaml_hash = content_hash(f.read())
+
+    if header is None or header["version"] != SNAPSHOT_VERSION or header["sha256"] != yaml_hash:
+        snapshot = build_cv_snapshot(yaml_path)
+
+    # Record the new modification time even when only the file was touched, so the next load takes the fast path
+    header = {"version": SNAPSHOT_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": yaml_hash}
+    _write_snapshot(snapshot_path, header, snapshot)
+    return snapshot
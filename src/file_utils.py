@@ -3,6 +3,8 @@ import string
 import yaml
 import shutil
 
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
 def load_stopwords(file_path):
     try:
         with open(file_path, 'r') as file:
@@ -12,15 +14,30 @@ def load_stopwords(file_path):
         print(f"Warning: Stopwords file '{file_path}' not found. Continuing without stopwords.")
         return set()
 
+def normalize_text(text):
+    """
+    Lowercases a text and strips its punctuation, the normalization every token of the pipeline goes through.
+    """
+    return text.lower().translate(_PUNCTUATION_TABLE)
+
 def load_text(file_path):
     try:
         with open(file_path, 'r') as file:
-            text = file.read().lower().translate(str.maketrans('', '', string.punctuation))
+            text = normalize_text(file.read())
         return text
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         exit(1)
 
+def load_raw_text(file_path):
+    # Unlike load_text, keep case and punctuation (e.g. for sentence segmentation)
+    try:
+        with open(file_path, 'r') as file:
+            return file.read()
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        exit(1)
+
 def load_cv_yaml(yaml_path):
     with open(yaml_path, 'r') as f:
         return yaml.safe_load(f)
@@ -0,0 +1,168 @@
+from collections import Counter
+from functools import lru_cache
+from file_utils import normalize_text
+
+# Query terms whose matching documents an index remembers; postings share most of their vocabulary
+TERM_CACHE_ENTRIES = 4096
+
+def iter_entry_sections(cv_data):
+    """
+    Yields (section, entries) for every CV database section whose entries are ranked against a job description.
+    """
+    projects = cv_data.get("projects", {})
+    yield "experience", cv_data.get("experience", [])
+    yield "projects.work", projects.get("work", [])
+    yield "projects.personal", projects.get("personal", [])
+
+def entry_text(item):
+    """
+    Returns the text an entry is matched against: its description followed by its skills.
+    """
+    desc = item.get("description", [])
+    if isinstance(desc, str):
+        desc = [desc]
+    skills = item.get("skills", [])
+    return " ".join(desc + skills)
+
+class KeywordIndex:
+    """
+    Inverted index from tokens to the bullets, entries and skills of a CV database.
+
+    The index is built once per CV database. Scoring a job description then walks the
+    postings of its distinct keywords instead of rescanning every bullet for every keyword.
+
+    Two matching modes are supported:
+    - "substring" (default) keeps the original semantics: a keyword counts for a text when it
+      occurs anywhere inside it (e.g. "data" matches "database"), once per occurrence of the
+      keyword in the job description.
+    - "token" only counts whole-token matches, with punctuation stripped as in `load_text`.
+    """
+
+    def __init__(self, cv_data, mode="substring"):
+        if mode not in ("substring", "token"):
+            raise ValueError(f"Unknown keyword matching mode '{mode}' (expected 'substring' or 'token').")
+        self.mode = mode
+        self.texts = []          # Lowercased text of every indexed document
+        self._entry_ids = {}     # section -> document id of each entry
+        self._bullet_ids = {}    # section -> document ids of each entry's bullets
+        self._skill_ids = {}     # skills category -> document id of each skill
+        self._postings = {}      # token -> ascending document ids containing it
+        self._documents = lru_cache(maxsize=TERM_CACHE_ENTRIES)(self._match_documents)
+
+        for section, items in iter_entry_sections(cv_data):
+            self._entry_ids[section] = [self._add(entry_text(item)) for item in items]
+            self._bullet_ids[section] = [
+                [self._add(bullet) for bullet in item.get("description", [])]
+                if isinstance(item.get("description", []), list) else []
+                for item in items
+            ]
+
+        for category, skills in (cv_data.get("skills") or {}).items():
+            self._skill_ids[category] = [self._add(str(skill)) for skill in skills or []]
+
+    def __getstate__(self):
+        # The term cache is per process: it is rebuilt on load rather than pickled into the CV database snapshot
+        state = dict(self.__dict__)
+        del state["_documents"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._documents = lru_cache(maxsize=TERM_CACHE_ENTRIES)(self._match_documents)
+
+    def _tokenize(self, text):
+        if self.mode == "token":
+            return normalize_text(text).split()
+        return text.split()
+
+    def _add(self, text):
+        doc_id = len(self.texts)
+        text = text.lower()
+        self.texts.append(text)
+        for token in set(self._tokenize(text)):
+            self._postings.setdefault(token, []).append(doc_id)
+        return doc_id
+
+    def _match_documents(self, term):
+        """
+        Returns the ids of the documents a single query term matches (cached per term by `_documents`).
+        """
+        if self.mode == "token":
+            tokens = self._tokenize(term.lower())
+            if len(tokens) == 1:
+                doc_ids = self._postings.get(tokens[0], [])
+            else:
+                doc_ids = []
+        elif any(char.isspace() for char in term):
+            # Multi-word terms can span tokens, so fall back to scanning the texts
+            doc_ids = [doc_id for doc_id, text in enumerate(self.texts) if term in text]
+        else:
+            # A term without whitespace occurs in a text exactly when it occurs inside one of its tokens
+            matched = set()
+            for token, postings in self._postings.items():
+                if term in token:
+                    matched.update(postings)
+            doc_ids = sorted(matched)
+        return doc_ids
+
+    def _accumulate(self, term_counts, weights=None):
+        scores = [0] * len(self.texts)
+        for term, count in term_counts.items():
+            if weights is not None:
+                count *= weights.get(term.lower(), 1.0)
+            for doc_id in self._documents(term):
+                scores[doc_id] += count
+        return scores
+
+    def score(self, job_keywords, weights=None):
+        """
+        Scores every indexed bullet, entry and skill against a job description in one pass over its distinct keywords.
+
+        :param job_keywords: List of job description keywords (duplicates count once per occurrence).
+        :param weights: Dictionary mapping lowercased keywords to a weight multiplying each of their hits,
+                        e.g. IDF weights from a TfidfIndex (optional, every keyword weighs 1 otherwise).
+        :return: A KeywordScores object.
+        """
+        term_counts = Counter(job_keywords)
+        lowered_counts = Counter()
+        for term, count in term_counts.items():
+            lowered_counts[term.lower()] += count
+
+        # Bullets and skills are matched with lowercased keywords, entries with the keywords as given
+        text_scores = self._accumulate(lowered_counts, weights)
+        if self.mode == "substring" and lowered_counts != term_counts:
+            entry_scores = self._accumulate(term_counts, weights)
+        else:
+            entry_scores = text_scores
+        return KeywordScores(self, entry_scores, text_scores)
+
+class KeywordScores:
+    """
+    Keyword scores of one job description against a KeywordIndex, addressed by CV database position.
+    """
+
+    def __init__(self, index, entry_scores, text_scores):
+        self._index = index
+        self._entry_scores = entry_scores
+        self._text_scores = text_scores
+
+    def entries(self, section):
+        """
+        Returns the score of every entry of a section (e.g. "experience" or "projects.work"), in database order.
+        """
+        return [self._entry_scores[doc_id] for doc_id in self._index._entry_ids.get(section, [])]
+
+    def bullets(self, section, position):
+        """
+        Returns the score of every bullet of the entry at `position` in a section, in database order.
+        """
+        return [self._text_scores[doc_id] for doc_id in self._index._bullet_ids[section][position]]
+
+    def skills(self):
+        """
+        Returns a dictionary mapping each skills category to the score of each of its skills.
+        """
+        return {
+            category: [self._text_scores[doc_id] for doc_id in doc_ids]
+            for category, doc_ids in self._index._skill_ids.items()
+        }
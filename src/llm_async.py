@@ -0,0 +1,124 @@
+import asyncio
+import random
+import time
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter for asyncio code.
+
+    The bucket holds up to `capacity` tokens (default: one minute's worth) and refills continuously
+    at `rate_per_minute`. Requests larger than the capacity wait for a full bucket and then drain it.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        # The lock keeps waiters in arrival order
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text
+    return max(1, len(text) // 4)
+
+def is_retryable(error):
+    """
+    Returns True for rate limiting (429), server errors (5xx), timeouts and connection errors.
+    """
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    # OpenAI's connection and timeout errors carry no status code
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+def retry_delay(error, attempt, base_delay, max_delay):
+    """
+    Returns the delay before the next attempt: the server's Retry-After if given, otherwise
+    exponential backoff with full jitter.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("retry-after") if hasattr(headers, "get") else None
+    if retry_after:
+        try:
+            return min(max_delay, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+async def run_prompts_async(prompts, client, model, max_concurrency=4, requests_per_minute=None, tokens_per_minute=None, max_retries=5, base_delay=1.0, max_delay=60.0, on_result=None):
+    """
+    Sends many prompts to the model concurrently.
+
+    :param prompts: List of (prompt_id, input_text) pairs.
+    :param client: Async client with the OpenAI `responses.create` interface (e.g. `AsyncOpenAI`).
+    :param model: Model name.
+    :param max_concurrency: Maximum number of requests in flight.
+    :param requests_per_minute: Request rate limit (optional).
+    :param tokens_per_minute: Prompt token rate limit, estimated from the input length (optional).
+    :param max_retries: Retries per prompt on 429s, 5xx errors, timeouts and connection errors.
+    :param base_delay: First backoff delay in seconds, doubled on every retry.
+    :param max_delay: Upper bound of a single backoff delay in seconds.
+    :param on_result: Callback called with each result as soon as its request completes (optional).
+    :return: The results, in completion order. Each is a dictionary with "prompt_id", "output_text"
+             (None on failure), "error", "attempts" and "latency_seconds".
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+    token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    async def run_one(prompt_id, input_text):
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            if request_bucket is not None:
+                await request_bucket.acquire()
+            if token_bucket is not None:
+                await token_bucket.acquire(estimate_tokens(input_text))
+            try:
+                async with semaphore:
+                    response = await client.responses.create(model=model, input=input_text)
+                return {
+                    "prompt_id": prompt_id,
+                    "output_text": response.output_text,
+                    "error": None,
+                    "attempts": attempt + 1,
+                    "latency_seconds": time.perf_counter() - start,
+                }
+            except Exception as e:
+                if attempt >= max_retries or not is_retryable(e):
+                    return {
+                        "prompt_id": prompt_id,
+                        "output_text": None,
+                        "error": repr(e),
+                        "attempts": attempt + 1,
+                        "latency_seconds": time.perf_counter() - start,
+                    }
+                # Back off outside the semaphore so other prompts keep the slot busy
+                await asyncio.sleep(retry_delay(e, attempt, base_delay, max_delay))
+                attempt += 1
+
+    results = []
+    for next_done in asyncio.as_completed([run_one(prompt_id, input_text) for prompt_id, input_text in prompts]):
+        result = await next_done
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    return results
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from cache import DiskCache, content_hash
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+RESPONSE_CACHE_DIR = os.path.join(OUTPUT_DIR, '.cache', 'responses')
+
+# Cached model responses expire after a week and the cache is kept under 64 MB
+RESPONSE_CACHE_TTL = 7 * 24 * 3600
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+class StubClient:
+    """
+    Offline stand-in for the OpenAI client.
+
+    It exposes the same `client.responses.create(model=..., input=...)` interface and returns
+    a canned `output_text`, so the response cache and parsing can be exercised without network access.
+
+    :param output_text: Text returned for every request.
+    :param latency: Seconds to wait before answering (optional).
+    """
+
+    def __init__(self, output_text, latency=0.0):
+        self.output_text = output_text
+        self.latency = latency
+        self.calls = []
+        self.responses = SimpleNamespace(create=self._create)
+
+    def _create(self, model, input, stream=False, **kwargs):
+        self.calls.append({"model": model, "input": input, "stream": stream, **kwargs})
+        if stream:
+            return self._stream_events()
+        if self.latency:
+            time.sleep(self.latency)
+        return SimpleNamespace(output_text=self.output_text, model=model)
+
+    def _stream_events(self, chunk_size=16):
+        # Spread the latency over the chunks, like a model producing tokens
+        chunks = [self.output_text[i:i + chunk_size] for i in range(0, len(self.output_text), chunk_size)]
+        for chunk in chunks:
+            if self.latency:
+                time.sleep(self.latency / len(chunks))
+            yield SimpleNamespace(type="response.output_text.delta", delta=chunk)
+        yield SimpleNamespace(type="response.completed")
+
+class AsyncStubClient(StubClient):
+    """
+    Asyncio counterpart of StubClient, with the `AsyncOpenAI` interface.
+    """
+
+    async def _create(self, model, input, **kwargs):
+        self.calls.append({"model": model, "input": input, **kwargs})
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return SimpleNamespace(output_text=self.output_text, model=model)
+
+def create_client(spec="openai"):
+    """
+    Creates the client used by `run_gpt_model`.
+
+    :param spec: "openai" for the OpenAI API, or "stub:<path>" for a StubClient answering with the content of <path>.
+    :return: An object with the `responses.create(model=..., input=...)` interface.
+    """
+    if spec.startswith("stub:"):
+        with open(spec[len("stub:"):], 'r') as f:
+            return StubClient(f.read())
+    if spec != "openai":
+        raise ValueError(f"Unknown model client '{spec}' (expected 'openai' or 'stub:<path>').")
+    from openai import OpenAI
+    return OpenAI()
+
+def create_async_client(spec="openai"):
+    """
+    Creates the asyncio client used by the batch model driver (see `create_client` for `spec`).
+    """
+    if spec.startswith("stub:"):
+        with open(spec[len("stub:"):], 'r') as f:
+            return AsyncStubClient(f.read())
+    if spec != "openai":
+        raise ValueError(f"Unknown model client '{spec}' (expected 'openai' or 'stub:<path>').")
+    from openai import AsyncOpenAI
+    # Retries are handled by llm_async with its own backoff and rate limits
+    return AsyncOpenAI(max_retries=0)
+
+def create_response_cache(directory=RESPONSE_CACHE_DIR, ttl=RESPONSE_CACHE_TTL, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+    return DiskCache(directory, max_bytes=max_bytes, ttl=ttl)
+
+def response_cache_key(model, prompt_template, input_text):
+    return content_hash("response", model, prompt_template, input_text)
+
+def response_entry(model, input_text, output_text, latency_seconds):
+    """
+    Returns the cached form of a model response: its raw output text plus metadata.
+    """
+    return {
+        "output_text": output_text,
+        "model": model,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "latency_seconds": latency_seconds,
+        "prompt_chars": len(input_text),
+        "response_chars": len(output_text),
+    }
+
+def stream_response(client, model, input_text, on_delta):
+    """
+    Streams the model output, calling `on_delta` with each piece of text as it arrives.
+
+    :return: The complete output text.
+    """
+    parts = []
+    for event in client.responses.create(model=model, input=input_text, stream=True):
+        if event.type == "response.output_text.delta":
+            parts.append(event.delta)
+            on_delta(event.delta)
+    return "".join(parts)
+
+def generate_response(client, model, input_text, prompt_template="", cache=None, refresh=False, on_delta=None):
+    """
+    Returns the model's output text for a fully formatted input, reusing a cached response
+    for the same model, prompt template and input unless `refresh` is set.
+
+    :param client: Model client (see `create_client`).
+    :param model: Model name.
+    :param input_text: Fully formatted model input.
+    :param prompt_template: Template the input was formatted from (part of the cache key).
+    :param cache: DiskCache of previous responses (optional, no caching if None).
+    :param refresh: Call the model even if a cached response exists, and overwrite it.
+    :param on_delta: Stream the output, calling this with each piece of text as it arrives (optional).
+                     A cached response is passed in one piece.
+    :return: A dictionary with the "output_text" and its metadata ("model", "created_at", "latency_seconds", "prompt_chars", "response_chars", "cached").
+    """
+    key = response_cache_key(model, prompt_template, input_text)
+    if cache is not None and not refresh:
+        entry = cache.get(key)
+        if entry is not None:
+            print(f"Reusing cached model response from {entry['created_at']} (use --refresh to regenerate).")
+            if on_delta is not None:
+                on_delta(entry["output_text"])
+            return dict(entry, cached=True)
+
+    start = time.perf_counter()
+    if on_delta is not None:
+        first_delta_seconds = None
+
+        def timed_delta(delta):
+            nonlocal first_delta_seconds
+            if first_delta_seconds is None:
+                first_delta_seconds = time.perf_counter() - start
+                print(f"First model output after {first_delta_seconds:.2f}s")
+            on_delta(delta)
+
+        output_text = stream_response(client, model, input_text, timed_delta)
+    else:
+        output_text = client.responses.create(model=model, input=input_text).output_text
+    entry = response_entry(model, input_text, output_text, time.perf_counter() - start)
+    if cache is not None:
+        cache.set(key, entry)
+    return dict(entry, cached=False)
@@ -0,0 +1,79 @@
+import os
+import re
+
+# Boundary between the CV and the cover letter: the first line mentioning a cover letter.
+# Shared with `analyze.parse_model_response`, so streamed and complete responses split alike.
+COVER_LETTER_LINE = re.compile(r"(?im)^.*cover letter.*$")
+
+class StreamingCVWriter:
+    """
+    Writes streamed model output to a CV file as it arrives.
+
+    Text is appended line by line. The first line mentioning a cover letter is replaced by the
+    "--- COVER LETTER ---" separator, and each section is stripped of surrounding whitespace, so
+    the finished file has the same layout as `write_cv_file`.
+
+    :param cv_path: Path of the file to write.
+    :param header: Header written before the CV (see `cv_header`).
+    :param on_cv_complete: Callback called with the CV section's text as soon as the cover letter starts (optional).
+    """
+
+    def __init__(self, cv_path, header, on_cv_complete=None):
+        os.makedirs(os.path.dirname(cv_path), exist_ok=True)
+        self.cv_path = cv_path
+        self.on_cv_complete = on_cv_complete
+        self.in_cover_letter = False
+        self._file = open(cv_path, 'w')
+        self._file.write(header)
+        self._file.flush()
+        self._text = []          # Everything received, for the final parse
+        self._line = ""          # Incomplete line waiting for its newline
+        self._section = []       # Text written for the current section
+        self._started = False    # Whether the current section has non-whitespace text yet
+        self._pending = ""       # Trailing whitespace only written if more text follows
+
+    def feed(self, delta):
+        self._text.append(delta)
+        self._line += delta
+        *lines, self._line = self._line.split("\n")
+        for line in lines:
+            self._handle_line(line + "\n")
+        self._file.flush()
+
+    def _handle_line(self, line):
+        if not self.in_cover_letter and COVER_LETTER_LINE.match(line.rstrip("\n")):
+            self.in_cover_letter = True
+            self._file.write("\n\n--- COVER LETTER ---\n\n")
+            self._file.flush()
+            cv_text = "".join(self._section)
+            self._section, self._started, self._pending = [], False, ""
+            if self.on_cv_complete is not None:
+                self.on_cv_complete(cv_text)
+            return
+        self._write(line)
+
+    def _write(self, text):
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return
+            self._started = True
+        body = text.rstrip()
+        if body:
+            self._file.write(self._pending + body)
+            self._section.append(self._pending + body)
+            self._pending = text[len(body):]
+        else:
+            self._pending += text
+
+    def close(self):
+        """
+        Writes the last incomplete line and closes the file.
+
+        :return: The complete model output received.
+        """
+        if self._line:
+            self._handle_line(self._line)
+            self._line = ""
+        self._file.close()
+        return "".join(self._text)
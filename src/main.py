@@ -1,12 +1,52 @@
 import argparse
 import os
-from file_utils import load_text, load_stopwords, load_cv_yaml, ensure_cv_database_exists
-from text_analysis import analyze_sentiment, generate_ngrams, find_context
-from visualization import plot_wordcloud_and_frequencies
-from cv_processing import load_cv_text, extract_cv_ngrams, compare_cv_and_job
-from collections import Counter
+import sys
+from file_utils import load_stopwords, ensure_cv_database_exists
+from text_analysis import load_job_analysis, DocumentAnalysis, summarize_job, print_job_summary
+from cv_processing import compare_cv_and_job
+from cache import DiskCache
+from cv_snapshot import load_cv_snapshot
+from artifact_store import detach
+from profiling import span
+
+def write_profile(profiler, args):
+    profiler.write(args.profile)
+    profiler.print_summary()
+    print(f"\nProfile trace saved to {args.profile} (open in chrome://tracing or https://ui.perfetto.dev)")
+    if profiler.profile_path and os.path.exists(profiler.profile_path):
+        print(f"cProfile stats of '{args.profile_stage}' saved to {profiler.profile_path}")
 
 def main():
+    # Batch mode analyzes a whole directory of job descriptions on a process pool
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from batch import batch_main
+        batch_main(sys.argv[2:])
+        return
+
+    # History lists the generated CVs recorded in the artifact store
+    if len(sys.argv) > 1 and sys.argv[1] == "history":
+        from artifact_store import history_main
+        history_main(sys.argv[2:])
+        return
+
+    # Serve mode keeps the CV database, stopwords and models loaded for many requests
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from server import serve_main
+        serve_main(sys.argv[2:])
+        return
+
+    # Similarity search ranks a folder of CVs or job descriptions against one document
+    if len(sys.argv) > 1 and sys.argv[1] == "similar":
+        from similarity import similar_main
+        similar_main(sys.argv[2:])
+        return
+
+    # N-gram counting streams a text file too large to load whole (e.g. a dump of scraped postings)
+    if len(sys.argv) > 1 and sys.argv[1] == "ngrams":
+        from token_stream import ngrams_main
+        ngrams_main(sys.argv[2:])
+        return
+
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     DATA_DIR = os.path.join(BASE_DIR, 'data')
     CONFIG_DIR = os.path.join(BASE_DIR, 'config')
@@ -18,13 +58,45 @@ def main():
     parser.add_argument("--stopwords", default=os.path.join(DATA_DIR, 'stopwords.txt'), help="Path to the stopwords file (default: stopwords.txt)")
     parser.add_argument("--cv_file", help="Path to the CV file to compare (optional)")
     parser.add_argument("--fast", action="store_true", help="Skip slow visualizations and context search")
+    parser.add_argument("--preview", action="store_true", help="Render the plots at low resolution for a quick look")
     parser.add_argument("--output_file", default="output/custom_cv.txt", help="Path to the output file for the tailored CV (default: output/custom_cv.txt)")
     parser.add_argument("--use_model", nargs="?", const="gpt-4o-mini", default=None, help="Specify the model to use (e.g., gpt-4o-mini, gpt-4o). If no model is specified, the default is gpt-4o-mini.")
     parser.add_argument("--cv_database", default=os.path.join(CONFIG_DIR, 'cv_database.yaml'), help="Path to the CV database file (default: config/cv_database.yaml)")
     parser.add_argument("--generate_cover_letter", action="store_true", help="Generate a cover letter for the job posting.")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", help="Do not reuse or store job description analyses and model responses in output/.cache")
+    parser.add_argument("--refresh", action="store_true", help="Call the model even if a cached response for the same model and input exists")
+    parser.add_argument("--stream", action="store_true", help="Write the model output to the CV file as it is generated and start the ATS check as soon as the CV section is complete")
+    parser.add_argument("--llm_client", default="openai", help="Model client: 'openai' (default) or 'stub:<path>' to answer offline with the content of <path>")
+    parser.add_argument("--context_terms", nargs="+", default=None, help="Terms or quoted phrases to show in context (e.g., python \"machine learning\"; default: the job description's top 5 keywords)")
+    parser.add_argument("--context_window", type=int, default=5, help="Number of words shown on each side of a context match (default: 5)")
+    parser.add_argument("--max_chars", type=int, default=None, help="Length budget of the tailored CV in characters: keep the bullet points, projects and skills that best cover the job description's keywords (default: no budget)")
+    parser.add_argument("--prompt_token_budget", type=int, default=None, help="With --use_model, maximum number of prompt tokens: leave out the CV entries, report lines and reference cover letters least relevant to the job description (default: no budget)")
+    parser.add_argument("--skills_taxonomy", default=None, help="Skills taxonomy file in config/ (one skill per line); the detailed report then also lists the skills the job description asks for that the CV lacks")
+    parser.add_argument("--tfidf", action="store_true", help="Add the job description to the TF-IDF index (output/tfidf_index) and weight keywords by how rare they are across all ingested postings")
+    parser.add_argument("--server", nargs="?", const="http://127.0.0.1:8766", default=None, help="Run on an analysis server started with `main.py serve` (default: http://127.0.0.1:8766)")
+    parser.add_argument("--profile", nargs="?", const=os.path.join(OUTPUT_DIR, 'profile.json'), default=None, help="Time every pipeline stage (wall, CPU, peak memory) and write a Chrome trace to this file (default: output/profile.json)")
+    parser.add_argument("--profile_stage", default=None, help="With --profile, also run this stage under cProfile (e.g., detailed_report) and dump its stats next to the trace")
+    parser.add_argument("--profile_timing_only", action="store_true", help="With --profile, skip peak memory tracking (tracemalloc slows allocation-heavy stages such as sentiment and plotting down several times)")
 
     args = parser.parse_args()
 
+    profiler = None
+    if args.profile:
+        import profiling
+        profiler = profiling.enable(
+            trace_memory=not args.profile_timing_only,
+            profile_stage=args.profile_stage,
+            profile_path=f"{os.path.splitext(args.profile)[0]}_{args.profile_stage}.prof" if args.profile_stage else None
+        )
+
+    # Delegate to a running server, which already has everything loaded
+    if args.server:
+        from server import run_via_server
+        run_via_server(args, args.server)
+        if profiler is not None:
+            write_profile(profiler, args)
+        return
+
     # Ensure the file path is relative to the appropriate directory
     job_file_path = os.path.join(DATA_DIR, os.path.basename(args.job_file))
 
@@ -34,88 +106,115 @@ def main():
         cv_file_path = None
 
     # Ensure the CV database exists
-    ensure_cv_database_exists(
-        os.path.join(CONFIG_DIR, 'cv_database_template.yaml'),
-        os.path.join(CONFIG_DIR, 'cv_database.yaml')
-    )
+    with span("ensure_cv_database"):
+        ensure_cv_database_exists(
+            os.path.join(CONFIG_DIR, 'cv_database_template.yaml'),
+            os.path.join(CONFIG_DIR, 'cv_database.yaml')
+        )
 
     # Ensure the stopwords file path is relative to the appropriate directory
     stopwords_file_path = os.path.join(DATA_DIR, os.path.basename(args.stopwords))
 
-    # Analyze job description
-    job_text = load_text(job_file_path)
-    stopwords = load_stopwords(stopwords_file_path)
-    job_words = [word for word in job_text.split() if word not in stopwords]
-
-    job_unigrams = Counter(job_words)
-    job_bigrams = generate_ngrams(job_words, 2)
-    job_trigrams = generate_ngrams(job_words, 3)
+    # Analyze job description once; every stage below shares this analysis
+    with span("load_stopwords"):
+        stopwords = load_stopwords(stopwords_file_path)
+    cache = None if args.no_cache else DiskCache(os.path.join(OUTPUT_DIR, '.cache', 'analysis'))
+    with span("job_analysis", cached=cache is not None):
+        job = load_job_analysis(job_file_path, stopwords, stopwords_file_path, cache=cache)
 
     # Load the selected CV database
     cv_database_path = os.path.join(CONFIG_DIR, os.path.basename(args.cv_database))
-    cv_data = load_cv_yaml(cv_database_path)
+    with span("cv_database"):
+        cv_snapshot = load_cv_snapshot(cv_database_path)
+    cv_data = cv_snapshot.data
 
     # Ensure the output file path is relative to the output directory
     output_file_path = os.path.join(OUTPUT_DIR, os.path.basename(args.output_file))
 
-    # Generate the tailored CV
+    # The snapshot carries the CV database's precompiled keyword index
+    keyword_index = cv_snapshot.keyword_index
+
+    # Compile the CV's skills (and the taxonomy, if any) into one automaton matched against the job description
+    from skill_matcher import load_skill_matcher
+    with span("skill_matcher"):
+        taxonomy_path = os.path.join(CONFIG_DIR, os.path.basename(args.skills_taxonomy)) if args.skills_taxonomy else None
+        skill_cache = None if args.no_cache else DiskCache(os.path.join(OUTPUT_DIR, '.cache', 'skills'))
+        skill_matcher = load_skill_matcher(cv_data, taxonomy_path, cache=skill_cache)
+
+    # Weight keywords by rarity across every job description ingested so far, this one included
+    term_weights = None
+    if args.tfidf:
+        from tfidf_index import TfidfIndex
+        with span("tfidf"):
+            tfidf_index = TfidfIndex()
+            tfidf_index.add_document(job.words, source=os.path.basename(job_file_path))
+            term_weights = tfidf_index.term_weights(job.words)
+        print(f"TF-IDF weights from {len(tfidf_index)} ingested job descriptions.")
+
+    # Generate the tailored CV (a previous model run may have linked this file to an archived CV)
     from cv_processing import generate_custom_cv
-    generate_custom_cv(job_words, cv_data, output_path=output_file_path)
+    with span("custom_cv"):
+        detach(output_file_path)
+        generate_custom_cv(job, cv_data, output_path=output_file_path, keyword_index=keyword_index, term_weights=term_weights, max_chars=args.max_chars)
 
     # Generate a detailed report
     from cv_processing import generate_detailed_report
-    generate_detailed_report(job_words, cv_data, output_path=os.path.join(OUTPUT_DIR, 'detailed_report.txt'), job_file_name=os.path.basename(job_file_path))
+    with span("detailed_report"):
+        generate_detailed_report(job, cv_data, output_path=os.path.join(OUTPUT_DIR, 'detailed_report.txt'), job_file_name=os.path.basename(job_file_path), keyword_index=keyword_index, term_weights=term_weights, skill_matcher=skill_matcher)
 
     # Compare the tailored CV with the job description
-    from analyze import compare_cv_to_jd
+    from cv_processing import compare_cv_to_jd
     compare_cv_to_jd(
-        job_file_path=job_file_path,
-        cv_file_path=os.path.join(OUTPUT_DIR, 'custom_cv.txt'),
-        output_path=os.path.join(OUTPUT_DIR, 'detailed_report.txt')
+        job_analysis=job,
+        cv_analysis=DocumentAnalysis.from_file(output_file_path, stopwords),
+        output_path=os.path.join(OUTPUT_DIR, 'detailed_report.txt'),
+        weights=term_weights
     )
 
-    # Existing analysis prints
-    print(f"Sentiment Analysis: {analyze_sentiment(job_text)}")
-
-    print("\nUnigrams:")
-    for word, count in job_unigrams.most_common(10):
-        print(f"{word}: {count}")
-
-    print("\nBigrams:")
-    for phrase, count in job_bigrams.most_common(10):
-        print(f"{' '.join(phrase)}: {count}")
-
-    print("\nTrigrams:")
-    for phrase, count in job_trigrams.most_common(10):
-        print(f"{' '.join(phrase)}: {count}")
-
-    # Generate word cloud and frequency plots
+    # Render the word cloud and frequency plots in the background while the pipeline continues
+    plot_future = None
     if not args.fast:
-        plot_wordcloud_and_frequencies(job_unigrams, job_bigrams, job_text)
-        find_context("python", job_text)
+        from visualization import FULL_DPI, PLOTS_DIR, PREVIEW_DPI, create_plot_cache, plot_document_analysis_async
+        plot_future = plot_document_analysis_async(
+            job,
+            os.path.join(PLOTS_DIR, f"{os.path.splitext(os.path.basename(job_file_path))[0]}.png"),
+            dpi=PREVIEW_DPI if args.preview else FULL_DPI,
+            cache=None if args.no_cache else create_plot_cache()
+        )
+
+    # Print the sentiment and n-grams, and show keywords in context from the positional index built once for the job description
+    context_terms = None
+    if not args.fast or args.context_terms:
+        context_terms = args.context_terms or [word for word, _ in job.unigrams.most_common(5)]
+    with span("job_summary"):
+        print_job_summary(summarize_job(job, context_terms=context_terms, context_window=args.context_window))
 
     # If a CV file is provided, perform CV analysis and compare with job description
     if cv_file_path:
-        cv_text, cv_counter = load_cv_text(cv_file_path, args.stopwords, load_text, load_stopwords)
-        cv_unigrams, cv_bigrams, cv_trigrams = extract_cv_ngrams(cv_text.split(), generate_ngrams)
+        with span("cv_comparison"):
+            cv = DocumentAnalysis.from_file(cv_file_path, stopwords)
 
-        # Compare the job description n-grams with CV n-grams
-        compare_cv_and_job(
-            (job_unigrams, job_bigrams, job_trigrams),
-            (cv_unigrams, cv_bigrams, cv_trigrams)
-        )
+            # Compare the job description n-grams with CV n-grams
+            compare_cv_and_job(job, cv, weights=term_weights)
 
     # Update logic to handle the --use_model flag
     model = args.use_model
     if model:
         from analyze import run_gpt_model
+        from llm_client import create_client, create_response_cache
         descriptive_copy_path = os.path.join(CV_DIR, f"{os.path.splitext(os.path.basename(job_file_path))[0].replace('_', ' ').title().replace(' ', '_')}_CV.txt")
 
         # Define the path to the cover letters folder
         COVER_LETTERS_DIR = os.path.join(BASE_DIR, 'cover_letters')
         os.makedirs(COVER_LETTERS_DIR, exist_ok=True)
 
-        run_gpt_model(
+        # When streaming, the ATS check runs on the CV section while the cover letter is still generating
+        from concurrent.futures import ThreadPoolExecutor
+        from analyze import validate_ats_content
+        ats_executor = ThreadPoolExecutor(max_workers=1)
+        ats_futures = []
+
+        artifact = run_gpt_model(
             job_file_path=job_file_path,
             cv_database_path=cv_database_path,
             detailed_report_path=os.path.join(OUTPUT_DIR, 'detailed_report.txt'),
@@ -123,36 +222,55 @@ def main():
             descriptive_copy_path=descriptive_copy_path,
             cover_letter_output_path=os.path.join(OUTPUT_DIR, f"Cover_Letter_{os.path.splitext(os.path.basename(job_file_path))[0]}.txt"),
             reference_folder=COVER_LETTERS_DIR if args.generate_cover_letter else None,
-            model=model
+            model=model,
+            client=create_client(args.llm_client),
+            cache=None if args.no_cache else create_response_cache(),
+            refresh=args.refresh,
+            stream=args.stream,
+            on_cv_complete=lambda cv_text: ats_futures.append(ats_executor.submit(validate_ats_content, cv_text)),
+            prompt_token_budget=args.prompt_token_budget
         )
         print(f"Generated CV saved to: {descriptive_copy_path}")
 
-        # Create an archive folder for CV .txt files
-        ARCHIVE_DIR = os.path.join(BASE_DIR, 'archive')
-        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        # The CV was archived under its content hash; list past versions with `main.py history`
+        if artifact is not None:
+            print(f"Archived CV as {artifact['sha256'][:12]} (see: python main.py history --job {os.path.basename(job_file_path)})")
 
-        # Archive the resulting CV .txt file with a timestamp
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        archive_file_path = os.path.join(ARCHIVE_DIR, f"{os.path.splitext(os.path.basename(output_file_path))[0]}_{timestamp}.txt")
-        os.rename(output_file_path, archive_file_path)
-        print(f"Archived CV to: {archive_file_path}")
-
-        # Convert the Markdown CV to PDF format only
-        from analyze import convert_md_to_pdf_and_word
+        # Convert the Markdown CV to PDF in the background while the CV is checked and compared
+        from pdf_queue import PdfQueue
         markdown_copy_path = descriptive_copy_path.replace('.txt', '.md')
-        convert_md_to_pdf_and_word(markdown_copy_path)
+        pdf_queue = PdfQueue(workers=1)
+        pdf_queue.submit(markdown_copy_path)
 
-        # Validate the Markdown CV for ATS-friendly formatting
-        from analyze import validate_ats_friendly_format
-        validate_ats_friendly_format(markdown_copy_path)
+        # Validate the Markdown CV for ATS-friendly formatting, unless it was already checked while streaming
+        with span("ats_check"):
+            if ats_futures:
+                ats_futures[0].result()
+            else:
+                from analyze import validate_ats_friendly_format
+                validate_ats_friendly_format(markdown_copy_path)
+        ats_executor.shutdown()
 
-        # Compare the tailored CV with the job description and append results to the rewritten CV
+        # Compare the tailored CV with the job description and append results to the rewritten CV,
+        # on a private copy so the archived CV stays unchanged
+        detach(descriptive_copy_path)
         compare_cv_to_jd(
-            job_file_path=job_file_path,
-            cv_file_path=descriptive_copy_path,
+            job_analysis=job,
+            cv_analysis=DocumentAnalysis.from_file(descriptive_copy_path, stopwords),
             output_path=descriptive_copy_path,  # Append results to the same file
         )
 
+        from pdf_queue import print_conversion_summary
+        with span("pdf_wait"):
+            print_conversion_summary(pdf_queue.wait())
+
+    if plot_future is not None:
+        with span("plot_wait"):
+            plot_path, reused = plot_future.result()
+        print(f"\nPlots saved to {plot_path}{' (cached)' if reused else ''}")
+
+    if profiler is not None:
+        write_profile(profiler, args)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
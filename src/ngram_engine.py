@@ -0,0 +1,239 @@
+from collections import Counter
+from collections.abc import Mapping
+import numpy as np
+
+# Token ids are packed ID_BITS at a time into int64 keys, which fits trigrams of a 2M-token vocabulary
+ID_BITS = 21
+MAX_VOCABULARY = 1 << ID_BITS
+ID_MASK = MAX_VOCABULARY - 1
+MAX_N = 63 // ID_BITS
+
+class Vocabulary:
+    """
+    Interned token vocabulary mapping each distinct token to a dense integer id.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self._tokens = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def encode(self, tokens):
+        """
+        Returns the ids of `tokens` as an int64 array, adding unseen tokens to the vocabulary.
+        """
+        ids = self.ids
+        setdefault = ids.setdefault
+        encoded = np.fromiter((setdefault(token, len(ids)) for token in tokens), dtype=np.int64, count=len(tokens))
+        if len(ids) > MAX_VOCABULARY:
+            raise ValueError(f"Vocabulary exceeds {MAX_VOCABULARY} distinct tokens.")
+        return encoded
+
+    def lookup(self, tokens):
+        """
+        Returns the ids of `tokens` without adding them, or None if any token is unknown.
+        """
+        try:
+            return [self.ids[token] for token in tokens]
+        except KeyError:
+            return None
+
+    @property
+    def tokens(self):
+        # Dictionaries keep insertion order, so the id of a token is its position in the key list
+        if len(self._tokens) != len(self.ids):
+            self._tokens = list(self.ids)
+        return self._tokens
+
+    def __getstate__(self):
+        return {"ids": self.ids}
+
+    def __setstate__(self, state):
+        self.ids = state["ids"]
+        self._tokens = []
+
+def pack_ngrams(ids, n):
+    """
+    Packs every n-gram of an id array into one int64 key per position.
+    """
+    if n > MAX_N:
+        raise ValueError(f"N-grams longer than {MAX_N} tokens cannot be packed into int64 keys.")
+    count = len(ids) - n + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.int64)
+    keys = ids[:count].copy()
+    for offset in range(1, n):
+        keys <<= ID_BITS
+        keys |= ids[offset:offset + count]
+    return keys
+
+def unpack_ngrams(keys, n):
+    """
+    Returns the (len(keys), n) id matrix of packed n-gram keys.
+    """
+    columns = [(keys >> (ID_BITS * (n - 1 - position))) & ID_MASK for position in range(n)]
+    return np.stack(columns, axis=1) if len(keys) else np.empty((0, n), dtype=np.int64)
+
+class NgramCounts(Mapping):
+    """
+    Counts of the n-grams of one token sequence, stored as sorted packed int64 keys.
+
+    It is a read-only Mapping with the Counter interface the pipeline uses (`most_common`,
+    lookups returning 0 for missing n-grams, `get`, `keys`, `items`, `len`, `total`), iterating
+    in first-occurrence order and breaking `most_common` ties by first occurrence, exactly like a
+    Counter built from the same sequence. It compares equal to that Counter, `Counter(counts)`
+    copies its counts, and adding a Counter returns a Counter.
+
+    :param vocabulary: Vocabulary the keys refer to.
+    :param n: N-gram length.
+    :param keys: Sorted unique packed keys.
+    :param counts: Count of each key.
+    :param first: Position of each key's first occurrence.
+    :param scalar_keys: For unigrams, use plain tokens as keys instead of 1-tuples.
+    """
+
+    def __init__(self, vocabulary, n, keys, counts, first, scalar_keys=False):
+        self.vocabulary = vocabulary
+        self.n = n
+        self.keys_array = keys
+        self.counts = counts
+        self.first = first
+        self.scalar_keys = scalar_keys and n == 1
+
+    @classmethod
+    def from_ids(cls, vocabulary, ids, n, scalar_keys=False):
+        keys, first, counts = np.unique(pack_ngrams(ids, n), return_index=True, return_counts=True)
+        return cls(vocabulary, n, keys, counts.astype(np.int64), first.astype(np.int64), scalar_keys)
+
+    @classmethod
+    def from_tokens(cls, tokens, n, vocabulary=None, scalar_keys=False):
+        vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        return cls.from_ids(vocabulary, vocabulary.encode(tokens), n, scalar_keys)
+
+    def _decode(self, positions):
+        tokens = self.vocabulary.tokens
+        rows = unpack_ngrams(self.keys_array[positions], self.n)
+        if self.scalar_keys:
+            return [tokens[row[0]] for row in rows.tolist()]
+        return [tuple(tokens[token_id] for token_id in row) for row in rows.tolist()]
+
+    def _encode(self, key):
+        tokens = (key,) if self.scalar_keys else key
+        if not isinstance(tokens, tuple) or len(tokens) != self.n:
+            return None
+        ids = self.vocabulary.lookup(tokens)
+        if ids is None:
+            return None
+        packed = 0
+        for token_id in ids:
+            packed = (packed << ID_BITS) | token_id
+        return packed
+
+    def _position(self, key):
+        packed = self._encode(key)
+        if packed is None:
+            return None
+        position = int(np.searchsorted(self.keys_array, packed))
+        if position < len(self.keys_array) and self.keys_array[position] == packed:
+            return position
+        return None
+
+    def _first_occurrence_order(self):
+        return np.argsort(self.first, kind="stable")
+
+    def __len__(self):
+        return len(self.keys_array)
+
+    def __getitem__(self, key):
+        position = self._position(key)
+        return 0 if position is None else int(self.counts[position])
+
+    def __contains__(self, key):
+        return self._position(key) is not None
+
+    def get(self, key, default=None):
+        position = self._position(key)
+        return default if position is None else int(self.counts[position])
+
+    def __eq__(self, other):
+        if isinstance(other, NgramCounts) and other.vocabulary is self.vocabulary and other.n == self.n:
+            return np.array_equal(self.keys_array, other.keys_array) and np.array_equal(self.counts, other.counts)
+        if isinstance(other, Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __add__(self, other):
+        if not isinstance(other, (NgramCounts, Counter)):
+            return NotImplemented
+        return self.to_counter() + (other.to_counter() if isinstance(other, NgramCounts) else other)
+
+    def __radd__(self, other):
+        if not isinstance(other, Counter):
+            return NotImplemented
+        return other + self.to_counter()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return self._decode(self._first_occurrence_order())
+
+    def values(self):
+        return self.counts[self._first_occurrence_order()].tolist()
+
+    def items(self):
+        order = self._first_occurrence_order()
+        return list(zip(self._decode(order), self.counts[order].tolist()))
+
+    def total(self):
+        return int(self.counts.sum())
+
+    def most_common(self, k=None):
+        """
+        Returns the k most common n-grams and their counts, like `Counter.most_common`.
+        """
+        order = np.lexsort((self.first, -self.counts))
+        if k is not None:
+            order = order[:max(k, 0)]
+        return list(zip(self._decode(order), self.counts[order].tolist()))
+
+    def _keys_in_vocabulary(self, other):
+        """
+        Returns other's keys re-encoded with this object's vocabulary, and the positions of the
+        keys whose tokens all exist in it.
+        """
+        if other.vocabulary is self.vocabulary:
+            return other.keys_array, np.arange(len(other.keys_array))
+        translation = np.fromiter(
+            (self.vocabulary.ids.get(token, -1) for token in other.vocabulary.tokens),
+            dtype=np.int64, count=len(other.vocabulary)
+        )
+        translated = translation[unpack_ngrams(other.keys_array, other.n)] if len(other.keys_array) else np.empty((0, other.n), dtype=np.int64)
+        known = np.flatnonzero((translated >= 0).all(axis=1))
+        translated = translated[known]
+        keys = np.zeros(len(known), dtype=np.int64)
+        for position in range(other.n):
+            keys = (keys << ID_BITS) | translated[:, position]
+        return keys, known
+
+    def intersection(self, other):
+        """
+        Returns (key, self count, other count) for every n-gram present in both, in this object's first-occurrence order.
+        """
+        if other.n != self.n:
+            return []
+        other_keys, other_positions = self._keys_in_vocabulary(other)
+        order = np.argsort(other_keys, kind="stable")
+        _, self_index, other_index = np.intersect1d(self.keys_array, other_keys[order], assume_unique=True, return_indices=True)
+        other_index = other_positions[order[other_index]]
+
+        by_first = np.argsort(self.first[self_index], kind="stable")
+        self_index, other_index = self_index[by_first], other_index[by_first]
+        return list(zip(self._decode(self_index), self.counts[self_index].tolist(), other.counts[other_index].tolist()))
+
+    def to_counter(self):
+        return Counter(dict(self.items()))
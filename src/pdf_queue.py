@@ -0,0 +1,120 @@
+import hashlib
+import os
+import subprocess
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from profiling import span
+
+# Bump whenever the conversion changes in a way the command line does not show, so existing PDFs are rebuilt
+CONVERSION_VERSION = "1"
+
+ConversionResult = namedtuple("ConversionResult", ["source", "pdf_path", "status", "seconds", "error"])
+
+def pdf_path_for(source_path):
+    return os.path.splitext(source_path)[0] + '.pdf'
+
+def stamp_path_for(pdf_path):
+    # Hidden file next to the PDF holding the hash of the input it was built from
+    directory, name = os.path.split(pdf_path)
+    return os.path.join(directory, f".{name}.sha256")
+
+class PdfQueue:
+    """
+    Converts Markdown files to PDF with pandoc on a bounded pool of worker threads.
+
+    A conversion is skipped when the PDF exists and was built from the same input: the hash of
+    the Markdown, the pandoc command line and the template (if any) is stored next to each PDF.
+    Failures, including a missing pandoc, are collected in the results instead of stopping the run.
+
+    :param workers: Maximum number of pandoc processes running at once.
+    :param pdf_engine: LaTeX engine used by pandoc (default: xelatex, for Unicode support).
+    :param template: Path to a pandoc LaTeX template (optional).
+    """
+
+    def __init__(self, workers=2, pdf_engine="xelatex", template=None):
+        self.pdf_engine = pdf_engine
+        self.template = template
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf")
+        self._futures = []
+
+    def command(self, source_path, pdf_path):
+        command = ["pandoc", source_path, "-f", "markdown", "-o", pdf_path, f"--pdf-engine={self.pdf_engine}"]
+        if self.template is not None:
+            command.append(f"--template={self.template}")
+        return command
+
+    def conversion_key(self, source_path, pdf_path):
+        """
+        Returns the hash of everything the PDF depends on: the Markdown and the conversion template.
+        """
+        digest = hashlib.sha256(CONVERSION_VERSION.encode('utf-8'))
+        # The output path is part of the command line but not of the content
+        for argument in self.command("", ""):
+            digest.update(argument.encode('utf-8') + b"\0")
+        with open(source_path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+        if self.template is not None:
+            with open(self.template, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()
+
+    def convert(self, source_path, pdf_path=None):
+        """
+        Converts one file now, on the calling thread.
+
+        :return: A ConversionResult with the status "converted", "skipped" or "failed".
+        """
+        pdf_path = pdf_path or pdf_path_for(source_path)
+        start = time.perf_counter()
+        try:
+            key = self.conversion_key(source_path, pdf_path)
+            stamp_path = stamp_path_for(pdf_path)
+            if os.path.exists(pdf_path) and os.path.exists(stamp_path):
+                with open(stamp_path, 'r') as f:
+                    if f.read().strip() == key:
+                        return ConversionResult(source_path, pdf_path, "skipped", time.perf_counter() - start, None)
+
+            with span("pandoc", source=os.path.basename(source_path)):
+                subprocess.run(self.command(source_path, pdf_path), check=True, capture_output=True, text=True)
+            with open(stamp_path, 'w') as f:
+                f.write(key)
+        except FileNotFoundError as e:
+            error = "pandoc is not installed" if e.filename == "pandoc" else str(e)
+            return ConversionResult(source_path, pdf_path, "failed", time.perf_counter() - start, error)
+        except subprocess.CalledProcessError as e:
+            # Keep the end of pandoc's output, where LaTeX reports what went wrong
+            output = (e.stderr or e.stdout or "").strip().splitlines()
+            error = f"pandoc exited with status {e.returncode}" + (f": {output[-1]}" if output else "")
+            return ConversionResult(source_path, pdf_path, "failed", time.perf_counter() - start, error)
+        return ConversionResult(source_path, pdf_path, "converted", time.perf_counter() - start, None)
+
+    def submit(self, source_path, pdf_path=None):
+        """
+        Queues a conversion on the worker pool.
+
+        :return: A Future resolving to its ConversionResult.
+        """
+        future = self._executor.submit(self.convert, source_path, pdf_path)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        """
+        Waits for every queued conversion and shuts the pool down.
+
+        :return: The ConversionResults, in submission order.
+        """
+        results = [future.result() for future in self._futures]
+        self._executor.shutdown()
+        return results
+
+def print_conversion_summary(results):
+    print("\n--- PDF Conversion Summary ---\n")
+    for result in results:
+        print(f"{result.status:<9} {result.seconds:6.2f}s  {result.pdf_path}")
+    failures = [result for result in results if result.status == "failed"]
+    converted = sum(1 for result in results if result.status == "converted")
+    print(f"\nConverted: {converted}, skipped (unchanged): {len(results) - converted - len(failures)}, failed: {len(failures)}")
+    for result in failures:
+        print(f"Failed: {result.source}: {result.error}")
@@ -0,0 +1,205 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# The active Profiler, if profiling was enabled (see `enable`)
+_profiler = None
+
+# Returned by `span` when profiling is off, so instrumented code costs one function call
+_NO_SPAN = contextlib.nullcontext()
+
+class Profiler:
+    """
+    Records spans around pipeline stages (wall time, CPU time of the thread and peak traced
+    memory) and counters, and writes them as a Chrome trace (chrome://tracing, Perfetto).
+
+    Peak memory is measured with tracemalloc, which sees allocations from every thread: it is the
+    highest amount of memory allocated while the span was open, above what was allocated when it started.
+
+    :param trace_memory: Measure peak memory with tracemalloc (slows allocation-heavy code down).
+    :param profile_stage: Name of a span to run under cProfile (optional).
+    :param profile_path: Path the cProfile stats of `profile_stage` are dumped to.
+    """
+
+    def __init__(self, trace_memory=True, profile_stage=None, profile_path=None):
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.profile_path = profile_path
+        self.spans = []
+        self.counters = Counter()
+        self.counter_events = []
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cprofile = None
+        self._cprofile_owner = None
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        stack = self._stack()
+        frame = {"peak": 0}
+        if self.trace_memory:
+            start_memory, peak_before = tracemalloc.get_traced_memory()
+            if stack:
+                # reset_peak forgets the enclosing span's peak so far; keep it in its frame
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak_before)
+            tracemalloc.reset_peak()
+        stack.append(frame)
+        profile = name == self.profile_stage and self._start_cprofile()
+
+        start_cpu = time.thread_time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            cpu = time.thread_time() - start_cpu
+            if profile:
+                self._stop_cprofile()
+            stack.pop()
+            peak_bytes = None
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame["peak"])
+                peak_bytes = max(peak - start_memory, 0)
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "start": start - self.origin,
+                    "wall": wall,
+                    "cpu": cpu,
+                    "peak_bytes": peak_bytes,
+                    "depth": len(stack),
+                    "thread": threading.get_ident(),
+                    "thread_name": threading.current_thread().name,
+                    "args": args,
+                })
+
+    def _start_cprofile(self):
+        import cProfile
+        with self._lock:
+            # One cProfile at a time: a concurrent run of the same stage on another thread is not profiled
+            if self._cprofile_owner is not None:
+                return False
+            if self._cprofile is None:
+                self._cprofile = cProfile.Profile()
+            self._cprofile_owner = threading.get_ident()
+        self._cprofile.enable()
+        return True
+
+    def _stop_cprofile(self):
+        self._cprofile.disable()
+        with self._lock:
+            self._cprofile_owner = None
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+            self.counter_events.append((time.perf_counter() - self.origin, name, self.counters[name]))
+
+    def chrome_trace(self):
+        """
+        Returns the spans and counters in the Chrome trace event format.
+        """
+        pid = os.getpid()
+        events = []
+        for thread, thread_name in {(recorded["thread"], recorded["thread_name"]) for recorded in self.spans}:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": thread_name}})
+        for recorded in self.spans:
+            args = dict(recorded["args"], cpu_ms=round(recorded["cpu"] * 1000, 3))
+            if recorded["peak_bytes"] is not None:
+                args["peak_kb"] = round(recorded["peak_bytes"] / 1024, 1)
+            events.append({
+                "name": recorded["name"],
+                "ph": "X",
+                "ts": recorded["start"] * 1e6,
+                "dur": recorded["wall"] * 1e6,
+                "pid": pid,
+                "tid": recorded["thread"],
+                "args": args,
+            })
+        for timestamp, name, value in self.counter_events:
+            events.append({"name": name, "ph": "C", "ts": timestamp * 1e6, "pid": pid, "args": {"value": value}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "counters": dict(self.counters), "stages": self.stage_summary()}
+
+    def stage_summary(self):
+        """
+        Returns the spans aggregated by name, in order of first occurrence.
+        """
+        stages = {}
+        for recorded in sorted(self.spans, key=lambda recorded: recorded["start"]):
+            stage = stages.setdefault(recorded["name"], {"name": recorded["name"], "depth": recorded["depth"], "calls": 0, "wall": 0.0, "cpu": 0.0, "peak_bytes": None})
+            stage["calls"] += 1
+            stage["wall"] += recorded["wall"]
+            stage["cpu"] += recorded["cpu"]
+            if recorded["peak_bytes"] is not None:
+                stage["peak_bytes"] = max(stage["peak_bytes"] or 0, recorded["peak_bytes"])
+        return list(stages.values())
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        if self._cprofile is not None and self.profile_path:
+            self._cprofile.dump_stats(self.profile_path)
+
+    def print_summary(self):
+        print("\n--- Profile ---\n")
+        print(f"{'Stage':<32} {'Calls':>5} {'Wall ms':>10} {'CPU ms':>10} {'Peak MB':>9}")
+        for stage in self.stage_summary():
+            peak = f"{stage['peak_bytes'] / 1024 / 1024:9.2f}" if stage["peak_bytes"] is not None else f"{'-':>9}"
+            name = "  " * stage["depth"] + stage["name"]
+            print(f"{name:<32} {stage['calls']:>5} {stage['wall'] * 1000:10.1f} {stage['cpu'] * 1000:10.1f} {peak}")
+        for name, value in sorted(self.counters.items()):
+            print(f"{name}: {value}")
+
+def enable(trace_memory=True, profile_stage=None, profile_path=None):
+    """
+    Starts recording spans and counters for the rest of the process.
+
+    :return: The Profiler.
+    """
+    global _profiler
+    _profiler = Profiler(trace_memory=trace_memory, profile_stage=profile_stage, profile_path=profile_path)
+    return _profiler
+
+def span(name, **args):
+    """
+    Context manager timing a pipeline stage, a no-op unless profiling was enabled.
+    """
+    if _profiler is None:
+        return _NO_SPAN
+    return _profiler.span(name, **args)
+
+def traced(name):
+    """
+    Decorator running every call of a function in a span.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, value=1):
+    """
+    Adds `value` to a counter (e.g. prompt characters sent to the model) if profiling was enabled.
+    """
+    if _profiler is not None:
+        _profiler.count(name, value)
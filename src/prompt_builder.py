@@ -0,0 +1,229 @@
+import json
+import os
+import re
+from collections import Counter, namedtuple
+from datetime import datetime
+import yaml
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+PROMPT_TOKEN_LOG = os.path.join(OUTPUT_DIR, 'prompt_tokens.jsonl')
+
+REFERENCE_SEPARATOR = "\n\n===== COVER LETTER SEPARATOR =====\n\n"
+
+# Pieces a BPE tokenizer never merges across: contractions, letter runs, digit groups, punctuation runs, whitespace
+_PIECE = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+")
+
+# Lines of the detailed report (see `cv_processing.generate_detailed_report` and `compare_cv_to_jd`)
+_SCORED_LINE = re.compile(r"^ \((\d+(?:\.\d+)?)\) ")
+_TABLE_ROW = re.compile(r"^\|[^|]*\|\s*(\d+(?:\.\d+)?)\s*\|")
+_REPORT_SECTIONS = ("EXPERIENCE:", "PROJECTS:", "EDUCATION:", "SKILLS:")
+
+# Parts of the prompt that can be left out: kind ("reference", "report" or "cv"), key, relevance score
+Unit = namedtuple("Unit", ["kind", "key", "score"])
+
+PromptCompaction = namedtuple("PromptCompaction", ["input_text", "tokens_before", "tokens_after", "token_budget", "tokenizer", "dropped"])
+
+# Among units equally (ir)relevant, reference cover letters go first, then report lines, then CV content
+_KIND_ORDER = {"reference": 0, "report": 1, "cv": 2}
+
+# The database is re-rendered at every step of the budget search; libyaml emits the same YAML several times faster
+_YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
+class TokenCounter:
+    """
+    Counts prompt tokens locally: exactly with tiktoken when it is installed, otherwise with an
+    estimate that splits the text like a BPE pre-tokenizer and counts one token per piece (two
+    or more for long words).
+
+    :param model: Model name, to pick the tiktoken encoding (default: o200k_base, used by the gpt-4o family).
+    """
+
+    def __init__(self, model=None):
+        self._encoding = None
+        self.name = "regex estimate"
+        try:
+            import tiktoken
+        except ImportError:
+            return
+        try:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model or "")
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            # tiktoken downloads its vocabularies on first use, which fails offline
+            print(f"Warning: Could not load the tiktoken encoding ({e}). Estimating token counts instead.")
+            return
+        self.name = f"tiktoken {self._encoding.name}"
+
+    def count(self, text):
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return sum(1 + (len(piece) - 1) // 10 for piece in _PIECE.findall(text))
+
+def keyword_hits(text, job_counts):
+    """
+    Returns how often the job description uses the words of a text (each distinct word counted once).
+    """
+    return sum(job_counts.get(word, 0) for word in set(re.findall(r"[^\W_]+", text.lower())))
+
+def report_units(report_lines):
+    """
+    Returns the removable units of the detailed report's lines, keyed by the indexes of the lines they cover.
+
+    Experience bullets keep their keyword score, skills and comparison table rows their job
+    description count. The projects and education sections repeat the CV database and score 0,
+    as do the CV skills the job description does not mention.
+    """
+    units = []
+    section = None
+    for index, line in enumerate(report_lines):
+        if line in _REPORT_SECTIONS:
+            section = line
+            if section in ("PROJECTS:", "EDUCATION:"):
+                units.append(Unit("report", [index], 0))
+            continue
+        if line.startswith("--- "):
+            section = None
+        if section in ("PROJECTS:", "EDUCATION:"):
+            units[-1].key.append(index)
+            continue
+        scored = _SCORED_LINE.match(line)
+        row = _TABLE_ROW.match(line)
+        if section in ("EXPERIENCE:", "SKILLS:") and scored:
+            units.append(Unit("report", [index], float(scored.group(1))))
+        elif section == "SKILLS:" and line.startswith(" - "):
+            units.append(Unit("report", [index], 0))
+        elif section is None and row:
+            units.append(Unit("report", [index], float(row.group(1))))
+    return units
+
+def cv_units(cv_data, scores):
+    """
+    Returns the removable units of the CV database: every experience bullet and every project, with their keyword scores.
+
+    :param scores: KeywordScores of the job description (see `KeywordIndex.score`).
+    """
+    units = []
+    for position, job in enumerate(cv_data.get("experience", [])):
+        bullets = job.get("description", [])
+        if isinstance(bullets, list):
+            for bullet_position, score in enumerate(scores.bullets("experience", position)):
+                units.append(Unit("cv", ("experience", position, bullet_position), score))
+    for section in ("work", "personal"):
+        for position, score in enumerate(scores.entries(f"projects.{section}")):
+            units.append(Unit("cv", (section, position), score))
+    return units
+
+def render_cv_database(cv_data, dropped):
+    """
+    Renders the CV database as YAML without the dropped bullets and projects.
+    """
+    data = dict(cv_data)
+    data["experience"] = [
+        dict(job, description=[bullet for i, bullet in enumerate(job["description"]) if ("experience", position, i) not in dropped])
+        if isinstance(job.get("description"), list) else job
+        for position, job in enumerate(cv_data.get("experience", []))
+    ]
+    if "projects" in cv_data:
+        data["projects"] = {
+            section: [project for position, project in enumerate(projects or []) if (section, position) not in dropped]
+            for section, projects in cv_data["projects"].items()
+        }
+    return yaml.dump(data, Dumper=_YAML_DUMPER, default_flow_style=False).strip()
+
+def compact_prompt(prompt_template, company_name, job_description, detailed_report, cv_snapshot, reference_texts, job_keywords, token_budget, counter):
+    """
+    Formats the model input within a token budget, leaving out the content least relevant to the job description.
+
+    The removable units are the reference cover letters, the lines of the detailed report
+    (experience bullets, comparison table rows, the sections repeating the CV database) and the
+    CV database's bullets and projects. Units without any relevance go first, then the relevant
+    ones kind by kind in that order (their scores are not on the same scale), each kind from the
+    least relevant up, and the fewest units are left out that bring the prompt within the budget.
+    The prompt template, the job description and the rest of the CV database are always kept.
+
+    :param prompt_template: The prompt template (config/cv_prompt.txt).
+    :param company_name: Company name filled into the template.
+    :param job_description: Text of the job description.
+    :param detailed_report: Text of the detailed report.
+    :param cv_snapshot: CVSnapshot of the CV database.
+    :param reference_texts: Texts of the reference cover letters.
+    :param job_keywords: Stopword-filtered words of the job description.
+    :param token_budget: Maximum number of prompt tokens.
+    :param counter: TokenCounter.
+    :return: A PromptCompaction.
+    """
+    job_counts = Counter(job_keywords)
+    report_lines = detailed_report.strip().splitlines()
+
+    def render(dropped):
+        references = [text for index, text in enumerate(reference_texts) if ("reference", index) not in dropped]
+        report = "\n".join(line for index, line in enumerate(report_lines) if index not in dropped)
+        return prompt_template.format(
+            company_name=company_name,
+            job_description=job_description.strip(),
+            detailed_report=re.sub(r"\n{3,}", "\n\n", report),
+            cv_database=render_cv_database(cv_snapshot.data, dropped) if dropped else cv_snapshot.rendered_yaml,
+            reference_cover_letters=REFERENCE_SEPARATOR.join(references).strip()
+        )
+
+    full_text = render(set())
+    tokens_before = counter.count(full_text)
+    if tokens_before <= token_budget:
+        return PromptCompaction(full_text, tokens_before, tokens_before, token_budget, counter.name, Counter())
+
+    units = []
+    if "{reference_cover_letters}" in prompt_template:
+        units += [Unit("reference", ("reference", index), keyword_hits(text, job_counts)) for index, text in enumerate(reference_texts)]
+    units += report_units(report_lines)
+    units += cv_units(cv_snapshot.data, cv_snapshot.keyword_index.score(job_keywords))
+    units.sort(key=lambda unit: (unit.score > 0, _KIND_ORDER[unit.kind], unit.score))
+
+    def dropped_keys(count):
+        dropped = set()
+        for unit in units[:count]:
+            dropped.update(unit.key if unit.kind == "report" else [unit.key])
+        return dropped
+
+    # Leaving out more units never lengthens the prompt, so search for the fewest that fit
+    low, high = 1, len(units)
+    if counter.count(render(dropped_keys(high))) > token_budget:
+        print(f"Warning: The prompt exceeds the budget of {token_budget} tokens even without any removable content.")
+        low = high
+    while low < high:
+        middle = (low + high) // 2
+        if counter.count(render(dropped_keys(middle))) <= token_budget:
+            high = middle
+        else:
+            low = middle + 1
+
+    input_text = render(dropped_keys(low))
+    return PromptCompaction(input_text, tokens_before, counter.count(input_text), token_budget, counter.name, Counter(unit.kind for unit in units[:low]))
+
+def print_compaction(compaction):
+    saved = 1 - compaction.tokens_after / compaction.tokens_before if compaction.tokens_before else 0.0
+    dropped = ", ".join(f"{count} {kind} parts" for kind, count in sorted(compaction.dropped.items()))
+    print(
+        f"Prompt tokens: {compaction.tokens_before} -> {compaction.tokens_after} ({saved:.0%} fewer, budget {compaction.token_budget}, "
+        f"{compaction.tokenizer}){f'; left out {dropped}' if dropped else ''}"
+    )
+
+def log_prompt_tokens(compaction, job_file_path, model, latency_seconds=None, cached=False, log_path=PROMPT_TOKEN_LOG):
+    """
+    Appends the token counts of one model call to a JSON Lines log, with the call's latency, to measure what compaction saves.
+    """
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, 'a') as log_file:
+        log_file.write(json.dumps({
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "job": os.path.basename(job_file_path),
+            "model": model,
+            "tokenizer": compaction.tokenizer,
+            "token_budget": compaction.token_budget,
+            "tokens_before": compaction.tokens_before,
+            "tokens_after": compaction.tokens_after,
+            "latency_seconds": latency_seconds,
+            "cached": cached,
+        }) + "\n")
@@ -0,0 +1,77 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Sentences end at ., ! or ? followed by whitespace (except after common abbreviations), and at line breaks,
+# which separate the headings and bullet points of a posting
+SENTENCE_BOUNDARY = re.compile(r"(?<!\be\.g\.)(?<!\bi\.e\.)(?<!\bvs\.)(?<=[.!?])\s+|\s*\n\s*")
+BULLET_PREFIX = re.compile(r"^[\s•▪●◦‣\-*–—]+")
+
+SentenceSentiment = namedtuple("SentenceSentiment", ["sentence", "polarity", "subjectivity"])
+SentimentReport = namedtuple("SentimentReport", ["polarity", "subjectivity", "sentences"])
+
+# TextBlob's pattern sentiment analyzer, loaded once per process by load_lexicon
+_analyzer = None
+
+def load_lexicon():
+    """
+    Returns TextBlob's pattern sentiment analyzer with its lexicon loaded. The lexicon's XML file
+    is parsed by the first analysis, so it runs here once rather than inside the first request.
+    """
+    global _analyzer
+    if _analyzer is None:
+        from textblob.sentiments import PatternAnalyzer
+        analyzer = PatternAnalyzer()
+        analyzer.analyze("good", keep_assessments=True)
+        _analyzer = analyzer
+    return _analyzer
+
+def split_sentences(raw_text):
+    """
+    Splits raw (not lowercased or punctuation-stripped) text into sentences, dropping bullet markers and empty lines.
+    """
+    sentences = []
+    for sentence in SENTENCE_BOUNDARY.split(raw_text):
+        sentence = BULLET_PREFIX.sub("", sentence).strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+@lru_cache(maxsize=65536)
+def _score_sentence(sentence):
+    # Postings share a lot of boilerplate (benefits, equal opportunity statements), so repeated sentences are scored once
+    polarity, subjectivity, assessments = load_lexicon().analyze(sentence, keep_assessments=True)
+    return polarity, subjectivity, tuple((polarity, subjectivity) for _, polarity, subjectivity, _ in assessments)
+
+def score_sentences(sentences):
+    """
+    Scores a batch of sentences against the lexicon.
+
+    :return: A tuple of (list of SentenceSentiment, list of the (polarity, subjectivity) of every
+             opinion word or phrase found, for aggregation).
+    """
+    scored, assessments = [], []
+    for sentence in sentences:
+        polarity, subjectivity, sentence_assessments = _score_sentence(sentence)
+        scored.append(SentenceSentiment(sentence, polarity, subjectivity))
+        assessments.extend(sentence_assessments)
+    return scored, assessments
+
+def aggregate(scored, assessments):
+    """
+    Combines sentence scores into a SentimentReport. Like TextBlob on a whole text, the aggregate
+    polarity and subjectivity are the means over every opinion word or phrase in the document.
+    """
+    if not assessments:
+        return SentimentReport(0.0, 0.0, scored)
+    return SentimentReport(
+        sum(polarity for polarity, _ in assessments) / len(assessments),
+        sum(subjectivity for _, subjectivity in assessments) / len(assessments),
+        scored
+    )
+
+def analyze_text_sentiment(raw_text):
+    """
+    Returns the per-sentence and aggregate sentiment of a raw text.
+    """
+    return aggregate(*score_sentences(split_sentences(raw_text)))
@@ -0,0 +1,567 @@
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from profiling import span
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+CONFIG_DIR = os.path.join(BASE_DIR, 'config')
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+CV_DIR = os.path.join(BASE_DIR, 'cv')
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+DEFAULT_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+
+# Analyses kept in memory, so warm requests for the same posting skip even the disk cache
+ANALYSIS_MEMORY_ENTRIES = 64
+
+class ServerError(RuntimeError):
+    """
+    Raised by AnalysisClient when the server answers a request with an error.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(f"Server error {status}: {message}")
+        self.status = status
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    Stand-in for sys.stdout that sends what a request thread prints to that request's buffer,
+    so the pipeline functions' reports can be returned to the client that asked for them.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer if buffer is not None else self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    @contextlib.contextmanager
+    def capture(self):
+        self.local.buffer = io.StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            self.local.buffer = None
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    Long-running HTTP server that loads the stopwords, the CV database snapshot, the sentiment
+    lexicon and the heavy libraries once, then answers analysis requests from many clients.
+
+    Endpoints (POST, JSON bodies, see the handle_* functions): /analyze, /compare, /generate and
+    /ats, plus GET /health. Stages that write the shared files in output/ and cv/ run one at a time.
+
+    :param address: (host, port) to listen on.
+    :param stopwords_file_path: Path to the stopwords file.
+    :param cv_database_path: Path to the CV database file.
+    :param use_cache: Reuse and store job description analyses and model responses in output/.cache.
+    :param llm_client: Default model client spec (see `llm_client.create_client`).
+    :param skills_taxonomy_path: Path to a skills taxonomy file matched along with the CV's skills (optional).
+    """
+    daemon_threads = True
+
+    def __init__(self, address, stopwords_file_path, cv_database_path, use_cache=True, llm_client="openai", skills_taxonomy_path=None):
+        super().__init__(address, AnalysisRequestHandler)
+        if not isinstance(sys.stdout, _ThreadOutput):
+            sys.stdout = _ThreadOutput(sys.stdout)
+        start = time.perf_counter()
+        from cache import DiskCache
+        from cv_snapshot import load_cv_snapshot
+        from file_utils import load_stopwords
+        from llm_client import create_response_cache
+        from sentiment import load_lexicon
+        from skill_matcher import load_skill_matcher
+        # Import the pipeline stages now rather than on the first request
+        import analyze, cv_processing, ngram_engine  # noqa: F401
+
+        self.stopwords_file_path = stopwords_file_path
+        self.stopwords = load_stopwords(stopwords_file_path)
+        self.cv_database_path = cv_database_path
+        self.skills_taxonomy_path = skills_taxonomy_path
+        self.skill_cache = DiskCache(os.path.join(OUTPUT_DIR, '.cache', 'skills')) if use_cache else None
+        self.cv_stat = self._cv_database_stat()
+        self.cv_snapshot = load_cv_snapshot(cv_database_path)
+        self.skill_matcher = load_skill_matcher(self.cv_snapshot.data, skills_taxonomy_path, cache=self.skill_cache)
+        self.analysis_cache = DiskCache(os.path.join(OUTPUT_DIR, '.cache', 'analysis')) if use_cache else None
+        self.response_cache = create_response_cache() if use_cache else None
+        load_lexicon()
+        self.load_seconds = time.perf_counter() - start
+
+        self.llm_client = llm_client
+        self.clients = {}
+        self.analyses = OrderedDict()
+        self.lock = threading.Lock()
+        self.cv_lock = threading.Lock()
+        # Held by the stages writing the shared output files (custom CV, detailed report, generated CVs)
+        self.output_lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+
+    def client(self, spec=None):
+        from llm_client import create_client
+        spec = spec or self.llm_client
+        with self.lock:
+            if spec not in self.clients:
+                self.clients[spec] = create_client(spec)
+            return self.clients[spec]
+
+    def _cv_database_stat(self):
+        stat = os.stat(self.cv_database_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def cv(self):
+        """
+        Returns the CV database snapshot and the skill matcher built from it, reloading both when
+        the CV database file was edited since they were loaded.
+        """
+        from cv_snapshot import load_cv_snapshot
+        from skill_matcher import load_skill_matcher
+        with self.cv_lock:
+            cv_stat = self._cv_database_stat()
+            if cv_stat != self.cv_stat:
+                self.cv_snapshot = load_cv_snapshot(self.cv_database_path)
+                self.skill_matcher = load_skill_matcher(self.cv_snapshot.data, self.skills_taxonomy_path, cache=self.skill_cache)
+                self.cv_stat = cv_stat
+            return self.cv_snapshot, self.skill_matcher
+
+    def job_analysis(self, job_file_path, use_cache=True):
+        """
+        Returns the analysis of a job description, from memory, the disk cache or a fresh analysis.
+
+        :param use_cache: Reuse and store the analysis in memory and in the disk cache.
+        """
+        from text_analysis import analysis_cache_key, load_job_analysis
+        if not use_cache:
+            return load_job_analysis(job_file_path, self.stopwords, self.stopwords_file_path, cache=None)
+        key = analysis_cache_key(job_file_path, self.stopwords_file_path)
+        with self.lock:
+            job = self.analyses.get(key)
+            if job is not None:
+                self.analyses.move_to_end(key)
+                return job
+        job = load_job_analysis(job_file_path, self.stopwords, self.stopwords_file_path, cache=self.analysis_cache)
+        with self.lock:
+            self.analyses[key] = job
+            while len(self.analyses) > ANALYSIS_MEMORY_ENTRIES:
+                self.analyses.popitem(last=False)
+        return job
+
+def _job_file_path(body):
+    # Like the CLI, job descriptions are looked up in the data folder
+    if not body.get("job_file"):
+        raise ValueError("Missing 'job_file'.")
+    job_file_path = os.path.join(DATA_DIR, os.path.basename(body["job_file"]))
+    if not os.path.isfile(job_file_path):
+        raise FileNotFoundError(f"Job description '{job_file_path}' not found.")
+    return job_file_path
+
+def _term_weights(server, job, job_file_path, body):
+    if not body.get("tfidf"):
+        return None
+    from tfidf_index import TfidfIndex
+    with server.output_lock:
+        tfidf_index = TfidfIndex()
+        tfidf_index.add_document(job.words, source=os.path.basename(job_file_path))
+        print(f"TF-IDF weights from {len(tfidf_index)} ingested job descriptions.")
+        return tfidf_index.term_weights(job.words)
+
+def handle_analyze(server, body):
+    """
+    Analyzes a job description.
+
+    Body: "job_file", and optionally "top" (n-grams per length, default 10), "context" (look up
+    keywords in context), "context_terms" (default: the top 5 keywords), "context_window" and
+    "plot_dpi" (render the word cloud and n-gram plots to output/plots) and "no_cache" (neither
+    reuse nor store the analysis and plots).
+
+    :return: The job summary (see `text_analysis.summarize_job`), with the "plot" path and whether it was cached.
+    """
+    from text_analysis import summarize_job
+    job_file_path = _job_file_path(body)
+    job = server.job_analysis(job_file_path, use_cache=not body.get("no_cache"))
+
+    context_terms = None
+    if body.get("context") or body.get("context_terms"):
+        context_terms = body.get("context_terms") or [word for word, _ in job.unigrams.most_common(5)]
+    summary = summarize_job(job, top=body.get("top", 10), context_terms=context_terms, context_window=body.get("context_window", 5))
+
+    summary["plot"] = None
+    if body.get("plot_dpi"):
+        from visualization import PLOTS_DIR, create_plot_cache, plot_document_analysis
+        summary["plot"] = plot_document_analysis(
+            job,
+            os.path.join(PLOTS_DIR, f"{os.path.splitext(os.path.basename(job_file_path))[0]}.png"),
+            dpi=body["plot_dpi"],
+            cache=create_plot_cache() if server.analysis_cache is not None and not body.get("no_cache") else None
+        )
+    return summary
+
+def handle_compare(server, body):
+    """
+    Tailors the CV to a job description from the CV database, writes the detailed report and
+    compares the tailored CV with the job description, as the CLI does.
+
+    Body: "job_file", and optionally "output_file" (default: custom_cv.txt in output/), "tfidf"
+    (weight keywords by rarity), "max_chars" (length budget of the custom CV), "cv_file" (a CV
+    in cv/ to compare as well) and "no_cache" (neither reuse nor store the analysis).
+
+    :return: The paths written and the comparison "tables" (see `cv_processing.compare_ngrams`).
+    """
+    from artifact_store import detach
+    from cv_processing import compare_cv_and_job, compare_cv_to_jd, generate_custom_cv, generate_detailed_report
+    from text_analysis import DocumentAnalysis
+    job_file_path = _job_file_path(body)
+    job = server.job_analysis(job_file_path, use_cache=not body.get("no_cache"))
+    term_weights = _term_weights(server, job, job_file_path, body)
+    cv_snapshot, skill_matcher = server.cv()
+    cv_data = cv_snapshot.data
+    keyword_index = cv_snapshot.keyword_index
+
+    output_file_path = os.path.join(OUTPUT_DIR, os.path.basename(body.get("output_file") or "custom_cv.txt"))
+    detailed_report_path = os.path.join(OUTPUT_DIR, 'detailed_report.txt')
+    with server.output_lock:
+        detach(output_file_path)
+        generate_custom_cv(job, cv_data, output_path=output_file_path, keyword_index=keyword_index, term_weights=term_weights, max_chars=body.get("max_chars"))
+        generate_detailed_report(job, cv_data, output_path=detailed_report_path, job_file_name=os.path.basename(job_file_path), keyword_index=keyword_index, term_weights=term_weights, skill_matcher=skill_matcher)
+        tables = compare_cv_to_jd(
+            job_analysis=job,
+            cv_analysis=DocumentAnalysis.from_file(output_file_path, server.stopwords),
+            output_path=detailed_report_path,
+            weights=term_weights
+        )
+
+    if body.get("cv_file"):
+        cv_file_path = os.path.join(CV_DIR, os.path.basename(body["cv_file"]))
+        if not os.path.isfile(cv_file_path):
+            raise FileNotFoundError(f"CV '{cv_file_path}' not found.")
+        compare_cv_and_job(job, DocumentAnalysis.from_file(cv_file_path, server.stopwords), weights=term_weights)
+
+    return {"custom_cv": output_file_path, "detailed_report": detailed_report_path, "tables": tables}
+
+def handle_generate(server, body):
+    """
+    Generates the tailored CV (and cover letter) with a model, archives it, and appends its
+    comparison with the job description to the CV copy in cv/. Run /compare first, so the
+    model sees the detailed report of the same job description.
+
+    Body: "job_file", and optionally "model" (default: gpt-4o-mini), "llm_client" (default: the
+    server's), "refresh", "generate_cover_letter", "prompt_token_budget" (maximum number of
+    prompt tokens), "stream" (write the CV file as it is generated and check it for ATS-friendly
+    formatting as soon as its section is complete) and "no_cache" (neither reuse nor store the
+    analysis and the model response).
+
+    :return: The archived "artifact" entry, the "cv_path" and "markdown_path" of the CV copies and,
+             when streaming, the "ats_issues" of the CV section (None otherwise).
+    """
+    from analyze import run_gpt_model, validate_ats_content
+    from artifact_store import detach
+    from cv_processing import compare_cv_to_jd
+    from text_analysis import DocumentAnalysis
+    job_file_path = _job_file_path(body)
+    use_cache = not body.get("no_cache")
+    job = server.job_analysis(job_file_path, use_cache=use_cache)
+    client = server.client(body.get("llm_client"))
+    ats_issues = []
+
+    job_name = os.path.splitext(os.path.basename(job_file_path))[0]
+    descriptive_copy_path = os.path.join(CV_DIR, f"{job_name.replace('_', ' ').title().replace(' ', '_')}_CV.txt")
+    cover_letters_dir = os.path.join(BASE_DIR, 'cover_letters')
+    os.makedirs(cover_letters_dir, exist_ok=True)
+    with server.output_lock:
+        artifact = run_gpt_model(
+            job_file_path=job_file_path,
+            cv_database_path=server.cv_database_path,
+            detailed_report_path=os.path.join(OUTPUT_DIR, 'detailed_report.txt'),
+            output_path=os.path.join(OUTPUT_DIR, 'custom_cv.txt'),
+            descriptive_copy_path=descriptive_copy_path,
+            cover_letter_output_path=os.path.join(OUTPUT_DIR, f"Cover_Letter_{job_name}.txt"),
+            reference_folder=cover_letters_dir if body.get("generate_cover_letter") else None,
+            model=body.get("model") or "gpt-4o-mini",
+            client=client,
+            cache=server.response_cache if use_cache else None,
+            refresh=body.get("refresh", False),
+            stream=body.get("stream", False),
+            on_cv_complete=lambda cv_text: ats_issues.append(validate_ats_content(cv_text)),
+            prompt_token_budget=body.get("prompt_token_budget")
+        )
+        detach(descriptive_copy_path)
+        compare_cv_to_jd(
+            job_analysis=job,
+            cv_analysis=DocumentAnalysis.from_file(descriptive_copy_path, server.stopwords),
+            output_path=descriptive_copy_path,
+        )
+    return {
+        "artifact": artifact,
+        "cv_path": descriptive_copy_path,
+        "markdown_path": descriptive_copy_path.replace('.txt', '.md'),
+        "ats_issues": ats_issues[0] if ats_issues else None,
+    }
+
+def handle_ats(server, body):
+    """
+    Checks a CV for ATS-friendly formatting.
+
+    Body: the CV "text", or the path of a "file" to check, which must be in output/ or cv/.
+
+    :return: The list of "issues" found (empty if the CV is ATS-friendly).
+    """
+    from analyze import validate_ats_content
+    if "text" in body:
+        content = body["text"]
+    elif body.get("file"):
+        file_path = os.path.realpath(body["file"])
+        if not any(os.path.commonpath([file_path, folder]) == folder for folder in (os.path.realpath(OUTPUT_DIR), os.path.realpath(CV_DIR))):
+            raise ValueError(f"'{body['file']}' is not in the output or cv folder.")
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"'{body['file']}' not found.")
+        with open(file_path, 'r') as f:
+            content = f.read()
+    else:
+        raise ValueError("Missing 'text' or 'file'.")
+    return {"issues": validate_ats_content(content)}
+
+ENDPOINTS = {
+    "/analyze": handle_analyze,
+    "/compare": handle_compare,
+    "/generate": handle_generate,
+    "/ats": handle_ats,
+}
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY every keep-alive response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": f"Unknown endpoint '{self.path}'"})
+            return
+        server = self.server
+        self._send_json(200, {
+            "status": "ok",
+            "uptime_seconds": time.time() - server.started,
+            "load_seconds": server.load_seconds,
+            "requests": server.requests,
+            "cached_analyses": len(server.analyses),
+            "stopwords": server.stopwords_file_path,
+            "cv_database": server.cv_database_path,
+            "skills_taxonomy": server.skills_taxonomy_path,
+        })
+
+    def do_POST(self):
+        handler = ENDPOINTS.get(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        raw_body = self.rfile.read(length) if length else b""
+        if handler is None:
+            self._send_json(404, {"error": f"Unknown endpoint '{self.path}'"})
+            return
+        with self.server.lock:
+            self.server.requests += 1
+
+        start = time.perf_counter()
+        with sys.stdout.capture() as output:
+            try:
+                result = handler(self.server, json.loads(raw_body or b"{}"))
+                status, payload = 200, {"result": result}
+            except (ValueError, KeyError, TypeError) as e:
+                status, payload = 400, {"error": str(e)}
+            except FileNotFoundError as e:
+                status, payload = 404, {"error": str(e)}
+            except SystemExit:
+                # The file helpers exit on unreadable inputs; only the request fails
+                status, payload = 500, {"error": "The pipeline stopped (see output)."}
+            except Exception as e:
+                status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        payload["output"] = output.getvalue()
+        payload["seconds"] = time.perf_counter() - start
+        self._send_json(status, payload)
+
+    def log_message(self, format, *args):
+        # One line per request on stderr, not captured with the request's output
+        sys.__stderr__.write(f"{self.address_string()} {format % args}\n")
+
+class AnalysisClient:
+    """
+    Thin client of a running analysis server, keeping one HTTP connection open across requests.
+    Each call returns the response's "result", "output" (what the server printed while handling
+    it) and "seconds" (server-side handling time). Not thread-safe: use one client per thread.
+
+    :param url: Base URL of the server (default: http://127.0.0.1:8766).
+    :param timeout: Seconds to wait for a response (model generation can take a while).
+    """
+
+    def __init__(self, url=DEFAULT_URL, timeout=600):
+        parts = urlsplit(url)
+        self.host = parts.hostname or DEFAULT_HOST
+        self.port = parts.port or DEFAULT_PORT
+        self.timeout = timeout
+        self._connection = None
+
+    def request(self, endpoint, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        # With --profile, the client's trace shows each request's round trip (the stages run on the server)
+        with span("server_request", endpoint=endpoint):
+            for attempt in range(2):
+                if self._connection is None:
+                    self._connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                try:
+                    self._connection.request("GET" if body is None else "POST", endpoint, body=body, headers={"Content-Type": "application/json"})
+                    response = self._connection.getresponse()
+                    data = json.loads(response.read() or b"{}")
+                    break
+                except (ConnectionError, http.client.HTTPException):
+                    # The server closes idle keep-alive connections; reconnect once
+                    self.close()
+                    if attempt:
+                        raise
+        if response.status != 200:
+            raise ServerError(response.status, data.get("error", response.reason))
+        return data
+
+    def health(self):
+        return self.request("/health")
+
+    def analyze(self, job_file, **options):
+        return self.request("/analyze", {"job_file": job_file, **options})
+
+    def compare(self, job_file, **options):
+        return self.request("/compare", {"job_file": job_file, **options})
+
+    def generate(self, job_file, **options):
+        return self.request("/generate", {"job_file": job_file, **options})
+
+    def ats(self, text=None, file=None):
+        return self.request("/ats", {"text": text} if text is not None else {"file": file})
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+def run_via_server(args, url):
+    """
+    Runs the CLI pipeline for parsed `main.py` arguments on a running analysis server, printing
+    what the server printed. PDF conversion runs locally. The server keeps the stopwords, CV
+    database and skills taxonomy it was started with, so the run stops if the arguments name others.
+    """
+    client = AnalysisClient(url)
+    job_file = os.path.basename(args.job_file)
+    inputs = {
+        "stopwords": os.path.join(DATA_DIR, os.path.basename(args.stopwords)),
+        "cv_database": os.path.join(CONFIG_DIR, os.path.basename(args.cv_database)),
+        "skills_taxonomy": os.path.join(CONFIG_DIR, os.path.basename(args.skills_taxonomy)) if args.skills_taxonomy else None,
+    }
+    try:
+        health = client.health()
+        for name, path in inputs.items():
+            if health.get(name) != path:
+                print(f"Error: The analysis server at {url} was started with --{name} {health.get(name) or '(none)'}, not {path or '(none)'}. Restart it with the same --{name} or run without --server.")
+                exit(1)
+
+        response = client.compare(job_file, output_file=args.output_file, tfidf=args.tfidf, max_chars=args.max_chars, cv_file=args.cv_file, no_cache=args.no_cache)
+        sys.stdout.write(response["output"])
+
+        from visualization import FULL_DPI, PREVIEW_DPI
+        from text_analysis import print_job_summary
+        response = client.analyze(
+            job_file,
+            context=not args.fast,
+            context_terms=args.context_terms,
+            context_window=args.context_window,
+            plot_dpi=None if args.fast else (PREVIEW_DPI if args.preview else FULL_DPI),
+            no_cache=args.no_cache
+        )
+        summary = response["result"]
+        print_job_summary(summary)
+
+        if args.use_model:
+            response = client.generate(
+                job_file,
+                model=args.use_model,
+                llm_client=args.llm_client,
+                refresh=args.refresh,
+                generate_cover_letter=args.generate_cover_letter,
+                prompt_token_budget=args.prompt_token_budget,
+                stream=args.stream,
+                no_cache=args.no_cache
+            )
+            sys.stdout.write(response["output"])
+            markdown_path = response["result"]["markdown_path"]
+            # When streaming, the server already checked the CV section while the cover letter was generating
+            if response["result"]["ats_issues"] is None:
+                sys.stdout.write(client.ats(file=markdown_path)["output"])
+
+            from pdf_queue import PdfQueue, print_conversion_summary
+            pdf_queue = PdfQueue(workers=1)
+            pdf_queue.submit(markdown_path)
+            print_conversion_summary(pdf_queue.wait())
+    except ServerError as e:
+        print(f"Error: {e}")
+        exit(1)
+    except ConnectionError as e:
+        print(f"Error: Could not reach the analysis server at {url} ({e}). Start it with: python main.py serve")
+        exit(1)
+    finally:
+        client.close()
+
+    if summary["plot"] is not None:
+        plot_path, reused = summary["plot"]
+        print(f"\nPlots saved to {plot_path}{' (cached)' if reused else ''}")
+
+def serve_main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Run a local analysis server that keeps the CV database, stopwords and models loaded between requests.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--stopwords", default=os.path.join(DATA_DIR, 'stopwords.txt'), help="Path to the stopwords file (default: stopwords.txt)")
+    parser.add_argument("--cv_database", default=os.path.join(CONFIG_DIR, 'cv_database.yaml'), help="Path to the CV database file (default: config/cv_database.yaml)")
+    parser.add_argument("--llm_client", default="openai", help="Default model client: 'openai' (default) or 'stub:<path>' to answer offline with the content of <path>")
+    parser.add_argument("--skills_taxonomy", default=None, help="Skills taxonomy file in config/ (one skill per line) to report the skills a job description asks for that the CV lacks")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", help="Do not reuse or store job description analyses and model responses in output/.cache")
+    args = parser.parse_args(argv)
+
+    from file_utils import ensure_cv_database_exists
+    ensure_cv_database_exists(
+        os.path.join(CONFIG_DIR, 'cv_database_template.yaml'),
+        os.path.join(CONFIG_DIR, 'cv_database.yaml')
+    )
+
+    server = AnalysisServer(
+        (args.host, args.port),
+        os.path.join(DATA_DIR, os.path.basename(args.stopwords)),
+        os.path.join(CONFIG_DIR, os.path.basename(args.cv_database)),
+        use_cache=not args.no_cache,
+        llm_client=args.llm_client,
+        skills_taxonomy_path=os.path.join(CONFIG_DIR, os.path.basename(args.skills_taxonomy)) if args.skills_taxonomy else None
+    )
+    print(f"Loaded the CV database, stopwords and models in {server.load_seconds:.2f}s")
+    print(f"Analysis server listening on http://{args.host}:{server.server_address[1]} (Ctrl+C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,229 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from ngram_engine import NgramCounts, Vocabulary
+
+# Everything a worker needs to attach to a corpus; small enough to send with every task
+CorpusHandle = namedtuple("CorpusHandle", ["name", "vocabulary_size", "vocabulary_bytes", "documents", "tokens"])
+
+# Segments attached by this process, by shared memory name
+_attached = {}
+
+def _layout(handle):
+    """
+    Returns (offset, dtype, length) of each array in the shared memory block: vocabulary offsets,
+    document offsets, token ids, then the UTF-8 vocabulary bytes.
+    """
+    sections = [
+        ("vocabulary_offsets", np.int64, handle.vocabulary_size + 1),
+        ("document_offsets", np.int64, handle.documents + 1),
+        ("token_ids", np.int32, handle.tokens),
+        ("vocabulary_bytes", np.uint8, handle.vocabulary_bytes),
+    ]
+    layout, offset = {}, 0
+    for name, dtype, length in sections:
+        # Keep every array 8-byte aligned
+        offset = (offset + 7) & ~7
+        layout[name] = (offset, dtype, length)
+        offset += np.dtype(dtype).itemsize * length
+    return layout, max(offset, 1)
+
+class SharedVocabulary:
+    """
+    Read-only vocabulary decoded on demand from the shared UTF-8 bytes.
+
+    It offers the `tokens`, `ids` and `lookup` parts of `Vocabulary` that NgramCounts uses,
+    without building a Python string per token unless it is looked up.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+        self._ids = None
+        self.tokens = _SharedTokens(self)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def token(self, token_id):
+        return bytes(self.data[self.offsets[token_id]:self.offsets[token_id + 1]]).decode("utf-8")
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = {token: token_id for token_id, token in enumerate(self.tokens)}
+        return self._ids
+
+    def lookup(self, tokens):
+        try:
+            return [self.ids[token] for token in tokens]
+        except KeyError:
+            return None
+
+class _SharedTokens:
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def __getitem__(self, token_id):
+        return self.vocabulary.token(token_id)
+
+    def __iter__(self):
+        return (self.vocabulary.token(token_id) for token_id in range(len(self.vocabulary)))
+
+class SharedCorpus:
+    """
+    Tokenized documents stored in one `multiprocessing.shared_memory` block.
+
+    The block holds the corpus vocabulary, the token ids of every document back to back, and
+    the offset of each document. Pool workers attach to it by name from a small CorpusHandle,
+    so no token lists or Counters are pickled between processes.
+
+    Use `SharedCorpus.create` in the owning process (which unlinks the block on `close`) and
+    `SharedCorpus.attach` in workers.
+    """
+
+    def __init__(self, handle, segment, owner=False):
+        self.handle = handle
+        self.segment = segment
+        self.owner = owner
+        layout, _ = _layout(handle)
+        arrays = {
+            name: np.ndarray((length,), dtype=dtype, buffer=segment.buf, offset=offset)
+            for name, (offset, dtype, length) in layout.items()
+        }
+        self.document_offsets = arrays["document_offsets"]
+        self.token_ids = arrays["token_ids"]
+        self.vocabulary = SharedVocabulary(arrays["vocabulary_offsets"], arrays["vocabulary_bytes"])
+
+    @classmethod
+    def create(cls, documents):
+        """
+        Copies tokenized documents into a new shared memory block.
+
+        :param documents: List of token lists (e.g. `DocumentAnalysis.words`).
+        :return: The owning SharedCorpus.
+        """
+        vocabulary = Vocabulary()
+        encoded = [vocabulary.encode(tokens) for tokens in documents]
+        token_bytes = [token.encode("utf-8") for token in vocabulary.tokens]
+        vocabulary_offsets = np.zeros(len(token_bytes) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in token_bytes], out=vocabulary_offsets[1:])
+        document_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in encoded], out=document_offsets[1:])
+
+        handle = CorpusHandle(
+            name=None,
+            vocabulary_size=len(vocabulary),
+            vocabulary_bytes=int(vocabulary_offsets[-1]),
+            documents=len(encoded),
+            tokens=int(document_offsets[-1])
+        )
+        _, size = _layout(handle)
+        segment = shared_memory.SharedMemory(create=True, size=size)
+        corpus = cls(handle._replace(name=segment.name), segment, owner=True)
+
+        corpus.vocabulary.offsets[:] = vocabulary_offsets
+        corpus.vocabulary.data[:] = np.frombuffer(b"".join(token_bytes), dtype=np.uint8)
+        corpus.document_offsets[:] = document_offsets
+        if encoded:
+            np.concatenate(encoded, out=corpus.token_ids, casting="unsafe")
+        return corpus
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Attaches to the block described by `handle`, once per process.
+        """
+        corpus = _attached.get(handle.name)
+        if corpus is None:
+            segment = shared_memory.SharedMemory(name=handle.name)
+            corpus = _attached[handle.name] = cls(handle, segment)
+        return corpus
+
+    def __len__(self):
+        return self.handle.documents
+
+    def document(self, index):
+        """
+        Returns the token ids of one document as a zero-copy view.
+        """
+        return self.token_ids[self.document_offsets[index]:self.document_offsets[index + 1]]
+
+    def tokens(self, index):
+        return [self.vocabulary.tokens[token_id] for token_id in self.document(index).tolist()]
+
+    def ngrams(self, index, n, scalar_keys=False):
+        return NgramCounts.from_ids(self.vocabulary, self.document(index).astype(np.int64), n, scalar_keys=scalar_keys)
+
+    def close(self):
+        # Drop the array views first; the buffer cannot be released while they exist
+        self.document_offsets = self.token_ids = self.vocabulary = None
+        self.segment.close()
+        if self.owner:
+            self.segment.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def top_ngrams_task(handle, indices, n, k):
+    """
+    Pool task: attaches to the corpus and returns (index, `most_common(k)` n-grams) of the documents at `indices`.
+    """
+    corpus = SharedCorpus.attach(handle)
+    return [(index, corpus.ngrams(index, n, scalar_keys=True).most_common(k)) for index in indices]
+
+def context_task(handle, indices, word, window):
+    """
+    Pool task: attaches to the corpus and returns (index, contexts of `word`) of the documents at `indices`.
+    """
+    corpus = SharedCorpus.attach(handle)
+    word_id = corpus.vocabulary.lookup([word])
+    results = []
+    for index in indices:
+        contexts = []
+        if word_id is not None:
+            ids = corpus.document(index)
+            for position in np.flatnonzero(ids == word_id[0]).tolist():
+                window_ids = ids[max(position - window, 0):position + window + 1].tolist()
+                contexts.append(" ".join(corpus.vocabulary.tokens[token_id] for token_id in window_ids))
+        results.append((index, contexts))
+    return results
+
+def document_chunks(count, workers):
+    """
+    Splits document indices into about four ranges per worker, so uneven documents balance out across the pool.
+    """
+    size = max(1, -(-count // (workers * 4)))
+    return [range(start, min(start + size, count)) for start in range(0, count, size)]
+
+def _map_documents(corpus, task, args, workers):
+    results = [None] * len(corpus)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(task, corpus.handle, list(indices), *args) for indices in document_chunks(len(corpus), workers or 1)]
+        for future in futures:
+            for index, result in future.result():
+                results[index] = result
+    return results
+
+def parallel_top_ngrams(corpus, n=1, k=10, workers=None):
+    """
+    Returns the k most common n-grams of every document, computed by pool workers attached to the corpus.
+
+    :return: One `most_common(k)` list per document, in document order.
+    """
+    return _map_documents(corpus, top_ngrams_task, (n, k), workers)
+
+def parallel_find_context(corpus, word, window=5, workers=None):
+    """
+    Returns the contexts of `word` in every document (see `text_analysis.find_context`).
+
+    :return: One list of context strings per document, in document order.
+    """
+    return _map_documents(corpus, context_task, (word, window), workers)
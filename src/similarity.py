@@ -0,0 +1,177 @@
+import argparse
+import glob
+import heapq
+import math
+import os
+import time
+from collections import Counter
+import numpy as np
+from cache import DiskCache, content_hash, file_hash
+from file_utils import load_stopwords
+from text_analysis import ANALYZER_VERSION, DocumentAnalysis
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+
+def ngram_features(analysis):
+    """
+    Returns the unigram, bigram and trigram counts of a DocumentAnalysis as one Counter keyed by
+    space-joined n-gram, the feature space of the similarity vectors.
+    """
+    features = Counter(dict(analysis.unigrams.items()))
+    for counts in (analysis.bigrams, analysis.trigrams):
+        features.update({" ".join(ngram): count for ngram, count in counts.items()})
+    return features
+
+def features_cache_key(file_path, stopwords_file_path):
+    return content_hash("similarity", file_hash(file_path), file_hash(stopwords_file_path), ANALYZER_VERSION)
+
+def load_features(file_path, stopwords, stopwords_file_path, cache=None):
+    """
+    Returns the n-gram features of a text file, reusing cached features when neither the file,
+    the stopwords nor the analyzer changed.
+    """
+    key = features_cache_key(file_path, stopwords_file_path) if cache is not None else None
+    if key is not None:
+        features = cache.get(key)
+        if features is not None:
+            return features
+    features = ngram_features(DocumentAnalysis.from_file(file_path, stopwords))
+    if key is not None:
+        cache.set(key, features)
+    return features
+
+class SimilarityIndex:
+    """
+    TF-IDF vectors of a set of documents over their unigrams, bigrams and trigrams, for cosine
+    similarity search.
+
+    The vectors are L2-normalized and stored as a sparse matrix in both row (CSR) and column
+    (CSC) form. A query is a sparse matrix-vector product over the columns of its features only,
+    so its cost depends on the postings of the query's n-grams rather than on the corpus size.
+
+    :param names: Name of each document (e.g. its file path).
+    :param features: N-gram Counter of each document (see `ngram_features`).
+    """
+
+    def __init__(self, names, features):
+        self.names = list(names)
+        self.feature_ids = {}
+        rows, columns, counts = [], [], []
+        for row, document in enumerate(features):
+            for feature, count in document.items():
+                columns.append(self.feature_ids.setdefault(feature, len(self.feature_ids)))
+                counts.append(count)
+            rows.append(len(document))
+
+        self.indptr = np.zeros(len(self.names) + 1, dtype=np.int64)
+        np.cumsum(rows, out=self.indptr[1:])
+        self.indices = np.array(columns, dtype=np.int64)
+        row_of = np.repeat(np.arange(len(self.names)), rows)
+
+        document_frequency = np.bincount(self.indices, minlength=len(self.feature_ids))
+        self.idf = np.log((1 + len(self.names)) / (1 + document_frequency)) + 1
+        self.data = np.array(counts, dtype=np.float64) * self.idf[self.indices]
+        norms = np.sqrt(np.bincount(row_of, weights=self.data ** 2, minlength=len(self.names)))
+        self.data /= np.where(norms > 0, norms, 1)[row_of]
+
+        # Column form: the documents containing each feature and their weights
+        order = np.argsort(self.indices, kind="stable")
+        self.column_rows = row_of[order]
+        self.column_data = self.data[order]
+        self.column_indptr = np.zeros(len(self.feature_ids) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=self.column_indptr[1:])
+
+    def __len__(self):
+        return len(self.names)
+
+    def query_vector(self, features):
+        """
+        Returns the (feature ids, weights) of a query's normalized TF-IDF vector, restricted to
+        the features the index knows. Unknown features still count in the norm.
+        """
+        unseen_idf = math.log(1 + len(self.names)) + 1
+        ids, weights, norm = [], [], 0.0
+        for feature, count in features.items():
+            feature_id = self.feature_ids.get(feature)
+            weight = count * (self.idf[feature_id] if feature_id is not None else unseen_idf)
+            norm += weight * weight
+            if feature_id is not None:
+                ids.append(feature_id)
+                weights.append(weight)
+        norm = math.sqrt(norm) or 1.0
+        return np.array(ids, dtype=np.int64), np.array(weights, dtype=np.float64) / norm
+
+    def scores(self, features):
+        """
+        Returns the cosine similarity of a query with every indexed document.
+        """
+        ids, weights = self.query_vector(features)
+        starts, ends = self.column_indptr[ids], self.column_indptr[ids + 1]
+        lengths = ends - starts
+        # Gather the postings of every query feature and accumulate them per document in one bincount
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        contributions = self.column_data[positions] * np.repeat(weights, lengths)
+        return np.bincount(self.column_rows[positions], weights=contributions, minlength=len(self.names))
+
+    def top_k(self, features, k=10):
+        """
+        Returns the k most similar documents as (name, cosine score) pairs, best first.
+        """
+        scores = self.scores(features)
+        candidates = np.flatnonzero(scores)
+        best = heapq.nlargest(k, zip(scores[candidates].tolist(), (-candidates).tolist()))
+        return [(self.names[-negative_row], score) for score, negative_row in best]
+
+def similar_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py similar",
+        description="Rank a folder of documents by cosine similarity to one document (e.g., the postings that best match a CV, or the archived CV that best fits a job description)."
+    )
+    parser.add_argument("query", help="Path to the CV or job description to match")
+    parser.add_argument("corpus_dir", help="Folder of documents to rank (e.g., a folder of postings, or the archive/ artifact store)")
+    parser.add_argument("--pattern", default="*.txt", help="Glob pattern selecting documents in corpus_dir (default: *.txt)")
+    parser.add_argument("--top", type=int, default=10, help="Number of matches to show (default: 10)")
+    parser.add_argument("--stopwords", default=os.path.join(DATA_DIR, 'stopwords.txt'), help="Path to the stopwords file (default: stopwords.txt)")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", help="Do not reuse or store document features in output/.cache")
+    args = parser.parse_args(argv)
+
+    stopwords_file_path = os.path.join(DATA_DIR, os.path.basename(args.stopwords))
+    stopwords = load_stopwords(stopwords_file_path)
+    cache = None if args.no_cache else DiskCache(os.path.join(OUTPUT_DIR, '.cache', 'analysis'))
+
+    stopwords_name = os.path.basename(stopwords_file_path)
+    if os.path.isfile(os.path.join(args.corpus_dir, 'index.jsonl')):
+        # An artifact store (e.g. archive/): rank each distinct archived CV once
+        from artifact_store import ArtifactStore
+        store = ArtifactStore(args.corpus_dir)
+        jobs = {}
+        for entry in store.history():
+            jobs.setdefault(entry["sha256"], os.path.basename(entry.get("job", "")))
+        paths = [store.materialize(digest) for digest in jobs]
+        labels = {store.checkout_path(digest): f"{digest[:12]}  {job}" for digest, job in jobs.items()}
+    else:
+        labels = {}
+        paths = sorted(
+            path for path in glob.glob(os.path.join(args.corpus_dir, args.pattern))
+            if os.path.isfile(path) and os.path.basename(path) != stopwords_name
+        )
+    if not paths:
+        print(f"Error: No documents matching '{args.pattern}' found in '{args.corpus_dir}'.")
+        exit(1)
+
+    start = time.perf_counter()
+    index = SimilarityIndex(paths, (load_features(path, stopwords, stopwords_file_path, cache) for path in paths))
+    build_seconds = time.perf_counter() - start
+
+    query = load_features(args.query, stopwords, stopwords_file_path, cache)
+    start = time.perf_counter()
+    matches = index.top_k(query, args.top)
+    query_seconds = time.perf_counter() - start
+
+    print(f"\nTop {len(matches)} of {len(index)} documents most similar to '{args.query}':\n")
+    for rank, (path, score) in enumerate(matches, start=1):
+        print(f"{rank:>3}. {score:.4f}  {labels.get(path) or os.path.relpath(path, args.corpus_dir)}")
+    print(f"\nIndexed {len(index)} documents ({len(index.feature_ids)} n-grams) in {build_seconds * 1000:.1f} ms")
+    print(f"Query latency: {query_seconds * 1000:.2f} ms")
@@ -0,0 +1,173 @@
+from collections import Counter, namedtuple, deque
+from cache import content_hash, file_hash
+from file_utils import normalize_text
+
+# Bump whenever phrase normalization or the automaton layout changes, so cached matchers are rebuilt
+SKILL_MATCHER_VERSION = "1"
+
+SkillComparison = namedtuple("SkillComparison", ["matched", "missing", "extra"])
+
+def phrase_tokens(phrase):
+    """
+    Returns the tokens of a skill phrase, normalized like job description text (see `normalize_text`),
+    e.g. "CI/CD Pipelines" -> ("cicd", "pipelines").
+    """
+    return tuple(normalize_text(str(phrase)).split())
+
+def cv_skills(cv_data):
+    """
+    Returns the skills listed in a CV database, from its skills categories and every entry's skills, in database order.
+    """
+    skills = []
+    for category_skills in (cv_data.get("skills") or {}).values():
+        skills.extend(category_skills or [])
+    projects = cv_data.get("projects") or {}
+    for item in (cv_data.get("experience") or []) + (projects.get("work") or []) + (projects.get("personal") or []):
+        skills.extend(item.get("skills") or [])
+    return [str(skill) for skill in skills]
+
+def load_taxonomy(file_path):
+    """
+    Loads a skills taxonomy: one skill phrase per line, blank lines and lines starting with # ignored.
+    """
+    try:
+        with open(file_path, 'r') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    except FileNotFoundError:
+        print(f"Error: Skills taxonomy '{file_path}' not found.")
+        exit(1)
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over the tokens of skill phrases, finding every occurrence of every
+    phrase (multi-word ones included, overlapping ones too) in one pass over a token sequence.
+
+    Phrases are matched on whole normalized tokens, so "java" does not match "javascript" and
+    "machine learning" only matches the two words in sequence. Phrases that normalize to the same
+    tokens share one entry, named after the first of them.
+
+    :param cv_phrases: Skills listed in the CV (see `cv_skills`).
+    :param taxonomy_phrases: Other known skills the job description may ask for (optional).
+    """
+
+    def __init__(self, cv_phrases, taxonomy_phrases=()):
+        self.names = []          # Display name of every distinct phrase
+        self.in_cv = []          # Whether each phrase is listed in the CV
+        self._goto = [{}]        # node -> {token: child node}
+        self._fail = [0]         # node -> node of its longest proper suffix in the trie
+        self._output = [-1]      # node -> phrase ending at it, or -1
+        self._next_output = [0]  # node -> nearest node on its fail chain with an output (0 if none)
+
+        phrase_ids = {}
+        for phrase, in_cv in [(phrase, True) for phrase in cv_phrases] + [(phrase, False) for phrase in taxonomy_phrases]:
+            tokens = phrase_tokens(phrase)
+            if not tokens:
+                continue
+            if tokens in phrase_ids:
+                self.in_cv[phrase_ids[tokens]] = self.in_cv[phrase_ids[tokens]] or in_cv
+                continue
+            phrase_ids[tokens] = len(self.names)
+            self.names.append(str(phrase).strip())
+            self.in_cv.append(in_cv)
+            self._insert(tokens, phrase_ids[tokens])
+        self._link()
+
+    @classmethod
+    def from_cv_data(cls, cv_data, taxonomy_path=None):
+        return cls(cv_skills(cv_data), load_taxonomy(taxonomy_path) if taxonomy_path else ())
+
+    def __len__(self):
+        return len(self.names)
+
+    def _insert(self, tokens, phrase_id):
+        node = 0
+        for token in tokens:
+            child = self._goto[node].get(token)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][token] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(-1)
+                self._next_output.append(0)
+            node = child
+        self._output[node] = phrase_id
+
+    def _link(self):
+        # Breadth-first, so every node's fail target is linked before the node itself
+        goto, fail, output, next_output = self._goto, self._fail, self._output, self._next_output
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in goto[node].items():
+                state = fail[node]
+                while state and token not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(token, 0)
+                fail[child] = target
+                next_output[child] = target if output[target] >= 0 else next_output[target]
+                queue.append(child)
+
+    def find(self, tokens):
+        """
+        Yields (end position, phrase id) for every occurrence of every phrase in `tokens`.
+        """
+        goto, fail, output, next_output = self._goto, self._fail, self._output, self._next_output
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            node = state if output[state] >= 0 else next_output[state]
+            while node:
+                yield position, output[node]
+                node = next_output[node]
+
+    def count(self, tokens):
+        """
+        Returns a Counter of the occurrences of each phrase in `tokens`, keyed by phrase name.
+        """
+        counts = Counter(phrase_id for _, phrase_id in self.find(tokens))
+        return Counter({self.names[phrase_id]: count for phrase_id, count in counts.items()})
+
+    def compare(self, tokens):
+        """
+        Compares the CV's skills with the skills a job description mentions.
+
+        :param tokens: The job description's tokens (e.g. `DocumentAnalysis.tokens`).
+        :return: A SkillComparison of "matched" CV skills and "missing" taxonomy skills as
+                 (skill, occurrences) pairs sorted by descending occurrences, and the "extra" CV
+                 skills the job description does not mention, in database order.
+        """
+        counts = Counter(phrase_id for _, phrase_id in self.find(tokens))
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return SkillComparison(
+            matched=[(self.names[phrase_id], count) for phrase_id, count in ranked if self.in_cv[phrase_id]],
+            missing=[(self.names[phrase_id], count) for phrase_id, count in ranked if not self.in_cv[phrase_id]],
+            extra=[name for phrase_id, name in enumerate(self.names) if self.in_cv[phrase_id] and phrase_id not in counts],
+        )
+
+def load_skill_matcher(cv_data, taxonomy_path=None, cache=None):
+    """
+    Compiles the skill matcher of a CV database and an optional taxonomy file, reusing a compiled
+    matcher from the cache when neither the CV's skills nor the taxonomy changed.
+
+    :param cv_data: The parsed CV database.
+    :param taxonomy_path: Path to a skills taxonomy file (optional, see `load_taxonomy`).
+    :param cache: DiskCache of compiled matchers (optional). Only matchers with a taxonomy are
+                  cached: the CV's skills alone compile in well under a millisecond.
+    :return: A SkillMatcher.
+    """
+    if taxonomy_path is None:
+        return SkillMatcher(cv_skills(cv_data))
+
+    key = None
+    if cache is not None:
+        key = content_hash("skills", SKILL_MATCHER_VERSION, file_hash(taxonomy_path), *cv_skills(cv_data))
+        matcher = cache.get(key)
+        if matcher is not None:
+            return matcher
+    matcher = SkillMatcher.from_cv_data(cv_data, taxonomy_path)
+    if key is not None:
+        cache.set(key, matcher)
+    return matcher
@@ -1,18 +1,228 @@
-from collections import Counter
-from nltk import ngrams
-from textblob import TextBlob
+import os
+from collections import namedtuple
+from dataclasses import dataclass
+from functools import cached_property
+from file_utils import load_text, load_raw_text, normalize_text
+from cache import content_hash, file_hash
+from profiling import span
+
+# Bump whenever tokenization, stopword filtering, n-gram counting or sentiment scoring changes,
+# so that cached analyses from older versions are not reused
+ANALYZER_VERSION = "3"
+
+Sentiment = namedtuple("Sentiment", ["polarity", "subjectivity"])
 
 def analyze_sentiment(text):
+    # TextBlob loads NLTK and its lexicon, so only pay for it when sentiment is actually computed
+    from textblob import TextBlob
     blob = TextBlob(text)
     return blob.sentiment
 
 def generate_ngrams(words, n):
-    return Counter(ngrams(words, n))
-
-def find_context(word, text, window=5):
-    words = text.split()
-    indices = [i for i, w in enumerate(words) if w == word]
-    for i in indices:
-        start = max(i - window, 0)
-        end = min(i + window + 1, len(words))
-        print(f"Context for '{word}':", ' '.join(words[start:end]))
\ No newline at end of file
+    # Same n-gram tuples and counts as Counter(nltk.ngrams(words, n)), counted on packed integer keys
+    from ngram_engine import NgramCounts
+    return NgramCounts.from_tokens(words, n)
+
+def _phrase_words(term):
+    # Lookup terms are normalized like the text they are matched against
+    return normalize_text(term).split()
+
+class PositionalIndex:
+    """
+    Maps every token of a document to the positions it occurs at, built once so that
+    keyword-in-context lookups for any number of terms skip rescanning the tokens.
+
+    :param tokens: The document's tokens (e.g. `DocumentAnalysis.tokens`).
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.positions = {}
+        for position, token in enumerate(tokens):
+            self.positions.setdefault(token, []).append(position)
+
+    def find(self, term):
+        """
+        Returns the start positions of a term, which may be a multi-word phrase (e.g. "machine learning").
+        """
+        words = _phrase_words(term)
+        if not words:
+            return []
+        # Walk the rarest word's positions and check the rest of the phrase around each one
+        offset, rarest = min(enumerate(words), key=lambda pair: len(self.positions.get(pair[1], ())))
+        tokens = self.tokens
+        starts = []
+        for position in self.positions.get(rarest, ()):
+            start = position - offset
+            if start >= 0 and tokens[start:start + len(words)] == words:
+                starts.append(start)
+        return starts
+
+    def contexts(self, terms, window=5):
+        """
+        Returns the keyword-in-context snippets of several terms or phrases.
+
+        :param terms: Terms or phrases to look up.
+        :param window: Number of tokens shown on each side of a match.
+        :return: A dictionary mapping each term to its snippets, in document order.
+        """
+        results = {}
+        for term in terms:
+            length = len(_phrase_words(term))
+            results[term] = [
+                ' '.join(self.tokens[max(start - window, 0):start + length + window])
+                for start in self.find(term)
+            ]
+        return results
+
+def find_context(word, text, window=5, index=None):
+    """
+    Prints every occurrence of a word or phrase with `window` tokens of context on each side.
+
+    :param word: Term or phrase to look up.
+    :param text: The raw text or its already split tokens (ignored when `index` is given).
+    :param index: PositionalIndex of the text, to reuse across lookups (optional).
+    """
+    if index is None:
+        index = PositionalIndex(text.split() if isinstance(text, str) else text)
+    for context in index.contexts([word], window)[word]:
+        print(f"Context for '{word}':", context)
+
+@dataclass
+class DocumentAnalysis:
+    """
+    Tokens and n-gram counts of one document (job description or CV), built once and
+    passed to every pipeline stage so that none of them re-reads or re-tokenizes the input.
+
+    :param text: Lowercased text with punctuation removed (see `normalize_text`).
+    :param tokens: All tokens of the normalized text.
+    :param words: Tokens with stopwords filtered out.
+    :param unigrams: NgramCounts of the filtered words, keyed by word.
+    :param bigrams: NgramCounts of the filtered word bigrams, keyed by tuple.
+    :param trigrams: NgramCounts of the filtered word trigrams, keyed by tuple.
+    :param source: Path of the file the document was loaded from (optional).
+    :param sentiment: Sentiment of the document, once computed (optional).
+    :param sentence_sentiments: SentenceSentiment of every sentence of the raw document, once computed (optional).
+    """
+    text: str
+    tokens: list
+    words: list
+    unigrams: object
+    bigrams: object
+    trigrams: object
+    source: str = None
+    sentiment: Sentiment = None
+    sentence_sentiments: list = None
+
+    @classmethod
+    def from_text(cls, text, stopwords, source=None):
+        from ngram_engine import NgramCounts, Vocabulary
+        tokens = text.split()
+        words = [word for word in tokens if word not in stopwords]
+
+        # Encode the words once; all three n-gram counts share the vocabulary and id array
+        vocabulary = Vocabulary()
+        ids = vocabulary.encode(words)
+        return cls(
+            text=text,
+            tokens=tokens,
+            words=words,
+            unigrams=NgramCounts.from_ids(vocabulary, ids, 1, scalar_keys=True),
+            bigrams=NgramCounts.from_ids(vocabulary, ids, 2),
+            trigrams=NgramCounts.from_ids(vocabulary, ids, 3),
+            source=source
+        )
+
+    @classmethod
+    def from_file(cls, file_path, stopwords):
+        return cls.from_text(load_text(file_path), stopwords, source=file_path)
+
+    @property
+    def ngrams(self):
+        return self.unigrams, self.bigrams, self.trigrams
+
+    @cached_property
+    def positional_index(self):
+        # Built on the first context lookup and shared by all later ones
+        return PositionalIndex(self.tokens)
+
+def analysis_cache_key(job_file_path, stopwords_file_path):
+    """
+    Returns the cache key of a job description analysis: a hash of the job description content,
+    the stopwords file content and the analyzer version.
+    """
+    return content_hash(file_hash(job_file_path), file_hash(stopwords_file_path), ANALYZER_VERSION)
+
+def load_job_analysis(job_file_path, stopwords, stopwords_file_path, cache=None):
+    """
+    Analyzes a job description, including its sentiment, reusing a cached analysis when
+    neither the job description, the stopwords nor the analyzer changed.
+
+    :param job_file_path: Path to the job description file.
+    :param stopwords: Loaded stopwords.
+    :param stopwords_file_path: Path the stopwords were loaded from (part of the cache key).
+    :param cache: DiskCache holding previous analyses (optional, no caching if None).
+    :return: A DocumentAnalysis with its sentiment set.
+    """
+    key = None
+    if cache is not None and os.path.exists(job_file_path):
+        key = analysis_cache_key(job_file_path, stopwords_file_path)
+        analysis = cache.get(key)
+        if analysis is not None:
+            analysis.source = job_file_path
+            return analysis
+
+    from sentiment import analyze_text_sentiment
+    with span("tokenize_ngrams"):
+        analysis = DocumentAnalysis.from_file(job_file_path, stopwords)
+    # Sentiment is scored per sentence on the raw text, whose punctuation marks the sentence boundaries
+    with span("sentiment"):
+        report = analyze_text_sentiment(load_raw_text(job_file_path))
+    analysis.sentiment = Sentiment(report.polarity, report.subjectivity)
+    analysis.sentence_sentiments = report.sentences
+    if key is not None:
+        cache.set(key, analysis)
+    return analysis
+
+def summarize_job(job, top=10, context_terms=None, context_window=5):
+    """
+    Returns the sentiment, top n-grams and (optionally) keyword contexts of an analyzed job
+    description as a JSON-serializable dictionary, as printed by `print_job_summary`.
+
+    :param job: DocumentAnalysis of the job description, with its sentiment set.
+    :param top: Number of n-grams of each length.
+    :param context_terms: Terms or phrases to look up in context (optional, no lookup if None).
+    :param context_window: Number of words shown on each side of a context match.
+    """
+    sentences = sorted(job.sentence_sentiments or [], key=lambda scored: scored.polarity)
+    return {
+        "source": job.source,
+        "words": len(job.words),
+        "sentiment": list(job.sentiment) if job.sentiment is not None else None,
+        "sentences": len(sentences),
+        "most_positive": [sentences[-1].polarity, sentences[-1].sentence] if sentences else None,
+        "most_negative": [sentences[0].polarity, sentences[0].sentence] if sentences else None,
+        "unigrams": [[word, count] for word, count in job.unigrams.most_common(top)],
+        "bigrams": [[" ".join(phrase), count] for phrase, count in job.bigrams.most_common(top)],
+        "trigrams": [[" ".join(phrase), count] for phrase, count in job.trigrams.most_common(top)],
+        "contexts": job.positional_index.contexts(context_terms, context_window) if context_terms else None,
+    }
+
+def print_job_summary(summary):
+    print(f"Sentiment Analysis: {Sentiment(*summary['sentiment']) if summary['sentiment'] is not None else None}")
+    if summary["sentences"]:
+        polarity, sentence = summary["most_positive"]
+        print(f"Scored {summary['sentences']} sentences. Most positive ({polarity:+.2f}): {sentence}")
+        polarity, sentence = summary["most_negative"]
+        print(f"Most negative ({polarity:+.2f}): {sentence}")
+
+    for title, key in (("Unigrams", "unigrams"), ("Bigrams", "bigrams"), ("Trigrams", "trigrams")):
+        print(f"\n{title}:")
+        for ngram, count in summary[key]:
+            print(f"{ngram}: {count}")
+
+    if summary["contexts"] is not None:
+        print("\nKeywords in context:")
+        for term, contexts in summary["contexts"].items():
+            for context in contexts:
+                print(f"Context for '{term}':", context)
@@ -0,0 +1,215 @@
+import fcntl
+import json
+import math
+import os
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+import numpy as np
+from cache import content_hash
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+TFIDF_INDEX_DIR = os.path.join(OUTPUT_DIR, 'tfidf_index')
+
+# Bump whenever the on-disk layout changes
+TFIDF_INDEX_VERSION = 1
+
+class TfidfIndex:
+    """
+    Append-only document-frequency index over every ingested job description.
+
+    The doc-term matrix is stored on disk in CSR form, one file per array, so new postings are
+    appended without rewriting earlier rows:
+    - indptr.bin (int64): row start offsets, one more than the number of documents
+    - indices.bin (int32): term ids of each row
+    - data.bin (int32): term counts of each row
+    - df.bin (int64): document frequency of each term, rewritten on every append
+    - vocab.txt: one term per line, the line number being the term id
+    - documents.txt: content hash and source of each document, to skip re-ingesting a posting
+    - meta.json: document and non-zero counts and text file sizes, written last as the commit point of an append
+    - .lock: held exclusively while loading or appending, so processes sharing the folder never interleave appends
+
+    Readers memory-map the CSR arrays, so opening the index costs only the vocabulary and
+    document frequencies, and weight lookups are dictionary hits.
+
+    :param directory: Folder holding the index files (created if missing).
+    """
+
+    def __init__(self, directory=TFIDF_INDEX_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        with self._lock():
+            self._load()
+
+    def _load(self):
+        self.meta = self._read_meta()
+        self.documents = self.meta["documents"]
+        self.nonzeros = self.meta["nonzeros"]
+
+        # Anything past the committed sizes is left over from an interrupted append
+        self.terms = self._read_lines('vocab.txt', self.meta["vocab_bytes"])
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+        self.hashes = {line.split("\t", 1)[0] for line in self._read_lines('documents.txt', self.meta["documents_bytes"])}
+        self.df = self._read_array('df.bin', np.int64, len(self.terms))
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _lock(self):
+        with open(self._path('.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self):
+        try:
+            with open(self._path('meta.json'), 'r') as f:
+                meta = json.load(f)
+            if meta.get("version") == TFIDF_INDEX_VERSION:
+                return meta
+            print(f"Warning: Rebuilding TF-IDF index '{self.directory}' written by another version.")
+        except FileNotFoundError:
+            pass
+        for name in ('indptr.bin', 'indices.bin', 'data.bin', 'df.bin', 'vocab.txt', 'documents.txt'):
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+        return {"version": TFIDF_INDEX_VERSION, "documents": 0, "nonzeros": 0, "vocab_bytes": 0, "documents_bytes": 0}
+
+    def _read_lines(self, name, size):
+        try:
+            with open(self._path(name), 'rb') as f:
+                return f.read(size).decode('utf-8').split("\n")[:-1]
+        except FileNotFoundError:
+            return []
+
+    def _read_array(self, name, dtype, count):
+        try:
+            return np.fromfile(self._path(name), dtype=dtype, count=count)
+        except (FileNotFoundError, ValueError):
+            return np.zeros(0, dtype=dtype)
+
+    def _append(self, name, content, committed_bytes):
+        # Drop any bytes of an interrupted append before adding the new ones
+        with open(self._path(name), 'ab') as f:
+            f.truncate(committed_bytes)
+            f.write(content)
+        return committed_bytes + len(content)
+
+    def __len__(self):
+        return self.documents
+
+    def __contains__(self, tokens):
+        return self.document_hash(tokens) in self.hashes
+
+    @staticmethod
+    def document_hash(tokens):
+        return content_hash(*tokens)
+
+    def add_documents(self, documents):
+        """
+        Appends documents to the index, skipping ones already ingested (same tokens).
+
+        :param documents: Iterable of (tokens, source) pairs, `source` being a label such as the file name.
+        :return: The number of documents added.
+        """
+        documents = list(documents)
+        with self._lock():
+            # Another process may have appended since this one loaded the index
+            self._load()
+            return self._add_documents(documents)
+
+    def _add_documents(self, documents):
+        new_terms, rows, sources = [], [], []
+        df_updates = Counter()
+        for tokens, source in documents:
+            doc_hash = self.document_hash(tokens)
+            if doc_hash in self.hashes:
+                continue
+            self.hashes.add(doc_hash)
+            counts = Counter(tokens)
+            for term in counts:
+                if term not in self.term_ids:
+                    self.term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                    new_terms.append(term)
+            term_ids = np.fromiter((self.term_ids[term] for term in counts), dtype=np.int32, count=len(counts))
+            rows.append((term_ids, np.fromiter(counts.values(), dtype=np.int32, count=len(counts))))
+            df_updates.update(term_ids.tolist())
+            sources.append(f"{doc_hash}\t{source or ''}")
+        if not rows:
+            return 0
+
+        indices = np.concatenate([term_ids for term_ids, _ in rows])
+        data = np.concatenate([counts for _, counts in rows])
+        indptr = self.nonzeros + np.cumsum([len(term_ids) for term_ids, _ in rows], dtype=np.int64)
+        if self.documents == 0:
+            indptr = np.concatenate([np.zeros(1, dtype=np.int64), indptr])
+
+        df = np.zeros(len(self.terms), dtype=np.int64)
+        df[:len(self.df)] = self.df
+        update_ids = np.fromiter(df_updates.keys(), dtype=np.int64, count=len(df_updates))
+        df[update_ids] += np.fromiter(df_updates.values(), dtype=np.int64, count=len(df_updates))
+
+        meta = dict(self.meta)
+        meta["vocab_bytes"] = self._append('vocab.txt', "".join(term + "\n" for term in new_terms).encode('utf-8'), meta["vocab_bytes"])
+        meta["documents_bytes"] = self._append('documents.txt', "".join(line + "\n" for line in sources).encode('utf-8'), meta["documents_bytes"])
+        self._append('indptr.bin', indptr.tobytes(), 8 * (self.documents + 1) if self.documents else 0)
+        self._append('indices.bin', indices.tobytes(), 4 * self.nonzeros)
+        self._append('data.bin', data.tobytes(), 4 * self.nonzeros)
+        self._write_atomic('df.bin', df.tobytes())
+
+        self.df = df
+        self.documents += len(rows)
+        self.nonzeros += len(indices)
+        meta.update(documents=self.documents, nonzeros=self.nonzeros)
+        self._write_atomic('meta.json', json.dumps(meta).encode("utf-8"))
+        self.meta = meta
+        return len(rows)
+
+    def add_document(self, tokens, source=None):
+        return self.add_documents([(tokens, source)])
+
+    def _write_atomic(self, name, content):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, self._path(name))
+
+    def idf(self, term):
+        """
+        Smoothed inverse document frequency: ln((1 + N) / (1 + df)) + 1, so unseen terms get the highest weight.
+        """
+        term_id = self.term_ids.get(term)
+        df = int(self.df[term_id]) if term_id is not None else 0
+        return math.log((1 + self.documents) / (1 + df)) + 1
+
+    def term_weights(self, terms):
+        """
+        Returns a dictionary mapping each distinct term to its IDF weight.
+        """
+        return {term: self.idf(term) for term in set(terms)}
+
+    def matrix(self):
+        """
+        Returns the (indptr, indices, data) CSR arrays, memory-mapped read-only.
+        """
+        if self.documents == 0:
+            return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+        return (
+            np.memmap(self._path('indptr.bin'), dtype=np.int64, mode='r', shape=(self.documents + 1,)),
+            np.memmap(self._path('indices.bin'), dtype=np.int32, mode='r', shape=(self.nonzeros,)),
+            np.memmap(self._path('data.bin'), dtype=np.int32, mode='r', shape=(self.nonzeros,)),
+        )
+
+def ngram_weight(weights, ngram):
+    """
+    Returns the weight of a unigram (str) or n-gram (tuple): the mean IDF of its words.
+    """
+    words = (ngram,) if isinstance(ngram, str) else ngram
+    return sum(weights.get(word, 1.0) for word in words) / len(words)
@@ -0,0 +1,166 @@
+import argparse
+import os
+import time
+import numpy as np
+from file_utils import load_stopwords, normalize_text
+from ngram_engine import NgramCounts, Vocabulary, pack_ngrams
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+# Characters read per chunk; memory held for the text is a few times this, whatever the file size
+CHUNK_SIZE = 1 << 20
+
+# Chunk counts are merged into the running totals once they add up to this many keys (or to the totals' size)
+MERGE_THRESHOLD = 1 << 18
+
+def _word_boundary(text):
+    # Index just past the last whitespace character, so text[:index] holds only complete words
+    index = len(text)
+    while index and not text[index - 1].isspace():
+        index -= 1
+    return index
+
+def iter_token_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Reads a text file in chunks and yields its normalized tokens (lowercased, punctuation removed,
+    split on whitespace) one list per chunk.
+
+    A chunk is only normalized up to its last whitespace character and the partial word after it
+    is carried into the next chunk, so the tokens are exactly those of `load_text(file_path).split()`.
+
+    :param file_path: Path to the text file.
+    :param chunk_size: Number of characters read at a time.
+    """
+    try:
+        file = open(file_path, 'r')
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        exit(1)
+
+    with file:
+        carry = ""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            text = carry + chunk
+            boundary = _word_boundary(text)
+            carry = text[boundary:]
+            tokens = normalize_text(text[:boundary]).split()
+            if tokens:
+                yield tokens
+        tokens = normalize_text(carry).split()
+        if tokens:
+            yield tokens
+
+def iter_word_chunks(file_path, stopwords, chunk_size=CHUNK_SIZE):
+    """
+    Yields the stopword-filtered tokens of a text file one list per chunk (see `iter_token_chunks`),
+    the same words as `DocumentAnalysis.from_file(file_path, stopwords).words`.
+    """
+    for tokens in iter_token_chunks(file_path, chunk_size):
+        words = [word for word in tokens if word not in stopwords]
+        if words:
+            yield words
+
+def _merge_counts(parts):
+    # Sums the counts and keeps the earliest first occurrence of every key across (keys, counts, first) parts
+    keys = np.concatenate([part[0] for part in parts])
+    if not len(keys):
+        return keys, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    counts = np.add.reduceat(np.concatenate([part[1] for part in parts])[order], starts)
+    first = np.minimum.reduceat(np.concatenate([part[2] for part in parts])[order], starts)
+    return keys[starts], counts, first
+
+class StreamingNgramCounter:
+    """
+    Counts the n-grams of a word sequence fed in pieces, holding only the counts of distinct
+    n-grams and the last n - 1 words rather than the sequence itself.
+
+    N-grams spanning two pieces are counted once, from the words carried over from the previous
+    piece. Every n-gram keeps the position of its first occurrence in the whole sequence, so the
+    resulting NgramCounts are identical (counts and ordering) to counting the concatenated words at once.
+
+    :param ns: N-gram lengths to count.
+    :param vocabulary: Vocabulary to intern the words in (optional, a new one by default).
+    """
+
+    def __init__(self, ns=(1, 2, 3), vocabulary=None):
+        self.ns = tuple(ns)
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self.words = 0
+        empty = np.empty(0, dtype=np.int64)
+        self._carry = empty
+        self._totals = {n: (empty, empty, empty) for n in self.ns}
+        self._pending = {n: [] for n in self.ns}
+
+    def update(self, words):
+        """
+        Counts the next words of the sequence.
+        """
+        if not words:
+            return
+        ids = self.vocabulary.encode(words)
+        window = np.concatenate((self._carry, ids))
+        window_start = self.words - len(self._carry)
+        for n in self.ns:
+            # N-grams lying entirely in the carried words were counted with the previous piece
+            skip = max(len(self._carry) - n + 1, 0)
+            keys, first, counts = np.unique(pack_ngrams(window, n)[skip:], return_index=True, return_counts=True)
+            pending = self._pending[n]
+            pending.append((keys, counts.astype(np.int64), first.astype(np.int64) + window_start + skip))
+            if sum(len(part[0]) for part in pending) >= max(MERGE_THRESHOLD, len(self._totals[n][0])):
+                self._merge(n)
+        self.words += len(ids)
+        carry = max(self.ns) - 1
+        self._carry = window[len(window) - carry:] if carry else window[:0]
+
+    def _merge(self, n):
+        if self._pending[n]:
+            self._totals[n] = _merge_counts([self._totals[n]] + self._pending[n])
+            self._pending[n] = []
+
+    def counts(self, n, scalar_keys=False):
+        """
+        Returns the NgramCounts of the n-grams of length `n` counted so far.
+        """
+        self._merge(n)
+        keys, counts, first = self._totals[n]
+        return NgramCounts(self.vocabulary, n, keys, counts, first, scalar_keys)
+
+def count_file_ngrams(file_path, stopwords, ns=(1, 2, 3), chunk_size=CHUNK_SIZE):
+    """
+    Counts the n-grams of the stopword-filtered words of a text file without loading it whole.
+
+    :return: A StreamingNgramCounter holding the counts.
+    """
+    counter = StreamingNgramCounter(ns)
+    for words in iter_word_chunks(file_path, stopwords, chunk_size):
+        counter.update(words)
+    return counter
+
+def ngrams_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py ngrams",
+        description="Count the unigrams, bigrams and trigrams of a large text file (e.g., a dump of scraped postings) by streaming it in chunks."
+    )
+    parser.add_argument("file_path", help="Path to the text file")
+    parser.add_argument("--top", type=int, default=20, help="Number of n-grams of each length to show (default: 20)")
+    parser.add_argument("--stopwords", default=os.path.join(DATA_DIR, 'stopwords.txt'), help="Path to the stopwords file (default: stopwords.txt)")
+    parser.add_argument("--chunk_size", type=int, default=CHUNK_SIZE, help=f"Characters read at a time (default: {CHUNK_SIZE})")
+    args = parser.parse_args(argv)
+
+    stopwords = load_stopwords(os.path.join(DATA_DIR, os.path.basename(args.stopwords)))
+    start = time.perf_counter()
+    counter = count_file_ngrams(args.file_path, stopwords, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"Counted {counter.words} words ({len(counter.vocabulary)} distinct) in {elapsed:.2f}s")
+    for title, n in (("Unigrams", 1), ("Bigrams", 2), ("Trigrams", 3)):
+        print(f"\n{title}:")
+        for ngram, count in counter.counts(n, scalar_keys=True).most_common(args.top):
+            print(f"{ngram if n == 1 else ' '.join(ngram)}: {count}")
@@ -1,35 +1,175 @@
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-
-def plot_wordcloud_and_frequencies(unigrams, bigrams, text):
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))  # Three side-by-side plots
-
-    # Word Cloud
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
-    axes[0].imshow(wordcloud, interpolation='bilinear')
-    axes[0].axis('off')  # Hide axes
-    axes[0].set_title("Word Cloud")
-
-    # Unigrams Bar Chart
-    top_unigrams = unigrams.most_common(10)
-    words_u, counts_u = zip(*top_unigrams)
-    axes[1].bar(words_u, counts_u, color='tab:blue')
-    axes[1].set_title("Top Unigrams")
-    axes[1].set_xlabel("Words")
-    axes[1].set_ylabel("Frequency")
-    axes[1].tick_params(axis='x', rotation=45)
-
-    # Bigrams Bar Chart
-    top_bigrams = bigrams.most_common(10)
-    words_b, counts_b = zip(*[(" ".join(phrase), count) for phrase, count in top_bigrams])
-    axes[2].bar(words_b, counts_b, color='tab:green')
-    axes[2].set_title("Top Bigrams")
-    axes[2].set_xlabel("Phrases")
-    axes[2].set_ylabel("Frequency")
-    axes[2].tick_params(axis='x', rotation=90)
-
-    plt.tight_layout()
-
-    # Save the figure
-    plt.savefig("output/output.png", dpi=300, bbox_inches="tight")
-    plt.show()  # Commented out
\ No newline at end of file
+import io
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from cache import DiskCache, content_hash
+from profiling import span
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
+PLOT_CACHE_DIR = os.path.join(OUTPUT_DIR, '.cache', 'plots')
+PLOTS_DIR = os.path.join(OUTPUT_DIR, 'plots')
+
+# Bump whenever the figures change, so cached images from older versions are not reused
+VISUALIZATION_VERSION = "1"
+
+FULL_DPI = 300
+PREVIEW_DPI = 72
+
+# WordCloud draws at most this many words, so only they are part of an image's cache key
+WORDCLOUD_MAX_WORDS = 200
+
+# Renders one figure at a time in the background while the pipeline continues
+_executor = None
+
+def create_plot_cache(directory=PLOT_CACHE_DIR, max_bytes=128 * 1024 * 1024):
+    return DiskCache(directory, max_bytes=max_bytes)
+
+def _figure(width, height):
+    # The Figure API with an Agg canvas never opens a window and keeps no pyplot global state,
+    # so figures can be rendered headless from a worker thread
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    figure = Figure(figsize=(width, height))
+    FigureCanvasAgg(figure)
+    return figure
+
+def _png_bytes(figure, dpi):
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    return buffer.getvalue()
+
+def _plot_wordcloud(axis, frequencies, title):
+    from wordcloud import WordCloud
+    # Draw from the counts already computed instead of re-tokenizing the text
+    if frequencies:
+        wordcloud = WordCloud(width=800, height=400, background_color='white', max_words=WORDCLOUD_MAX_WORDS).generate_from_frequencies(dict(frequencies))
+        axis.imshow(wordcloud, interpolation='bilinear')
+    axis.axis('off')  # Hide axes
+    axis.set_title(title)
+
+def _plot_bars(axis, items, title, xlabel, ylabel, color, rotation):
+    if items:
+        labels, values = zip(*items)
+        axis.bar(labels, values, color=color)
+    axis.set_title(title)
+    axis.set_xlabel(xlabel)
+    axis.set_ylabel(ylabel)
+    axis.tick_params(axis='x', rotation=rotation)
+
+def render_wordcloud_and_frequencies(unigrams, bigrams, dpi=FULL_DPI):
+    """
+    Renders the word cloud and the top unigram and bigram bar charts side by side.
+
+    :return: The PNG image as bytes.
+    """
+    figure = _figure(18, 5)
+    axes = figure.subplots(1, 3)  # Three side-by-side plots
+
+    _plot_wordcloud(axes[0], unigrams.most_common(WORDCLOUD_MAX_WORDS), "Word Cloud")
+    _plot_bars(axes[1], unigrams.most_common(10), "Top Unigrams", "Words", "Frequency", 'tab:blue', 45)
+    top_bigrams = [(" ".join(phrase), count) for phrase, count in bigrams.most_common(10)]
+    _plot_bars(axes[2], top_bigrams, "Top Bigrams", "Phrases", "Frequency", 'tab:green', 90)
+
+    figure.tight_layout()
+    return _png_bytes(figure, dpi)
+
+def plot_wordcloud_and_frequencies(unigrams, bigrams, text, output_path="example_output.png"):
+    """
+    Saves the word cloud and n-gram plots to `output_path` at full resolution.
+
+    :param text: The text the counts come from. The word cloud is drawn from `unigrams`, the same words already counted.
+    """
+    with open(output_path, 'wb') as f:
+        f.write(render_wordcloud_and_frequencies(unigrams, bigrams, FULL_DPI))
+
+def _render_cached(key, render, output_path, cache):
+    """
+    Writes the image for `key` to `output_path`, rendering it only if the cache does not hold it.
+
+    :return: A tuple of (output_path, whether the cached image was reused).
+    """
+    png = cache.get(key) if cache is not None else None
+    reused = png is not None
+    if not reused:
+        with span("render_plot"):
+            png = render()
+        if cache is not None:
+            cache.set(key, png)
+    # Written atomically: concurrent runs (e.g. server requests for the same job description) may write the same path
+    directory = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{os.path.basename(output_path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(png)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return output_path, reused
+
+def plot_document_analysis(analysis, output_path, dpi=FULL_DPI, cache=None):
+    """
+    Plots the word cloud and n-gram frequencies of an already analyzed document.
+
+    The image is keyed by a hash of the plotted counts and the resolution, so an unchanged job
+    description reuses its cached image.
+
+    :param analysis: DocumentAnalysis of the job description.
+    :param output_path: Path of the PNG file to write.
+    :param dpi: Resolution (FULL_DPI, or PREVIEW_DPI for a quick preview).
+    :param cache: DiskCache of rendered images (optional, see `create_plot_cache`).
+    :return: A tuple of (output_path, whether the cached image was reused).
+    """
+    unigrams = analysis.unigrams.most_common(WORDCLOUD_MAX_WORDS)
+    bigrams = analysis.bigrams.most_common(10)
+    key = content_hash("document", VISUALIZATION_VERSION, str(dpi), repr(unigrams), repr(bigrams))
+    return _render_cached(key, lambda: render_wordcloud_and_frequencies(analysis.unigrams, analysis.bigrams, dpi), output_path, cache)
+
+def plot_document_analysis_async(analysis, output_path, dpi=FULL_DPI, cache=None):
+    """
+    Runs `plot_document_analysis` on a background thread.
+
+    :return: A Future resolving to (output_path, whether the cached image was reused).
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plot")
+    return _executor.submit(plot_document_analysis, analysis, output_path, dpi, cache)
+
+def plot_batch_dashboard(summaries, output_path, dpi=FULL_DPI, cache=None):
+    """
+    Renders an overview of a batch run: a word cloud of the keywords of every posting, the
+    keywords found in the most postings, and the distribution of posting lengths.
+
+    :param summaries: Per-posting summaries from `batch.analyze_job_file` (with their "keywords").
+    :return: A tuple of (output_path, whether the cached image was reused).
+    """
+    # Summaries arrive in completion order; sort them so ties and the cache key are stable
+    summaries = sorted(summaries, key=lambda summary: summary["job_file"])
+    keyword_counts = Counter()
+    postings_per_keyword = Counter()
+    for summary in summaries:
+        for word, count in summary["keywords"]:
+            keyword_counts[word] += count
+            postings_per_keyword[word] += 1
+    lengths = sorted(summary["words"] for summary in summaries)
+    top_keywords = postings_per_keyword.most_common(15)
+
+    def render():
+        figure = _figure(18, 5)
+        axes = figure.subplots(1, 3)
+        _plot_wordcloud(axes[0], keyword_counts.most_common(WORDCLOUD_MAX_WORDS), f"Keywords of {len(summaries)} Postings")
+        _plot_bars(axes[1], top_keywords, "Keywords in Most Postings", "Words", "Postings", 'tab:blue', 45)
+        axes[2].hist(lengths, bins=min(20, max(len(lengths), 1)), color='tab:green')
+        axes[2].set_title("Posting Length")
+        axes[2].set_xlabel("Words (without stopwords)")
+        axes[2].set_ylabel("Postings")
+        figure.tight_layout()
+        return _png_bytes(figure, dpi)
+
+    key = content_hash("dashboard", VISUALIZATION_VERSION, str(dpi), repr(sorted(keyword_counts.items())), repr(sorted(postings_per_keyword.items())), repr(lengths))
+    return _render_cached(key, render, output_path, cache)